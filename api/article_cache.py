@@ -0,0 +1,191 @@
+"""
+article_cache.py — Persistent cache of scraped articles
+--------------------------------------------------------
+Provides:
+  - A SQLite-backed store of scrape_article() results (the extracted
+    title / summary / image / authors dict, never raw HTML)
+  - Keys derived from a normalised URL, so tracking parameters, fragments
+    and host casing don't defeat the cache
+  - TTL expiry and size-bounded LRU eviction
+  - Process-wide hit / miss counters (per-request counts are kept by the
+    caller — see fetch_articles)
+
+The store survives restarts and is safe to share between threads and worker
+processes (SQLite WAL mode).
+
+Environment variables:
+    ARTICLE_CACHE_PATH         SQLite file (default api/cache/articles.sqlite3)
+    ARTICLE_CACHE_TTL          Seconds an entry stays fresh (default 6 hours)
+    ARTICLE_CACHE_MAX_ENTRIES  LRU bound (default 5000). 0 disables the cache.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+ARTICLE_CACHE_PATH = os.getenv(
+    "ARTICLE_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "cache", "articles.sqlite3"),
+)
+ARTICLE_CACHE_TTL         = int(os.getenv("ARTICLE_CACHE_TTL", 6 * 60 * 60))
+ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", 5000))
+
+#: Query parameters that never change the article served.
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "guccounter"}
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of an article URL: lower-case scheme and host, default
+    ports, fragments and tracking parameters dropped, query sorted.
+    """
+    parts  = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host   = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+
+class ArticleCache:
+    """SQLite store of scraped-article dicts with TTL and LRU eviction."""
+
+    def __init__(self, path: str = ARTICLE_CACHE_PATH, ttl: int = ARTICLE_CACHE_TTL,
+                 max_entries: int = ARTICLE_CACHE_MAX_ENTRIES):
+        self.path        = path
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self._local      = threading.local()
+        self._lock       = threading.Lock()
+        self._hits       = 0
+        self._misses     = 0
+        self._writes     = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " key TEXT PRIMARY KEY,"
+                " url TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS articles_lru ON articles (accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached dict for *url*, or None if absent or expired."""
+        if not self.enabled or not url:
+            return None
+        key = cache_key(url)
+        now = time.time()
+        try:
+            conn = self._conn()
+            row  = conn.execute(
+                "SELECT data, stored_at FROM articles WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl:
+                conn.execute("UPDATE articles SET accessed_at = ? WHERE key = ?", (now, key))
+                with self._lock:
+                    self._hits += 1
+                return json.loads(row[0])
+            if row:
+                conn.execute("DELETE FROM articles WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"  [!] Article cache read failed: {e}")
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, url: str, data: Dict) -> None:
+        """Store *data* for *url*, evicting least-recently-used entries if full."""
+        if not self.enabled or not url:
+            return
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO articles (key, url, data, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key(url), normalize_url(url), json.dumps(data), now, now),
+            )
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % 50 == 0
+            # Evicting on every write would scan the index each time; every
+            # 50th write keeps the bound within a few dozen rows.
+            if evict:
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"  [!] Article cache write failed: {e}")
+
+    def evict(self) -> int:
+        """Drop expired entries, then LRU entries beyond max_entries."""
+        conn    = self._conn()
+        removed = conn.execute(
+            "DELETE FROM articles WHERE stored_at < ?", (time.time() - self.ttl,)
+        ).rowcount
+        removed += conn.execute(
+            "DELETE FROM articles WHERE key IN ("
+            " SELECT key FROM articles ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "hits":      hits,
+            "misses":    misses,
+            "hit_ratio": round(hits / total, 3) if total else 0.0,
+        }
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+cache = ArticleCache()
+
+
+def get(url: str) -> Optional[Dict]:
+    return cache.get(url)
+
+
+def put(url: str, data: Dict) -> None:
+    cache.put(url, data)
+
+
+def stats() -> Dict:
+    return cache.stats()
@@ -0,0 +1,228 @@
+"""
+asgi.py — Async (ASGI) server mode for Digest
+----------------------------------------------
+Provides:
+  - app: an ASGI application serving server.py's Flask app. Each request
+    runs the Flask app on a thread of the bridge's own pool
+    (ASGI_BRIDGE_THREADS), so routing, rate limits, CSRF, CORS, HEAD/405/413
+    handling and request timing are exactly server.py's — this module only
+    carries bytes. The pool is separate from the loop's default executor,
+    which job renders use (asyncio.to_thread in build_pdf), so a running job
+    cannot queue /api/health behind it
+  - One loop for the whole process: job PDF renders are driven on it
+    (server.use_event_loop) instead of a fresh asyncio.run() per job. On
+    lifespan shutdown, renders still running are cancelled and their jobs
+    fail with 503, rather than leaving job threads waiting on a dead loop
+  - SSE hand-off: /api/jobs/<id>/events runs its checks in Flask, then the
+    stream waits on the loop (server.job_event_stream_async) without holding
+    a thread for the life of the connection
+
+Typical use (from api/):
+
+    python3 asgi.py                           # uvicorn on PORT
+    uvicorn asgi:app --port 5002
+
+More than one worker needs TOKEN_STORE_URL=sqlite://... (or redis://) so
+CSRF tokens, rate limits and jobs are shared (see token_store.py and
+jobs.py). An event stream for a job another worker runs polls the store
+from the loop (Job.wait_events_async) instead of being woken directly.
+
+Environment variables:
+    ASGI_WORKERS          uvicorn worker processes for `python3 asgi.py` (default 1)
+    ASGI_BRIDGE_THREADS   Threads running Flask requests and response bodies
+                          (default 32). Each slow request (/api/validate)
+                          holds one; 0 shares the loop's default executor
+    PORT                  Listen port (default 5002, as server.py)
+"""
+
+import asyncio
+import contextvars
+import functools
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import server
+from security import MAX_BODY_BYTES
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+ASGI_WORKERS        = int(os.getenv("ASGI_WORKERS", 1))
+ASGI_BRIDGE_THREADS = int(os.getenv("ASGI_BRIDGE_THREADS", 32))
+
+#: Bytes handed from a WSGI response iterator to the loop per thread hop.
+BRIDGE_CHUNK_BYTES = 64 * 1024
+
+
+# ── Bridge threads ────────────────────────────────────────────────────────────
+
+_bridge: Optional[ThreadPoolExecutor] = None
+
+
+def _bridge_executor() -> Optional[ThreadPoolExecutor]:
+    """The bridge pool (created on first use if lifespan did not run); None = default executor."""
+    global _bridge
+    if _bridge is None and ASGI_BRIDGE_THREADS > 0:
+        _bridge = ThreadPoolExecutor(ASGI_BRIDGE_THREADS, thread_name_prefix="asgi-bridge")
+    return _bridge
+
+
+def _close_bridge() -> None:
+    global _bridge
+    if _bridge is not None:
+        _bridge.shutdown(wait=False)
+        _bridge = None
+
+
+async def _to_bridge(func: Callable, *args):
+    """asyncio.to_thread(), on the bridge pool."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args)
+    return await loop.run_in_executor(_bridge_executor(), call)
+
+
+# ── Request ───────────────────────────────────────────────────────────────────
+
+async def _read_body(receive: Callable) -> Tuple[bytes, int]:
+    """
+    ``(body, size)``. Stops reading once *size* passes MAX_BODY_BYTES; the
+    size is still passed on as CONTENT_LENGTH, so Flask answers 413 itself.
+    """
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            break
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks), size
+
+
+def _environ(scope: Dict, body: bytes, size: int) -> Dict:
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD":    scope["method"],
+        "SCRIPT_NAME":       scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO":         scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING":      scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME":       server_name,
+        "SERVER_PORT":       str(server_port),
+        "SERVER_PROTOCOL":   f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR":       (scope.get("client") or ("127.0.0.1", 0))[0],
+        "CONTENT_LENGTH":    str(size),
+        "wsgi.version":      (1, 0),
+        "wsgi.url_scheme":   scope.get("scheme", "http"),
+        "wsgi.input":        io.BytesIO(body),
+        "wsgi.errors":       sys.stderr,
+        "wsgi.multithread":  True,
+        "wsgi.multiprocess": ASGI_WORKERS > 1,
+        "wsgi.run_once":     False,
+        server.SSE_HAND_OFF: {},
+    }
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value.decode("latin-1")
+            continue
+        if key == "CONTENT_LENGTH":
+            continue
+        key = "HTTP_" + key
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+# ── Response ──────────────────────────────────────────────────────────────────
+
+def _read_some(iterator) -> bytes:
+    """Up to about BRIDGE_CHUNK_BYTES from *iterator*; b"" when it is done."""
+    parts, size = [], 0
+    for chunk in iterator:
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= BRIDGE_CHUNK_BYTES:
+            break
+    return b"".join(parts)
+
+
+def _call_app(environ: Dict) -> Tuple[int, List[Tuple[bytes, bytes]], object, bytes]:
+    """Run the Flask app; ``(status, headers, response iterable, first chunk)``."""
+    started: Dict = {}
+
+    def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+        started["status"]  = int(status.split(" ", 1)[0])
+        started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+    result = server.app(environ, start_response)
+    first  = _read_some(iter(result))
+    return started["status"], started["headers"], result, first
+
+
+async def _serve(scope: Dict, receive: Callable, send: Callable) -> None:
+    body, size = await _read_body(receive)
+    environ = _environ(scope, body, size)
+    status, headers, result, chunk = await _to_bridge(_call_app, environ)
+    hand_off = environ[server.SSE_HAND_OFF]
+    try:
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if hand_off and scope["method"] != "HEAD":
+            stream = server.job_event_stream_async(hand_off["job"], hand_off["last_id"])
+            async for chunk in stream:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            iterator = iter(result)
+            while chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await _to_bridge(_read_some, iterator)
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        if hasattr(result, "close"):
+            await _to_bridge(result.close)
+
+
+# ── Application ───────────────────────────────────────────────────────────────
+
+async def _lifespan(receive: Callable, send: Callable) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            _bridge_executor()
+            server.use_event_loop(asyncio.get_running_loop())
+            server.start_background_tasks()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            server.use_event_loop(None)
+            _close_bridge()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope: Dict, receive: Callable, send: Callable) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+    elif scope["type"] == "http":
+        await _serve(scope, receive, send)
+
+
+# ── Entry point ───────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("asgi.py needs uvicorn: pip install -r ../requirements.txt")
+    uvicorn.run(
+        "asgi:app" if ASGI_WORKERS > 1 else app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 5002)),
+        workers=ASGI_WORKERS,
+        lifespan="on",
+    )
@@ -0,0 +1,149 @@
+"""
+bootstrap.py — One-time setup and warm-up, kept off the import path
+--------------------------------------------------------------------
+Provides:
+  - ensure_nltk(): makes the NLTK data newspaper3k's summariser needs
+    (punkt, punkt_tab, stopwords; only used with SUMMARIZER=newspaper, see
+    extract.py) available from a local directory, and
+    downloads only what is missing — once per process, never at import
+  - warm_up(): loads the heavy, lazily imported libraries (newspaper3k +
+    NLTK) and summarize.py's stopword list ahead of the first request that
+    needs them
+  - start_warm_up(): the same on a daemon thread, so the server answers
+    health checks while it runs
+  - A CLI for build/deploy steps, so the download happens at build time:
+
+        cd api && python bootstrap.py
+
+Environment variables:
+    NLTK_DATA_DIR        Where NLTK data lives (default api/cache/nltk_data);
+                         prepended to NLTK's search path
+    NLTK_DOWNLOAD        Fetch missing NLTK data at runtime (default true).
+                         Set false on hosts without outbound access — the
+                         newspaper summariser (SUMMARIZER=newspaper) then
+                         falls back to leading paragraphs
+    BOOTSTRAP_WARM_UP    "background" (default), "eager" or "off" — how
+                         server.start_background_tasks() runs warm_up() when
+                         a process starts serving (entry points, gunicorn's
+                         post_worker_init, or else the first request; never
+                         on import). Every worker warms itself
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+NLTK_DATA_DIR = os.getenv(
+    "NLTK_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "nltk_data"),
+)
+NLTK_DOWNLOAD     = os.getenv("NLTK_DOWNLOAD", "true").lower() != "false"
+BOOTSTRAP_WARM_UP = os.getenv("BOOTSTRAP_WARM_UP", "background").lower()
+
+#: NLTK package -> resource path checked with nltk.data.find().
+NLTK_RESOURCES = {
+    "punkt":     "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+}
+
+
+# ── NLTK ──────────────────────────────────────────────────────────────────────
+
+_nltk_lock   = threading.Lock()
+_nltk_status: Dict[str, str] = {}
+
+
+def ensure_nltk(download: bool = NLTK_DOWNLOAD) -> Dict[str, str]:
+    """
+    Return {package: "present" | "downloaded" | "missing"}. The first call
+    does the work; later calls return the cached answer.
+    """
+    if _nltk_status:
+        return _nltk_status
+    with _nltk_lock:
+        if _nltk_status:
+            return _nltk_status
+
+        import nltk
+
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+        status: Dict[str, str] = {}
+        for package, resource in NLTK_RESOURCES.items():
+            try:
+                nltk.data.find(resource)
+                status[package] = "present"
+                continue
+            except LookupError:
+                pass
+            if download:
+                os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+                try:
+                    ok = nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+                except Exception:
+                    ok = False
+                status[package] = "downloaded" if ok else "missing"
+            else:
+                status[package] = "missing"
+
+        missing = [p for p, s in status.items() if s == "missing"]
+        if missing:
+            print(f"  [!] NLTK data unavailable ({', '.join(missing)}) — NLP summaries disabled")
+        _nltk_status.update(status)
+        return _nltk_status
+
+
+# ── Warm-up ───────────────────────────────────────────────────────────────────
+
+_warm_up: Dict = {"state": "pending"}
+
+
+def warm_up() -> Dict:
+    """Load NLTK data and newspaper3k now rather than on the first scrape."""
+    _warm_up["state"] = "running"
+    started = time.perf_counter()
+    try:
+        ensure_nltk()
+        import newspaper  # noqa: F401 — import cost paid here, not mid-request
+        import summarize
+        summarize.stopwords()
+        _warm_up.update(state="done", nltk=dict(_nltk_status))
+    except Exception as e:
+        _warm_up.update(state="error", error=str(e))
+    _warm_up["seconds"] = round(time.perf_counter() - started, 3)
+    return dict(_warm_up)
+
+
+def start_warm_up(mode: str = BOOTSTRAP_WARM_UP) -> None:
+    """Run warm_up() per *mode*: "background", "eager" (blocking) or "off"."""
+    if mode == "eager":
+        warm_up()
+    elif mode == "background":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        _warm_up["state"] = "off"
+
+
+def status() -> Dict:
+    return dict(_warm_up)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    result = warm_up()
+    for package, state in result.get("nltk", {}).items():
+        print(f"  {package:<10} {state}")
+    if result["state"] != "done":
+        raise SystemExit(f"Bootstrap failed: {result.get('error')}")
+    if "missing" in result["nltk"].values():
+        # Not fatal: the server still runs, with paragraph summaries only.
+        print(f"  [!] Bootstrap incomplete after {result['seconds']}s → {NLTK_DATA_DIR}")
+    else:
+        print(f"✓ Bootstrap complete in {result['seconds']}s → {NLTK_DATA_DIR}")
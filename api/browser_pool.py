@@ -0,0 +1,267 @@
+"""
+browser_pool.py — Long-lived Chromium pool for PDF rendering
+-------------------------------------------------------------
+Provides:
+  - N warm Chromium instances launched once per process instead of once per
+    PDF, driven from a dedicated event-loop thread (Playwright objects are
+    bound to the loop that created them, while callers use asyncio.run)
+  - A fresh browser context per render, so jobs never share cookies, cache
+    or storage
+  - Health checks (on checkout and on a timer) that relaunch dead browsers
+  - Recycling after BROWSER_MAX_RENDERS renders to cap Chromium memory growth
+  - A cap on concurrent renders across the whole process
+
+Typical use (from any event loop):
+
+    import browser_pool
+
+    async def render(page):
+        await page.set_content(html)
+        await page.pdf(path=output_path)
+
+    await browser_pool.with_page(render)
+
+Environment variables:
+    BROWSER_POOL_SIZE          Warm browsers (default 1)
+    BROWSER_MAX_RENDERS        Renders before a browser is recycled (default 50)
+    BROWSER_MAX_CONCURRENT     Renders in flight at once (default 2)
+    BROWSER_HEALTH_INTERVAL    Seconds between background health checks (default 60)
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+if TYPE_CHECKING:   # imported for real on first use — Playwright is slow to import
+    from playwright.async_api import Browser, Page, Playwright
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+BROWSER_POOL_SIZE       = int(os.getenv("BROWSER_POOL_SIZE", 1))
+BROWSER_MAX_RENDERS     = int(os.getenv("BROWSER_MAX_RENDERS", 50))
+BROWSER_MAX_CONCURRENT  = int(os.getenv("BROWSER_MAX_CONCURRENT", 2))
+BROWSER_HEALTH_INTERVAL = float(os.getenv("BROWSER_HEALTH_INTERVAL", 60))
+
+T = TypeVar("T")
+
+
+# ── Slots ─────────────────────────────────────────────────────────────────────
+
+class _Slot:
+    """One Chromium instance plus its usage counters."""
+
+    def __init__(self, index: int):
+        self.index    = index
+        self.browser: Optional["Browser"] = None
+        self.renders  = 0
+        self.active   = 0
+        self.launches = 0
+        self.launched_at: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.renders >= BROWSER_MAX_RENDERS
+
+    async def launch(self, playwright: "Playwright") -> None:
+        await self.close()
+        self.browser     = await playwright.chromium.launch()
+        self.renders     = 0
+        self.launches   += 1
+        self.launched_at = time.time()
+
+    async def close(self) -> None:
+        browser, self.browser = self.browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    def as_dict(self) -> Dict:
+        return {
+            "index":       self.index,
+            "healthy":     self.healthy,
+            "renders":     self.renders,
+            "active":      self.active,
+            "launches":    self.launches,
+            "launched_at": self.launched_at,
+        }
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+class BrowserPool:
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_concurrent: int = BROWSER_MAX_CONCURRENT):
+        self.size           = max(1, size)
+        self.max_concurrent = max(1, max_concurrent)
+        self._slots: List[_Slot] = [_Slot(i) for i in range(self.size)]
+        self._loop:  Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._playwright: Optional["Playwright"] = None
+        self._checkout:   Optional[asyncio.Lock] = None
+        self._render_sem: Optional[asyncio.Semaphore] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._total_renders = 0
+
+    # ── Loop thread ────────────────────────────────────────────────────────
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="browser-pool", daemon=True)
+                self._thread.start()
+                ready.wait()
+                try:
+                    asyncio.run_coroutine_threadsafe(self._startup(), loop).result()
+                except Exception:
+                    loop.call_soon_threadsafe(loop.stop)
+                    raise
+                self._loop = loop
+        return self._loop
+
+    async def _startup(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._checkout   = asyncio.Lock()
+        self._render_sem = asyncio.Semaphore(self.max_concurrent)
+        try:
+            for slot in self._slots:
+                await slot.launch(self._playwright)
+        except Exception:
+            for slot in self._slots:
+                await slot.close()
+            await self._playwright.stop()
+            raise
+        self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(BROWSER_HEALTH_INTERVAL)
+            async with self._checkout:
+                for slot in self._slots:
+                    if slot.active == 0 and (not slot.healthy or slot.exhausted):
+                        try:
+                            await slot.launch(self._playwright)
+                        except Exception as e:
+                            print(f"  [!] Browser relaunch failed: {e}")
+
+    # ── Checkout ───────────────────────────────────────────────────────────
+
+    async def _acquire(self) -> _Slot:
+        async with self._checkout:
+            for slot in sorted(self._slots, key=lambda s: s.active):
+                if not slot.healthy and slot.active == 0:
+                    await slot.launch(self._playwright)
+                elif slot.exhausted and slot.active == 0:
+                    await slot.launch(self._playwright)      # recycle
+                if slot.healthy and not slot.exhausted:
+                    break
+            else:
+                # Every browser is due for recycling but still busy —
+                # overshoot on the least busy one rather than stall.
+                slot = min(self._slots, key=lambda s: s.active)
+                if not slot.healthy:
+                    await slot.launch(self._playwright)
+            slot.active  += 1
+            slot.renders += 1
+            return slot
+
+    async def _release(self, slot: _Slot) -> None:
+        async with self._checkout:
+            slot.active -= 1
+            if slot.active == 0 and (slot.exhausted or not slot.healthy):
+                try:
+                    await slot.launch(self._playwright)
+                except Exception as e:
+                    print(f"  [!] Browser relaunch failed: {e}")
+
+    async def _with_page(self, fn: Callable[["Page"], Awaitable[T]]) -> T:
+        async with self._render_sem:
+            slot = await self._acquire()
+            try:
+                context = await slot.browser.new_context()
+                try:
+                    page = await context.new_page()
+                    result = await fn(page)
+                    self._total_renders += 1
+                    return result
+                finally:
+                    await context.close()
+            finally:
+                await self._release(slot)
+
+    # ── Public API ─────────────────────────────────────────────────────────
+
+    async def with_page(self, fn: Callable[["Page"], Awaitable[T]]) -> T:
+        """
+        Run ``await fn(page)`` on a fresh page in its own browser context and
+        return its result. *fn* executes on the pool's loop; it may be called
+        from any thread or event loop.
+        """
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._with_page(fn), loop)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        return {
+            "started":        self._loop is not None,
+            "size":           self.size,
+            "max_concurrent": self.max_concurrent,
+            "in_use":         sum(s.active for s in self._slots),
+            "renders":        self._total_renders,
+            "browsers":       [s.as_dict() for s in self._slots],
+        }
+
+    def shutdown(self) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+
+        async def _stop():
+            if self._health_task:
+                self._health_task.cancel()
+            for slot in self._slots:
+                await slot.close()
+            if self._playwright:
+                await self._playwright.stop()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_stop(), loop).result(timeout=10)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        self._loop = None
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+pool = BrowserPool()
+atexit.register(pool.shutdown)
+
+
+async def with_page(fn: Callable[["Page"], Awaitable[T]]) -> T:
+    return await pool.with_page(fn)
+
+
+def stats() -> Dict:
+    return pool.stats()
@@ -0,0 +1,184 @@
+"""
+cpu_pool.py — Process pool for CPU-bound work
+----------------------------------------------
+Provides:
+  - A lazily created, process-wide ProcessPoolExecutor for work that would
+    otherwise hold the GIL inside the Flask process (feed parsing, article
+    body extraction and batch summaries)
+  - Sized from the CPUs this container may actually use: the scheduler
+    affinity mask and the cgroup CPU quota, not the host's core count
+  - Workers started from a fork server (or spawned), never forked from the
+    threaded server process — see CPU_POOL_START_METHOD
+  - Worker recycling: each worker is replaced after CPU_POOL_MAX_TASKS tasks
+    (max_tasks_per_child), so memory leaked by lxml / newspaper3k inside a
+    worker does not accumulate
+  - Transparent fallback to in-process execution when the pool is disabled
+    (CPU_POOL_WORKERS=0) or a worker dies
+
+Functions sent to the pool must be importable top-level callables living in
+light modules (extract.py, feed_parse.py) — never in main.py, which pulls in
+the whole pipeline. Their arguments and results are pickled, so ship raw
+bytes in and compact dicts out. Metrics observed inside a worker stay in
+that worker; time the call in the parent instead.
+
+Each worker also re-imports the parent's entry script as __mp_main__ when it
+starts, which is why importing server.py must not start threads or
+background work. That script must be a real file: `python3 server.py`,
+gunicorn / uvicorn (the entry script is theirs) and `python -c` all work,
+but code piped in on stdin (`python - < script.py`) does not — every worker
+fails with FileNotFoundError: '<stdin>' and the pool falls back to running
+each task in-process.
+
+Environment variables:
+    CPU_POOL_WORKERS      Worker processes (default: available CPUs, see
+                          available_cpus()). 0 runs everything in-process
+    CPU_POOL_MAX_TASKS    Tasks before a worker is replaced (default 500,
+                          0 = never)
+    CPU_POOL_START_METHOD "forkserver" (default where available) or "spawn"
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+
+# ── CPU detection ─────────────────────────────────────────────────────────────
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota from cgroup v2 (cpu.max) or v1 (cfs quota/period), if set."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on: affinity mask, capped by the cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+#: Worker processes for CPU-bound stages. 0 runs everything in-process.
+CPU_POOL_WORKERS   = int(os.getenv("CPU_POOL_WORKERS", available_cpus()))
+CPU_POOL_MAX_TASKS = int(os.getenv("CPU_POOL_MAX_TASKS", 500))
+
+#: Workers never fork from the server process itself: by the time the pool
+#: starts it runs scrape, feed, prewarm and Playwright threads, and a forked
+#: child can inherit a lock one of them held (logging, SQLite, urllib3's
+#: pools) and deadlock on it. The fork server is a fresh, single-threaded
+#: process the workers fork from instead.
+CPU_POOL_START_METHOD = os.getenv(
+    "CPU_POOL_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+#: Imported once by the fork server, so workers start with them loaded.
+CPU_POOL_PRELOAD = ["extract", "feed_parse"]
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_stats = {"tasks": 0, "inline": 0, "broken": 0}
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    context = multiprocessing.get_context(CPU_POOL_START_METHOD)
+    if CPU_POOL_START_METHOD == "forkserver":
+        context.set_forkserver_preload(CPU_POOL_PRELOAD)
+    # max_tasks_per_child cannot be combined with fork.
+    max_tasks = CPU_POOL_MAX_TASKS if CPU_POOL_MAX_TASKS > 0 and CPU_POOL_START_METHOD != "fork" else None
+    return ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS, mp_context=context,
+                               max_tasks_per_child=max_tasks)
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if CPU_POOL_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool()
+        _stats["tasks"] += 1
+        return _pool
+
+
+def _reset_pool() -> None:
+    """Drop a broken pool so the next submit starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        broken, _pool = _pool, None
+        _stats["broken"] += 1
+    if broken is not None:
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_inline(fn: Callable, *args) -> Future:
+    with _pool_lock:
+        _stats["inline"] += 1
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except BaseException as e:
+        future.set_exception(e)
+    return future
+
+
+def submit(fn: Callable, *args) -> Future:
+    """Run ``fn(*args)`` in a worker process (or inline when the pool is off)."""
+    pool = _get_pool()
+    if pool is None:
+        return _run_inline(fn, *args)
+    try:
+        return pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _reset_pool()
+        return _run_inline(fn, *args)
+    except RuntimeError:
+        # Shut down underneath us (reset by another thread, or exiting).
+        return _run_inline(fn, *args)
+
+
+def run(fn: Callable, *args):
+    """
+    Blocking helper: run ``fn(*args)`` in the pool and return its result,
+    retrying in-process if the worker crashed underneath us.
+    """
+    try:
+        return submit(fn, *args).result()
+    except BrokenProcessPool:
+        _reset_pool()
+        return _run_inline(fn, *args).result()
+
+
+def stats() -> Dict:
+    """Pool size and counters (tasks sent to workers, inline runs, broken pools)."""
+    with _pool_lock:
+        return {"workers": max(CPU_POOL_WORKERS, 0), **_stats}
@@ -0,0 +1,266 @@
+"""
+dns_cache.py — Shared DNS cache for the SSRF checks and the HTTP client
+------------------------------------------------------------------------
+Provides:
+  - resolve(): hostname -> addresses, cached for the record's TTL. The SSRF
+    check (security.check_url_safe) and http_client's connections read the
+    same entry, so a host is resolved once and connections go to the
+    addresses that were checked, not to a second, unchecked answer
+  - resolve_many() / resolve_many_async(): a batch of hostnames resolved
+    concurrently on an asyncio loop (validate_feed_urls resolves the whole
+    feed list at once instead of one blocking lookup after another)
+  - Concurrent lookups of the same host share one query (singleflight.dns)
+  - Hit / miss / failure counters; lookup wall time is recorded as the
+    "dns" stage, so it shows up in Server-Timing and the stage histogram
+
+Record TTLs come from dnspython when it is installed; otherwise
+getaddrinfo() is used and every answer is kept DNS_CACHE_TTL seconds. Either
+way the TTL is clamped to [DNS_CACHE_MIN_TTL, DNS_CACHE_MAX_TTL]: the floor
+stops a zero-TTL record from changing between the SSRF check and the
+connection (DNS rebinding), the ceiling bounds how stale an address gets.
+
+Typical use:
+
+    addresses = dns_cache.resolve("example.com")     # ["93.184.215.14", ...]
+    dns_cache.resolve_many(["a.com", "b.com"])       # {"a.com": [...], ...}
+
+Environment variables:
+    DNS_CACHE_TTL            TTL when the record's own is unknown (default 300)
+    DNS_CACHE_MIN_TTL        Floor applied to every TTL (default 30)
+    DNS_CACHE_MAX_TTL        Ceiling applied to every TTL (default 3600)
+    DNS_CACHE_NEGATIVE_TTL   Seconds a failed lookup is remembered (default 10)
+    DNS_CACHE_MAX_HOSTS      Hosts kept (default 4096). 0 disables caching
+    DNS_RESOLVE_WORKERS      Lookups run at once by resolve_many (default 10)
+"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import metrics
+import singleflight
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+DNS_CACHE_TTL          = int(os.getenv("DNS_CACHE_TTL", 300))
+DNS_CACHE_MIN_TTL      = int(os.getenv("DNS_CACHE_MIN_TTL", 30))
+DNS_CACHE_MAX_TTL      = int(os.getenv("DNS_CACHE_MAX_TTL", 3600))
+DNS_CACHE_NEGATIVE_TTL = int(os.getenv("DNS_CACHE_NEGATIVE_TTL", 10))
+DNS_CACHE_MAX_HOSTS    = int(os.getenv("DNS_CACHE_MAX_HOSTS", 4096))
+
+#: Lookups in flight at once for a batch. Matches security.MAX_FEEDS.
+DNS_RESOLVE_WORKERS = int(os.getenv("DNS_RESOLVE_WORKERS", 10))
+
+
+# ── Lookups ───────────────────────────────────────────────────────────────────
+
+def _unique(addresses: Iterable[str]) -> List[str]:
+    """Deduplicate, keeping the resolver's preference order."""
+    return list(dict.fromkeys(addresses))
+
+
+def _query_getaddrinfo(host: str) -> Tuple[List[str], Optional[int]]:
+    try:
+        results = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return [], None
+    return _unique(r[4][0] for r in results), None
+
+
+def _query_dnspython(host: str) -> Optional[Tuple[List[str], Optional[int]]]:
+    """A and AAAA with their TTL, or None to fall back to getaddrinfo()."""
+    try:
+        import dns.exception
+        import dns.resolver
+    except ImportError:
+        return None
+    addresses: List[str] = []
+    ttls: List[int] = []
+    for rdtype in ("A", "AAAA"):
+        try:
+            answer = dns.resolver.resolve(host, rdtype, search=True)
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
+            continue
+        except dns.exception.DNSException:
+            return None
+        addresses.extend(r.address for r in answer)
+        ttls.append(answer.rrset.ttl)
+    if not addresses:
+        return None     # e.g. names only /etc/hosts knows
+    return _unique(addresses), min(ttls)
+
+
+def _query(host: str) -> Tuple[List[str], Optional[int]]:
+    """Addresses of *host* and the record TTL in seconds (None if unknown)."""
+    return _query_dnspython(host) or _query_getaddrinfo(host)
+
+
+def _literal(host: str) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address(host.strip("[]")))
+    except ValueError:
+        return None
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+class DnsCache:
+    """Hostname -> (expires_at, addresses), TTL-bounded and LRU-capped."""
+
+    def __init__(self, max_hosts: int = DNS_CACHE_MAX_HOSTS, default_ttl: int = DNS_CACHE_TTL,
+                 min_ttl: int = DNS_CACHE_MIN_TTL, max_ttl: int = DNS_CACHE_MAX_TTL,
+                 negative_ttl: int = DNS_CACHE_NEGATIVE_TTL):
+        self.max_hosts    = max_hosts
+        self.default_ttl  = default_ttl
+        self.min_ttl      = min_ttl
+        self.max_ttl      = max_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[str, ...]]]" = OrderedDict()
+        self._lock     = threading.Lock()
+        self._hits     = 0
+        self._misses   = 0
+        self._failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_hosts > 0
+
+    def _cached(self, host: str) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[host]
+                return None
+            self._entries.move_to_end(host)
+            self._hits += 1
+            return entry[1]
+
+    def _store(self, host: str, addresses: List[str], ttl: Optional[int]) -> None:
+        if addresses:
+            ttl = min(max(ttl if ttl is not None else self.default_ttl, self.min_ttl), self.max_ttl)
+        else:
+            ttl = self.negative_ttl
+        with self._lock:
+            self._entries[host] = (time.monotonic() + ttl, tuple(addresses))
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_hosts:
+                self._entries.popitem(last=False)
+
+    def _lookup(self, host: str) -> List[str]:
+        """Cached addresses of *host*, querying once (shared) on a miss."""
+        host = host.rstrip(".").lower()
+        literal = _literal(host)
+        if literal is not None:
+            return [literal]
+        if self.enabled:
+            cached = self._cached(host)
+            if cached is not None:
+                return list(cached)
+
+        def query() -> List[str]:
+            addresses, ttl = _query(host)
+            with self._lock:
+                self._misses += 1
+                self._failures += not addresses
+            if self.enabled:
+                self._store(host, addresses, ttl)
+            return addresses
+
+        addresses, _shared = singleflight.dns.do(host, query)
+        return list(addresses)
+
+    def resolve(self, host: str) -> List[str]:
+        """Addresses of *host* (empty if it does not resolve)."""
+        started = time.perf_counter()
+        try:
+            return self._lookup(host)
+        finally:
+            metrics.observe("dns", time.perf_counter() - started)
+
+    async def resolve_many_async(self, hosts: Iterable[str]) -> Dict[str, List[str]]:
+        """Resolve every host in *hosts* concurrently; returns host -> addresses."""
+        unique = list(dict.fromkeys(hosts))
+        loop   = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(_executor, self._lookup, host) for host in unique)
+            )
+        finally:
+            metrics.observe("dns", time.perf_counter() - started)
+        return dict(zip(unique, results))
+
+    def resolve_many(self, hosts: Iterable[str]) -> Dict[str, List[str]]:
+        """
+        Blocking form of resolve_many_async() for synchronous callers. Hosts
+        already cached are answered here; only the rest start an event loop.
+        """
+        results: Dict[str, List[str]] = {}
+        pending: List[str] = []
+        for host in dict.fromkeys(hosts):
+            cached = self._cached(host.rstrip(".").lower()) if self.enabled else None
+            if cached is not None:
+                results[host] = list(cached)
+            else:
+                pending.append(host)
+        if not pending:
+            return results
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            results.update(asyncio.run(self.resolve_many_async(pending)))
+        else:
+            # Already on an event loop, which asyncio.run() cannot nest in
+            # (async callers should await resolve_many_async()): resolve in
+            # this thread instead.
+            results.update((host, self.resolve(host)) for host in pending)
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits, misses, failures = self._hits, self._misses, self._failures
+            hosts = len(self._entries)
+        total = hits + misses
+        return {
+            "hits":      hits,
+            "misses":    misses,
+            "failures":  failures,
+            "hosts":     hosts,
+            "hit_ratio": round(hits / total, 3) if total else 0.0,
+        }
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+_executor = ThreadPoolExecutor(max_workers=max(1, DNS_RESOLVE_WORKERS), thread_name_prefix="dns")
+
+cache = DnsCache()
+
+
+def resolve(host: str) -> List[str]:
+    return cache.resolve(host)
+
+
+def resolve_many(hosts: Iterable[str]) -> Dict[str, List[str]]:
+    return cache.resolve_many(hosts)
+
+
+async def resolve_many_async(hosts: Iterable[str]) -> Dict[str, List[str]]:
+    return await cache.resolve_many_async(hosts)
+
+
+def stats() -> Dict:
+    return cache.stats()
@@ -0,0 +1,359 @@
+"""
+extract.py — Single-parse article extraction for Digest
+--------------------------------------------------------
+Provides:
+  - extract_article(): turns an article page into the dict scrape_article
+    returns, parsing the HTML exactly once with lxml
+  - One pass over <head> collects every meta tag we use (og:/twitter:/name=)
+    instead of a find() per key
+  - HeadScanner: an incremental parser for streamed responses that says
+    when <head> has closed with every required meta tag, so the caller can
+    stop downloading the body
+  - newspaper3k body extraction only when the meta tags leave the title,
+    summary or image missing — it re-parses the page, so it is the
+    fallback, not the default
+  - ``extraction`` on every result records the path taken:
+        "meta"            head meta tags were enough
+        "body"            newspaper3k filled gaps from the article body
+        "body+summary"    ...and summarize.py picked the summary sentences
+        "body+nlp"        ...and newspaper3k's NLP summariser produced it
+                          (SUMMARIZER=newspaper only)
+        "body+text"       ...and the summary is the first long paragraphs
+        "failed"          nothing parseable (scrape_article also uses this
+                          when the fetch itself fails)
+  - complete_summaries(): summarises every fallback page of a fetch in one
+    batch — pass ``defer_summary=True`` to leave the body text on the result
+    (``summary_text``) until then
+
+Pure functions over bytes with a picklable result, so extraction can run in
+a worker process. newspaper3k (and through it NLTK) is imported only when a
+page actually needs the fallback.
+
+Environment variables:
+    SUMMARIZER      "builtin" (default: summarize.py, no NLTK data needed) or
+                    "newspaper" (Article.nlp(), the previous behaviour)
+"""
+
+import os
+import unicodedata
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+
+import bootstrap
+import summarize
+
+
+SUMMARIZER = os.getenv("SUMMARIZER", "builtin").lower()
+
+#: Shorter generated summaries are discarded for the paragraph fallback.
+MIN_SUMMARY_CHARS = 80
+
+
+# ── Meta keys (in priority order) ─────────────────────────────────────────────
+
+META_PRIORITY = [
+    "og:description",
+    "twitter:description",
+    "description"
+]
+
+AUTHOR_META_KEYS = [
+    "author",
+    "article:author"
+]
+
+IMAGE_META_KEYS = [
+    "og:image",
+    "twitter:image"
+]
+
+TITLE_META_KEYS = [
+    "og:title",
+    "twitter:title"
+]
+
+SITE_NAME_KEYS = ["og:site_name"]
+
+PUBLISHED_META_KEYS = ["article:published_time", "og:published_time", "pubdate"]
+
+_WANTED_KEYS = set(
+    META_PRIORITY + AUTHOR_META_KEYS + IMAGE_META_KEYS + TITLE_META_KEYS
+    + SITE_NAME_KEYS + PUBLISHED_META_KEYS
+)
+
+#: Meta keys that, once all present, make the body download unnecessary.
+REQUIRED_META = (TITLE_META_KEYS, META_PRIORITY, IMAGE_META_KEYS)
+
+#: Cheap in-page byline selectors tried before giving up on authors.
+_BYLINE_XPATH = (
+    "//*[@rel='author' or @itemprop='author']"
+    " | //*[contains(concat(' ', normalize-space(@class), ' '), ' byline ')]//a"
+)
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+def clean_text(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    for old, new in {
+        "\u2013": "-", "\u2014": "-",
+        "\u2018": "'", "\u2019": "'",
+        "\u201c": '"', "\u201d": '"',
+    }.items():
+        text = text.replace(old, new)
+    return text.strip()
+
+
+def parse_html(content: bytes, encoding: Optional[str] = None):
+    """
+    Parse page bytes with lxml. *encoding* (from the HTTP Content-Type) wins;
+    otherwise lxml honours the document's own <meta charset>.
+    """
+    parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+    return lxml.html.document_fromstring(content, parser=parser)
+
+
+def _add_meta(found: Dict[str, List[str]], tag) -> None:
+    content = (tag.get("content") or "").strip()
+    if not content:
+        return
+    for attr in ("property", "name"):
+        key = (tag.get(attr) or "").strip().lower()
+        if key in _WANTED_KEYS:
+            found.setdefault(key, []).append(content)
+
+
+def collect_meta(doc) -> Dict[str, List[str]]:
+    """
+    Single pass over the <meta> tags in <head> (whole document if there is
+    no head), returning ``{key: [content, ...]}`` for the keys we use.
+    """
+    head  = doc.find("head")
+    scope = head if head is not None and len(head) else doc
+    found: Dict[str, List[str]] = {}
+    for tag in scope.iter("meta"):
+        _add_meta(found, tag)
+    return found
+
+
+def first_meta(meta: Dict[str, List[str]], keys: List[str]) -> Optional[str]:
+    for key in keys:
+        if meta.get(key):
+            return meta[key][0]
+    return None
+
+
+def meta_authors(meta: Dict[str, List[str]]) -> List[str]:
+    authors: List[str] = []
+    for key in AUTHOR_META_KEYS:
+        for value in meta.get(key, []):
+            if value not in authors and not value.startswith("http"):
+                authors.append(value)
+    return authors
+
+
+def byline_authors(doc) -> List[str]:
+    authors: List[str] = []
+    try:
+        nodes = doc.xpath(_BYLINE_XPATH)
+    except etree.XPathError:
+        return authors
+    for node in nodes[:5]:
+        name = clean_text(node.text_content())
+        if name and len(name) < 80 and name not in authors:
+            authors.append(name)
+    return authors
+
+
+# ── Streaming ─────────────────────────────────────────────────────────────────
+
+class HeadScanner:
+    """
+    Feed a page's bytes as they arrive; meta tags are collected while the
+    parser runs. ``head_complete`` turns true once </head> has been parsed
+    and every REQUIRED_META group has a value — at that point the rest of
+    the body adds nothing to a "meta" extraction.
+
+    After </head> the bytes are only buffered, not parsed: extract() is for
+    head-complete pages, and anything else goes through extract_article()
+    on ``content`` (in a worker process — see main.scrape_article).
+
+        scanner = HeadScanner(encoding)
+        for chunk in resp.iter_content(16384):
+            scanner.feed(chunk)
+            if scanner.head_complete:
+                break
+        if scanner.head_complete:
+            result = scanner.extract(url)
+        else:
+            result = extract_article(scanner.content, url, encoding)
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        kwargs = {"encoding": encoding} if encoding else {}
+        self.encoding  = encoding
+        self.meta:     Dict[str, List[str]] = {}
+        self.head_done = False
+        self._chunks:  List[bytes] = []
+        self._parser   = etree.HTMLPullParser(events=("end",), tag=("meta", "head"), **kwargs)
+        # lxml.html elements (text_content() etc.), as parse_html() returns.
+        self._parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+
+    def feed(self, chunk: bytes) -> None:
+        self._chunks.append(chunk)
+        if self.head_done:
+            return
+        self._parser.feed(chunk)
+        for _event, element in self._parser.read_events():
+            if element.tag == "head":
+                self.head_done = True
+            elif not self.head_done:
+                _add_meta(self.meta, element)
+
+    @property
+    def head_complete(self) -> bool:
+        return self.head_done and all(first_meta(self.meta, keys) for keys in REQUIRED_META)
+
+    @property
+    def content(self) -> bytes:
+        return b"".join(self._chunks)
+
+    def extract(self, url: str, summary_sentences: int = 3, defer_summary: bool = False) -> Dict:
+        """Extract from the streamed <head> (see extract_article)."""
+        try:
+            doc = self._parser.close()
+        except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+            return empty_result("failed")
+        if doc is None:
+            return empty_result("failed")
+        # <meta> outside <head> was skipped while streaming; collect_meta
+        # falls back to everything parsed when there is no head at all.
+        meta   = self.meta if self.head_done else collect_meta(doc)
+        result = _extract(doc, meta, self.content, url, self.encoding, summary_sentences)
+        return result if defer_summary else complete_summaries([result], summary_sentences)[0]
+
+
+# ── Extraction ────────────────────────────────────────────────────────────────
+
+def extract_article(
+    content: bytes,
+    url: str,
+    encoding: Optional[str] = None,
+    summary_sentences: int = 3,
+    defer_summary: bool = False,
+) -> Dict:
+    """
+    Extract title / summary / image / authors / published_at / site_name from
+    a fetched article page. An empty or unparseable page yields empty fields
+    with ``extraction`` set to "failed".
+
+    With *defer_summary*, a page that needs a generated summary keeps its
+    body text in ``summary_text`` for a later complete_summaries() call.
+    """
+    try:
+        doc = parse_html(content, encoding)
+    except (etree.ParserError, ValueError):
+        return empty_result("failed")
+    result = _extract(doc, collect_meta(doc), content, url, encoding, summary_sentences)
+    return result if defer_summary else complete_summaries([result], summary_sentences)[0]
+
+
+def complete_summaries(results: List[Dict], summary_sentences: int = 3) -> List[Dict]:
+    """
+    Fill in the summary of every result still carrying ``summary_text``,
+    scoring all of them in one summarize_batch() call. Pages whose
+    generated summary is too short fall back to their leading paragraphs.
+    Updates the dicts in place and returns *results*.
+    """
+    pending = [r for r in results if "summary_text" in r]
+    if not pending:
+        return results
+    summaries = summarize.summarize_batch(
+        [(r["title"] or "", r["summary_text"]) for r in pending], summary_sentences
+    )
+    for result, summary in zip(pending, summaries):
+        text = result.pop("summary_text")
+        if len(summary) > MIN_SUMMARY_CHARS:
+            result["summary"]    = clean_text(summary)
+            result["extraction"] = "body+summary"
+        else:
+            _paragraph_summary(result, text, summary_sentences)
+    return results
+
+
+def _paragraph_summary(result: Dict, text: str, summary_sentences: int) -> None:
+    paragraphs = [p.strip() for p in text.split("\n") if len(p.strip()) > 60]
+    if paragraphs:
+        result["summary"]    = clean_text(" ".join(paragraphs[:summary_sentences]))
+        result["extraction"] = "body+text"
+
+
+def empty_result(extraction: str) -> Dict:
+    return {
+        "title":        None,
+        "top_image":    None,
+        "summary":      "",
+        "authors":      [],
+        "published_at": None,
+        "site_name":    None,
+        "extraction":   extraction,
+    }
+
+
+def _extract(
+    doc,
+    meta: Dict[str, List[str]],
+    content: bytes,
+    url: str,
+    encoding: Optional[str],
+    summary_sentences: int,
+) -> Dict:
+    result = empty_result("meta")
+    result["title"]        = first_meta(meta, TITLE_META_KEYS)
+    result["summary"]      = clean_text(first_meta(meta, META_PRIORITY) or "")
+    result["top_image"]    = first_meta(meta, IMAGE_META_KEYS)
+    result["site_name"]    = first_meta(meta, SITE_NAME_KEYS)
+    result["published_at"] = first_meta(meta, PUBLISHED_META_KEYS)
+    result["authors"]      = meta_authors(meta) or byline_authors(doc)
+
+    if result["title"] and result["summary"] and result["top_image"]:
+        return result
+
+    # --- NEWSPAPER3K FALLBACK (body extraction, second parse) ---
+    from newspaper import Article
+
+    result["extraction"] = "body"
+    html = content.decode(encoding or "utf-8", errors="replace")
+    art  = Article(url)
+    art.download(input_html=html)
+    art.parse()
+
+    result["title"]     = result["title"] or art.title or None
+    result["top_image"] = result["top_image"] or art.top_image or None
+    result["authors"]   = result["authors"] or art.authors or []
+
+    if result["summary"]:
+        return result
+
+    # --- NLP ONLY IF STILL NO SUMMARY ---
+    if SUMMARIZER == "newspaper":
+        if "missing" not in bootstrap.ensure_nltk().values():
+            try:
+                art.nlp()
+                if art.summary and len(art.summary) > MIN_SUMMARY_CHARS:
+                    result["summary"]    = clean_text(art.summary)
+                    result["extraction"] = "body+nlp"
+                    return result
+            except Exception:
+                pass
+        _paragraph_summary(result, art.text or "", summary_sentences)
+        return result
+
+    # Summarised (or paragraph fallback) in complete_summaries().
+    result["summary_text"] = art.text or ""
+    return result
+
@@ -0,0 +1,107 @@
+"""
+feed_fetch.py — Feed download & parsing stage for Digest
+---------------------------------------------------------
+Provides:
+  - download_feed():  raw bytes over HTTP (I/O-bound, runs on a thread pool)
+  - parse_feed():     feedparser on those bytes (CPU-bound, runs in cpu_pool;
+                      defined in feed_parse.py so workers stay light)
+  - submit_feed():    both stages chained, returning a Future per feed so the
+                      caller can start scraping feed A while B is downloading;
+                      concurrent requests for the same feed share one fetch
+                      (singleflight.feeds)
+  - Conditional GETs against feed_store: an unchanged feed (304) is served
+    from the stored parse without downloading or re-parsing it
+
+Parsed feeds are returned in a compact, picklable shape:
+
+    {"title": str, "error": str | None,
+     "entries": [{"title": str, "link": str, "published": iso | None}]}
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import article_cache
+import cpu_pool
+import feed_store
+import http_client
+import metrics
+import singleflight
+from feed_parse import parse_entry_date, parse_feed  # re-exported for existing callers
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+#: Concurrent feed downloads. Matches security.MAX_FEEDS so a full request
+#: downloads every feed at once.
+FEED_FETCH_WORKERS = int(os.getenv("FEED_FETCH_WORKERS", 10))
+
+# Sent on top of http_client's browser headers — many RSS endpoints 403
+# bot user-agents, and some only serve XML when asked for it.
+FEED_HEADERS = {
+    "Accept": "application/rss+xml, application/atom+xml, application/xml, text/xml, */*",
+}
+
+
+# ── Stages ────────────────────────────────────────────────────────────────────
+
+def download_feed(url: str, validators: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Fetch a feed and return its body plus the headers feedparser and the
+    feed store care about. With *validators* the request is conditional and
+    ``status`` may be 304 with an empty body.
+    """
+    with metrics.stage("feed_download", host=metrics.host_of(url), kind="feed"):
+        resp = http_client.get(url, headers={**FEED_HEADERS, **(validators or {})})
+        resp.raise_for_status()
+    return {
+        "url":           resp.url,
+        "status":        resp.status_code,
+        "content":       resp.content,
+        "content_type":  resp.headers.get("Content-Type", ""),
+        "etag":          resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+
+
+def load_feed(url: str) -> Dict:
+    """
+    Download + parse one feed. A feed that cannot be fetched yields no
+    entries rather than failing the whole request (as feedparser.parse(url)
+    used to behave).
+    """
+    stored = feed_store.store.get(url)
+    try:
+        raw = download_feed(url, feed_store.conditional_headers(stored))
+    except Exception as e:
+        print(f"  [!] Could not fetch feed {url}: {e}")
+        return {"title": url, "entries": [], "error": str(e)}
+
+    if raw["status"] == 304 and stored:
+        feed_store.store.record("not_modified")
+        feed_store.store.touch(url)
+        return {**stored["feed"], "not_modified": True}
+
+    with metrics.stage("feed_parse"):
+        feed = cpu_pool.run(parse_feed, raw, url)
+    feed_store.store.record("full")
+    if not feed["error"] and (raw["etag"] or raw["last_modified"]):
+        feed_store.store.put(url, feed, raw["etag"], raw["last_modified"])
+    return feed
+
+
+# ── Shared executor ───────────────────────────────────────────────────────────
+
+_executor = ThreadPoolExecutor(max_workers=FEED_FETCH_WORKERS, thread_name_prefix="feed")
+
+
+def submit_feed(url: str) -> Future:
+    """
+    Start download + parse of *url* in the background, or join the fetch of
+    the same (normalised) URL another request already started.
+    """
+    future, _shared = singleflight.feeds.submit(
+        article_cache.normalize_url(url), lambda: _executor.submit(load_feed, url),
+    )
+    return future
@@ -0,0 +1,67 @@
+"""
+feed_parse.py — Feed parsing for Digest (cpu_pool worker side)
+---------------------------------------------------------------
+Provides:
+  - parse_feed():       feedparser on downloaded feed bytes, returning the
+                        compact, picklable shape feed_fetch hands around
+  - parse_entry_date(): the entry's publication date, from whichever field
+                        the feed filled in
+
+cpu_pool workers import this module to run parse_feed(), so it imports
+nothing from the pipeline itself (no HTTP client, caches or metrics) — only
+the standard library, and feedparser when a feed is actually parsed. That
+keeps the pickled call cheap to resolve; it does not make the workers light,
+since each one also re-imports the parent's entry script (server.py and the
+pipeline behind it) as __mp_main__, see cpu_pool.py. The download side lives
+in feed_fetch.py.
+"""
+
+import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+def parse_entry_date(entry) -> Optional[datetime.datetime]:
+    for attr in ("published", "updated"):
+        raw = getattr(entry, attr, None)
+        if raw:
+            try:
+                return parsedate_to_datetime(raw)
+            except Exception:
+                pass
+    for attr in ("published_parsed", "updated_parsed"):
+        parsed = getattr(entry, attr, None)
+        if parsed:
+            try:
+                return datetime.datetime(*parsed[:6], tzinfo=datetime.timezone.utc)
+            except Exception:
+                pass
+    return None
+
+
+def parse_feed(raw: Dict, feed_url: str) -> Dict:
+    """
+    Parse downloaded feed bytes. Runs in a worker process.
+
+    ``error`` is set when feedparser flagged the document as malformed and
+    recovered no entries from it.
+    """
+    import feedparser   # only parsing processes pay for it
+
+    feed = feedparser.parse(
+        raw["content"],
+        response_headers={
+            "content-type":     raw.get("content_type", ""),
+            "content-location": raw.get("url", feed_url),
+        },
+    )
+    entries = []
+    for entry in feed.entries:
+        pub_date = parse_entry_date(entry)
+        entries.append({
+            "title":     entry.get("title", "(No title)"),
+            "link":      entry.get("link", ""),
+            "published": pub_date.isoformat() if pub_date else None,
+        })
+    error = str(feed.bozo_exception) if feed.bozo and not entries else None
+    return {"title": feed.feed.get("title", feed_url), "entries": entries, "error": error}
@@ -0,0 +1,124 @@
+"""
+feed_store.py — Conditional-GET store for RSS/Atom feeds
+---------------------------------------------------------
+Provides:
+  - Per-feed-URL storage of the last response validators (ETag and
+    Last-Modified) together with the already-parsed, compact feed
+  - conditional_headers():  If-None-Match / If-Modified-Since for a feed
+  - A 304 Not Modified reuses the stored parse, skipping both the body
+    download and feedparser
+  - Expiry: each write deletes feeds nobody has fetched for
+    FEED_STORE_MAX_AGE (fetched_at is refreshed by full fetches and 304s)
+
+Lives next to the article cache in SQLite, so it survives restarts and is
+shared between worker processes.
+
+Environment variables:
+    FEED_STORE_PATH      SQLite file (default api/cache/feeds.sqlite3)
+    FEED_STORE_MAX_AGE   Seconds an unrequested feed is kept (default 7 days)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+FEED_STORE_PATH = os.getenv(
+    "FEED_STORE_PATH",
+    os.path.join(os.path.dirname(__file__), "cache", "feeds.sqlite3"),
+)
+FEED_STORE_MAX_AGE = int(os.getenv("FEED_STORE_MAX_AGE", 7 * 24 * 60 * 60))
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+
+class FeedStore:
+    """SQLite store of feed validators + parsed entries, keyed by feed URL."""
+
+    def __init__(self, path: str = FEED_STORE_PATH, max_age: int = FEED_STORE_MAX_AGE):
+        self.path    = path
+        self.max_age = max_age
+        self._local  = threading.local()
+        self._lock   = threading.Lock()
+        self._counts = {"not_modified": 0, "full": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS feeds ("
+                " url TEXT PRIMARY KEY,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " feed TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return {"etag", "last_modified", "feed", "fetched_at"} or None."""
+        try:
+            row = self._conn().execute(
+                "SELECT etag, last_modified, feed, fetched_at FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"  [!] Feed store read failed: {e}")
+            return None
+        if not row:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "feed": json.loads(row[2]), "fetched_at": row[3]}
+
+    def put(self, url: str, feed: Dict, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store *feed* for *url*, dropping feeds not fetched within max_age."""
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO feeds (url, etag, last_modified, feed, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(feed), now),
+            )
+            # One row per feed URL, so the scan is cheap next to the download.
+            conn.execute("DELETE FROM feeds WHERE fetched_at < ?", (now - self.max_age,))
+        except sqlite3.Error as e:
+            print(f"  [!] Feed store write failed: {e}")
+
+    def touch(self, url: str) -> None:
+        """Record a successful revalidation (304) without rewriting the feed."""
+        try:
+            self._conn().execute("UPDATE feeds SET fetched_at = ? WHERE url = ?", (time.time(), url))
+        except sqlite3.Error as e:
+            print(f"  [!] Feed store write failed: {e}")
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+def conditional_headers(stored: Optional[Dict]) -> Dict[str, str]:
+    """Validators to send for a feed we already hold, if any."""
+    headers: Dict[str, str] = {}
+    if stored:
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+    return headers
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+store = FeedStore()
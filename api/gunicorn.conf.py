@@ -0,0 +1,53 @@
+"""
+gunicorn.conf.py — Gunicorn settings for `gunicorn server:app`
+--------------------------------------------------------------
+Gunicorn reads ./gunicorn.conf.py from its working directory on its own;
+the systemd unit in README.md (WorkingDirectory=api) also passes it with -c.
+
+Provides:
+  - Thread workers: a gthread worker keeps serving while job event streams
+    (/api/jobs/<id>/events) are open. The default sync worker would block
+    on one stream and be killed by its timeout, taking its jobs with it
+  - One worker by default. More workers need a shared job store
+    (JOB_STORE_URL, which defaults to TOKEN_STORE_URL: sqlite:// or
+    redis://) so any worker can answer for a job another one runs; with
+    the memory:// default each job is known only to its own worker, and
+    on_starting warns about that
+  - post_worker_init: starts the prewarm scheduler and bootstrap's warm-up
+    in each worker as soon as it has loaded the app, before its first
+    request (server.py also starts them on a worker's first request, for
+    WSGI servers without this hook). Prewarm's lock file lets one worker
+    poll; the others wait in standby and take over if it exits
+
+Command-line flags still win over these settings.
+
+Environment variables:
+    GUNICORN_WORKERS   Worker processes (default 1; more need a shared
+                       JOB_STORE_URL, see jobs.py)
+    GUNICORN_THREADS   Threads per worker (default 16). Each open event
+                       stream holds one until its job finishes
+    GUNICORN_TIMEOUT   Seconds before a worker that stops heartbeating is
+                       restarted (default 120). With gthread the heartbeat
+                       runs beside the requests, so this is not a limit on
+                       any one request
+"""
+
+import os
+
+workers          = int(os.getenv("GUNICORN_WORKERS", 1))
+worker_class     = "gthread"
+threads          = int(os.getenv("GUNICORN_THREADS", 16))
+timeout          = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
+
+
+def on_starting(server):
+    job_store = os.getenv("JOB_STORE_URL", os.getenv("TOKEN_STORE_URL", "memory://"))
+    if server.cfg.workers > 1 and job_store.startswith("memory://"):
+        print(f"  [!] {server.cfg.workers} workers with JOB_STORE_URL={job_store}: a job is only "
+              "visible to the worker that runs it. Set JOB_STORE_URL=sqlite:// (or redis://).", flush=True)
+
+
+def post_worker_init(worker):
+    import server
+    server.start_background_tasks()
@@ -0,0 +1,274 @@
+"""
+http_client.py — Shared pooled HTTP client for Digest
+------------------------------------------------------
+Provides:
+  - One process-wide requests.Session used by the article scraper, the feed
+    fetcher and /api/validate, so connections (and TLS sessions) to the same
+    publisher are kept alive and reused across articles and requests
+  - Per-host connection pool sizing and configurable connect/read timeouts
+  - Optional HTTP/2 via urllib3's h2 support (HTTP2_ENABLED=true, needs `h2`)
+  - Pool reuse statistics: requests sent vs. TCP connects made, per host.
+    Connects are counted in the connection's connect(), which also catches
+    urllib3 reconnecting a pooled connection whose socket was dropped
+  - Connections pinned to dns_cache's addresses for the host — the same ones
+    security.check_url_safe() validated — so nothing is resolved twice and
+    the address cannot change between the SSRF check and the connect
+  - A connect-time SSRF check: the cache entry may have expired and been
+    re-resolved since check_url_safe() ran (a queued job, a redirect), so
+    every address is checked again and a private or reserved one refuses
+    the connection (BlockedAddressError)
+
+Typical use:
+
+    import http_client
+
+    resp = http_client.get(url)
+    resp.raise_for_status()
+
+    http_client.stats()   # {"requests": 42, "connections": 5, "reused": 37, ...}
+"""
+
+import os
+import socket
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+
+import dns_cache
+import security
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+#: Number of distinct hosts whose connection pools are kept alive.
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", 64))
+
+#: Keep-alive connections kept per host. Matches the scraper's per-host cap.
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", os.getenv("SCRAPE_PER_HOST", 4)))
+
+#: Seconds to establish a connection / wait between bytes of a response.
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT    = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+
+#: Negotiate HTTP/2 over TLS where the server supports it (experimental in
+#: urllib3, requires the `h2` package; silently ignored when unavailable).
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false") == "true"
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-GB,en;q=0.9",
+}
+
+
+# ── Pool statistics ───────────────────────────────────────────────────────────
+
+_stats_lock = threading.Lock()
+_host_stats: Dict[str, Dict[str, int]] = {}
+
+# Connects made by the current thread, for callers that want to attribute
+# them to one request (see thread_connects()).
+_thread_stats = threading.local()
+
+
+def _count(host: str, key: str) -> None:
+    with _stats_lock:
+        entry = _host_stats.setdefault(host, {"requests": 0, "connections": 0, "tls_handshakes": 0})
+        entry[key] += 1
+
+
+def thread_connects() -> Tuple[int, int]:
+    """(TCP connects, TLS handshakes) made so far by the calling thread."""
+    return getattr(_thread_stats, "connects", 0), getattr(_thread_stats, "tls_handshakes", 0)
+
+
+# ── Pinned connections ────────────────────────────────────────────────────────
+
+class BlockedAddressError(NewConnectionError):
+    """A host resolved to a private or reserved address at connect time."""
+
+
+def address_allowed(address: str) -> bool:
+    """Whether a connection to *address* may be opened (the SSRF rule)."""
+    return not security._is_private_ip(address)
+
+
+class _PinnedConnection:
+    """
+    Mixin for urllib3 connection classes: connect to the host's addresses
+    from dns_cache (in order, like create_connection() would) instead of
+    letting the socket layer resolve the name again. The Host header, SNI
+    and certificate checks still use the hostname.
+
+    Also counts every real connect for stats(). A pool only creates a
+    connection object once; when its socket is dropped urllib3 calls
+    connect() on the same object again, so counting new objects undercounts.
+    """
+
+    def connect(self):
+        host = (self.host or "").lower()
+        _count(host, "connections")
+        _thread_stats.connects = getattr(_thread_stats, "connects", 0) + 1
+        if isinstance(self, HTTPSConnection):
+            _count(host, "tls_handshakes")
+            _thread_stats.tls_handshakes = getattr(_thread_stats, "tls_handshakes", 0) + 1
+        return super().connect()
+
+    def _new_conn(self):
+        if getattr(self, "proxy", None) or getattr(self, "_tunnel_host", None):
+            return super()._new_conn()      # the proxy resolves the name
+        host      = self._dns_host
+        addresses = dns_cache.resolve(host)
+        if not addresses:
+            # Not super(): the socket layer would resolve (and connect) unchecked.
+            raise NameResolutionError(host, self, socket.gaierror(f"{host} did not resolve"))
+        blocked = [address for address in addresses if not address_allowed(address)]
+        if blocked:
+            raise BlockedAddressError(
+                self, f"Refusing to connect to {host}: {', '.join(blocked)} is private or reserved",
+            )
+        error = None
+        for address in addresses:
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (ConnectTimeoutError, NewConnectionError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+
+
+_pinned_classes: Dict[type, type] = {}
+_pinned_lock = threading.Lock()
+
+
+def _pinned(connection_cls: type) -> type:
+    """*connection_cls* with _PinnedConnection mixed in (built once per class)."""
+    if issubclass(connection_cls, _PinnedConnection):
+        return connection_cls
+    with _pinned_lock:
+        if connection_cls not in _pinned_classes:
+            _pinned_classes[connection_cls] = type(
+                "Pinned" + connection_cls.__name__, (_PinnedConnection, connection_cls), {},
+            )
+        return _pinned_classes[connection_cls]
+
+
+class _PinnedHTTPPool(HTTPConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ConnectionCls = _pinned(self.ConnectionCls)
+
+
+class _PinnedHTTPSPool(HTTPSConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Resolved per pool, so HTTP/2's injected connection class is kept.
+        self.ConnectionCls = _pinned(self.ConnectionCls)
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections record every TCP connect and go to the
+    DNS-cached (SSRF-checked) address of each host.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http":  _PinnedHTTPPool,
+            "https": _PinnedHTTPSPool,
+        }
+
+    def send(self, request, **kwargs):
+        _count((urlparse(request.url).hostname or "").lower(), "requests")
+        return super().send(request, **kwargs)
+
+
+def stats() -> Dict:
+    """
+    Return pool reuse counters since process start (or the last reset_stats).
+    "connections" is real TCP connects, reconnects of pooled connections
+    included:
+
+        {"requests": int, "connections": int, "tls_handshakes": int, "reused": int,
+         "reuse_ratio": float,
+         "hosts": {host: {"requests", "connections", "tls_handshakes"}}}
+    """
+    with _stats_lock:
+        hosts = {h: dict(v) for h, v in _host_stats.items()}
+    req  = sum(v["requests"] for v in hosts.values())
+    conn = sum(v["connections"] for v in hosts.values())
+    return {
+        "requests":       req,
+        "connections":    conn,
+        "tls_handshakes": sum(v["tls_handshakes"] for v in hosts.values()),
+        "reused":         max(req - conn, 0),
+        "reuse_ratio":    round(max(req - conn, 0) / req, 3) if req else 0.0,
+        "hosts":          hosts,
+    }
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _host_stats.clear()
+
+
+# ── Session ───────────────────────────────────────────────────────────────────
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _enable_http2() -> None:
+    try:
+        import urllib3.http2
+        urllib3.http2.inject_into_urllib3()
+    except Exception as e:
+        print(f"  [!] HTTP/2 unavailable, using HTTP/1.1: {e}")
+
+
+def _build_session() -> requests.Session:
+    if HTTP2_ENABLED:
+        _enable_http2()
+
+    session = requests.Session()
+    adapter = PooledAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_PER_HOST,
+        pool_block=False,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    # The session is shared by every user's request — never carry cookies
+    # from one scrape into another.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared pool with the configured default timeouts."""
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    return get_session().get(url, **kwargs)
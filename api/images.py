@@ -0,0 +1,247 @@
+"""
+images.py — Hero-image proxy & resizing stage for the magazine
+---------------------------------------------------------------
+Provides:
+  - localize_images(): fetches every article's top image once, in parallel
+    (same per-host limits and keep-alive pool as the scraper), before
+    Chromium renders anything
+  - Downscaling + centre-cropping to the box .article-image actually prints
+    (210mm x 68mm, object-fit: cover), re-encoded as progressive JPEG —
+    Chromium embeds JPEG data in the PDF as-is, while other formats are
+    re-compressed losslessly and bloat the file
+  - A disk cache keyed by URL hash, so popular images are processed once,
+    bounded like pdf_cache.py: files unused for IMAGE_CACHE_TTL expire and
+    the least recently used go beyond IMAGE_CACHE_MAX_BYTES (a file's atime
+    is when it was last used). Pruned after a batch that wrote new images,
+    at most once a minute; files used in the last 15 minutes are kept so a
+    render in progress does not lose its images
+  - Results referenced as file:// URLs of the cached JPEGs. build_pdf loads
+    the magazine from a file:// page, so Chromium reads them straight from
+    disk — no base64 copy of every image inflating the HTML by a third
+
+Needs Pillow; without it, articles keep their remote image URLs.
+
+Environment variables:
+    IMAGE_CACHE_DIR        Processed image cache (default api/cache/images)
+    IMAGE_CACHE_TTL        Seconds an unused image is kept (default 7 days)
+    IMAGE_CACHE_MAX_BYTES  Total size bound (default 500 MB)
+    IMAGE_WIDTH            Output width in px (default 1240 — 210mm at 150 dpi)
+    IMAGE_HEIGHT           Output height in px (default 402 — 68mm at 150 dpi)
+    IMAGE_QUALITY          JPEG quality (default 78)
+    IMAGE_MAX_BYTES        Largest source image we will download (default 10 MB)
+    IMAGE_MAX_REDIRECTS    Redirects followed per image (default 3); every
+                           target passes check_url_safe like the original
+"""
+
+import hashlib
+import io
+import os
+import pathlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import http_client
+import metrics
+import scrape_pool
+from security import check_url_safe
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:          # optional — fall back to remote URLs
+    Image = None
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+IMAGE_CACHE_DIR = os.getenv(
+    "IMAGE_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "cache", "images"),
+)
+IMAGE_WIDTH           = int(os.getenv("IMAGE_WIDTH", 1240))
+IMAGE_HEIGHT          = int(os.getenv("IMAGE_HEIGHT", 402))
+IMAGE_QUALITY         = int(os.getenv("IMAGE_QUALITY", 78))
+IMAGE_MAX_BYTES       = int(os.getenv("IMAGE_MAX_BYTES", 10 * 1024 * 1024))
+IMAGE_CACHE_TTL       = int(os.getenv("IMAGE_CACHE_TTL", 7 * 24 * 60 * 60))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+IMAGE_MAX_REDIRECTS   = int(os.getenv("IMAGE_MAX_REDIRECTS", 3))
+
+#: Minimum seconds between cache prunes, and how recently used a file must
+#: be to survive one regardless of TTL and size (renders read it by path).
+_EVICT_INTERVAL = 60
+_IN_USE_SECONDS = 15 * 60
+
+IMAGE_HEADERS = {"Accept": "image/avif,image/webp,image/jpeg,image/png,image/*;q=0.8"}
+
+
+# ── Single image ──────────────────────────────────────────────────────────────
+
+class UnsafeRedirect(Exception):
+    """An image URL redirected to a target check_url_safe refuses."""
+
+
+def _cache_path(url: str) -> str:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(IMAGE_CACHE_DIR, digest[:2], f"{digest}.jpg")
+
+
+def _touch(path: str) -> bool:
+    """Mark a cached image as just used (atime); False if it is not there."""
+    try:
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+        return True
+    except OSError:
+        return False
+
+
+def _download(url: str) -> bytes:
+    # Redirects are followed here, not by requests, so each Location is
+    # checked before we connect to it (http_client re-checks the address).
+    for _hop in range(IMAGE_MAX_REDIRECTS + 1):
+        with http_client.get(url, headers=IMAGE_HEADERS, stream=True, allow_redirects=False) as resp:
+            if resp.is_redirect:
+                url = urljoin(url, resp.headers["Location"])
+                safe, reason = check_url_safe(url)
+                if not safe:
+                    raise UnsafeRedirect(f"redirected to {url}: {reason}")
+                continue
+            resp.raise_for_status()
+            buf = bytearray()
+            for chunk in resp.iter_content(64 * 1024):
+                buf.extend(chunk)
+                if len(buf) > IMAGE_MAX_BYTES:
+                    raise ValueError(f"image larger than {IMAGE_MAX_BYTES // (1024 * 1024)} MB")
+            return bytes(buf)
+    raise ValueError(f"more than {IMAGE_MAX_REDIRECTS} redirects")
+
+
+def _resize(raw: bytes) -> bytes:
+    img = Image.open(io.BytesIO(raw))
+    # JPEG sources can be decoded at a reduced scale — much cheaper for
+    # multi-megapixel hero shots.
+    img.draft("RGB", (IMAGE_WIDTH * 2, IMAGE_HEIGHT * 2))
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (238, 232, 225))   # --paper
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    img = ImageOps.fit(img, (IMAGE_WIDTH, IMAGE_HEIGHT), Image.LANCZOS, centering=(0.5, 0.5))
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=IMAGE_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def process_image(url: str) -> Tuple[Optional[str], str, int]:
+    """
+    Return (jpeg_path | None, outcome, source_bytes) for one image URL.
+    outcome is "cached", "fetched", "unsafe" or "failed".
+    """
+    path = _cache_path(url)
+    if _touch(path):
+        return path, "cached", 0
+
+    safe, _reason = check_url_safe(url)
+    if not safe:
+        return None, "unsafe", 0
+
+    try:
+        with metrics.stage("image_fetch", host=metrics.host_of(url), kind="image"):
+            raw = _download(url)
+        with metrics.stage("image_resize"):
+            data = _resize(raw)
+    except UnsafeRedirect as e:
+        print(f"  [!] Refused image {url}: {e}")
+        return None, "unsafe", 0
+    except Exception as e:
+        print(f"  [!] Could not process image {url}: {e}")
+        return None, "failed", 0
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return path, "fetched", len(raw)
+
+
+# ── Eviction ──────────────────────────────────────────────────────────────────
+
+_evict_lock = threading.Lock()
+_last_evict = 0.0
+
+
+def evict() -> int:
+    """Drop images unused for IMAGE_CACHE_TTL, then LRU ones beyond IMAGE_CACHE_MAX_BYTES."""
+    now = time.time()
+    entries = []
+    for root, _dirs, names in os.walk(IMAGE_CACHE_DIR):
+        for name in names:
+            if not name.endswith(".jpg"):       # .tmp files are writes in progress
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_size, path))
+
+    removed = 0
+    total   = sum(size for _, size, _ in entries)
+    for used, size, path in sorted(entries):
+        if now - used <= _IN_USE_SECONDS:
+            break
+        if now - used <= IMAGE_CACHE_TTL and total <= IMAGE_CACHE_MAX_BYTES:
+            continue
+        try:
+            os.unlink(path)
+            removed += 1
+            total   -= size
+        except OSError:
+            pass
+    return removed
+
+
+def _maybe_evict() -> None:
+    global _last_evict
+    with _evict_lock:
+        if time.time() - _last_evict < _EVICT_INTERVAL:
+            return
+        _last_evict = time.time()
+    evict()
+
+
+# ── Stage ─────────────────────────────────────────────────────────────────────
+
+def localize_images(articles: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """
+    Return (articles, stats) where each article's ``image`` is replaced by
+    the file:// URL of its resized copy when processing succeeded (only a
+    page loaded from file://, as build_pdf's is, can display it). The input
+    list is not modified; failures keep the original URL for the render
+    step to handle.
+    """
+    stats = {"images": 0, "cached": 0, "fetched": 0, "unsafe": 0, "failed": 0,
+             "source_bytes": 0, "output_bytes": 0}
+    if Image is None:
+        return articles, stats
+
+    urls    = list(dict.fromkeys(a["image"] for a in articles if a.get("image")))
+    futures = {url: scrape_pool.submit(url, process_image, url) for url in urls}
+
+    local: Dict[str, str] = {}
+    for url, future in futures.items():
+        path, outcome, source_bytes = future.result()
+        stats[outcome]        += 1
+        stats["source_bytes"] += source_bytes
+        if path:
+            stats["output_bytes"] += os.path.getsize(path)
+            local[url] = pathlib.Path(os.path.abspath(path)).as_uri()
+    stats["images"] = len(urls)
+    if stats["fetched"]:
+        _maybe_evict()
+
+    return [{**a, "image": local.get(a.get("image"), a.get("image"))} for a in articles], stats
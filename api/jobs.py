@@ -0,0 +1,496 @@
+"""
+jobs.py — Background job queue for PDF generation
+--------------------------------------------------
+Provides:
+  - A bounded worker pool that runs generation jobs off the request thread
+  - Queue-depth limiting: submit() raises QueueFull instead of letting a
+    burst of requests pile up unbounded work
+  - Job records polled by id, with result expiry (finished jobs and their
+    PDF files are removed JOB_RESULT_TTL seconds after completion)
+  - A per-job event log (Job.emit / Job.wait_events, or wait_events_async
+    on an event loop) that backs the Server-Sent Events progress stream
+  - Coalescing: submit(..., key=...) returns the job already queued or
+    running under the same key instead of starting a duplicate
+  - A shared job store (JOB_STORE_URL): each job's record and events are
+    mirrored to SQLite or Redis, so any worker process can answer a poll,
+    stream the events or serve the PDF of a job another worker runs
+
+Typical setup in server.py:
+
+    import jobs
+
+    job = jobs.submit(run_generation, feeds, days_back)   # -> Job, queued
+    jobs.get(job.id)                                       # -> Job | None
+
+A job function receives the Job as its first argument and returns a result
+dict; raise JobError for a user-facing failure with an HTTP status. Pass
+``job.emit`` to the pipeline as its progress callback. A result with
+``pdf_cached`` set points at a file owned by pdf_cache.py, which expiry
+leaves in place.
+
+Job ids are 128-bit random tokens, so knowing an id is what grants access
+to a job's status and PDF.
+
+The process that runs a job keeps the live Job and wakes its SSE listeners
+directly. Another process gets a snapshot from the store, and waits for new
+events by polling it every JOB_STORE_POLL_SECONDS. With the default memory://
+store nothing is shared, so a poll that reaches another process gets 404.
+Serve the API from one process in that case (see api/README.md). PDFs are
+written to local files, so a store shared by several hosts also needs
+JOB_OUTPUT_DIR and PDF_CACHE_DIR on a volume they share.
+
+Environment variables:
+    JOB_STORE_URL           memory://, sqlite://<path> or redis://...
+                            (default: TOKEN_STORE_URL, see token_store.py)
+    JOB_STORE_POLL_SECONDS  How often a worker that does not run a job checks
+                            the store for its new events (default 0.5)
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metrics
+import token_store
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+#: Jobs that run at once. Each one drives a Chromium render, so keep it small.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+
+#: Jobs allowed to wait for a worker before new submissions are refused.
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", 20))
+
+#: Seconds a finished job (and its PDF) is kept for polling and download.
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 15 * 60))
+
+#: Where job records live so every worker can read them (see the module doc).
+JOB_STORE_URL = os.getenv("JOB_STORE_URL", token_store.TOKEN_STORE_URL)
+
+#: Poll interval for events of a job run by another worker process.
+JOB_STORE_POLL_SECONDS = float(os.getenv("JOB_STORE_POLL_SECONDS", 0.5))
+
+
+# ── Errors ────────────────────────────────────────────────────────────────────
+
+class QueueFull(Exception):
+    """Raised by submit() when JOB_MAX_QUEUED jobs are already waiting."""
+
+
+class JobError(Exception):
+    """A job failure whose message is safe to show the user."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ── Job record ────────────────────────────────────────────────────────────────
+
+class Job:
+    def __init__(self, key: Optional[str] = None):
+        self.remote      = False           # a snapshot of another process's job
+        self.id          = secrets.token_urlsafe(16)
+        self.key         = key
+        self.status      = "queued"        # queued | running | done | error
+        self.created_at  = time.time()
+        self.started_at:  Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result:      Dict = {}
+        self.error:       Optional[str] = None
+        self.error_code:  Optional[int] = None
+        self.events:      List[Dict] = []
+        self._cond        = threading.Condition()
+        self._waiters:    List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "Job":
+        """A read-only snapshot of a job another process runs (see store)."""
+        job = cls(record["key"])
+        job.__dict__.update(record)
+        job.remote = True
+        return job
+
+    def record(self) -> Dict:
+        """The fields the store keeps (everything but the events)."""
+        return {
+            "id":          self.id,
+            "key":         self.key,
+            "status":      self.status,
+            "created_at":  self.created_at,
+            "started_at":  self.started_at,
+            "finished_at": self.finished_at,
+            "result":      self.result,
+            "error":       self.error,
+            "error_code":  self.error_code,
+        }
+
+    def emit(self, event: str, data: Optional[Dict] = None) -> None:
+        """Append a progress event and wake any SSE listeners."""
+        with self._cond:
+            entry = {
+                "id":    len(self.events) + 1,
+                "event": event,
+                "data":  data or {},
+                "ts":    time.time(),
+            }
+            self.events.append(entry)
+            store.add_event(self.id, entry)
+            self._cond.notify_all()
+            for loop, waiter in self._waiters:
+                loop.call_soon_threadsafe(waiter.set)
+
+    def wait_events(self, after: int, timeout: float) -> List[Dict]:
+        """
+        Return events with id > *after*, blocking up to *timeout* seconds
+        for one to arrive. Returns [] on timeout.
+        """
+        if self.remote:
+            deadline = time.monotonic() + timeout
+            while True:
+                expired = time.monotonic() >= deadline
+                events  = self._stored_events(after, expired)
+                if events or expired:
+                    return events
+                time.sleep(min(JOB_STORE_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > after, timeout=timeout)
+            return self.events[after:]
+
+    async def wait_events_async(self, after: int, timeout: float) -> List[Dict]:
+        """wait_events() for an event loop: waits without holding a thread."""
+        if self.remote:
+            deadline = time.monotonic() + timeout
+            while True:
+                expired = time.monotonic() >= deadline
+                events  = await asyncio.to_thread(self._stored_events, after, expired)
+                if events or expired:
+                    return events
+                await asyncio.sleep(min(JOB_STORE_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            if len(self.events) > after:
+                return self.events[after:]
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._waiters.remove(waiter)
+        with self._cond:
+            return self.events[after:]
+
+    def _stored_events(self, after: int, expired: bool) -> List[Dict]:
+        # A snapshot cannot be notified, so its waits poll the store. Once a
+        # wait times out, a job whose record is gone (expired, or its process
+        # died and the row aged out) ends the stream with a final status.
+        events = store.events(self.id, after)
+        if events or not expired or store.load(self.id) is not None:
+            return events
+        return [{"id": after + 1, "event": "status", "ts": time.time(),
+                 "data": {"status": "error", "error": "Job not found or expired.", "error_code": 404}}]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+    @property
+    def pdf_path(self) -> Optional[str]:
+        return self.result.get("pdf_path")
+
+    def as_dict(self) -> Dict:
+        return {
+            "job_id":      self.id,
+            "status":      self.status,
+            "created_at":  self.created_at,
+            "started_at":  self.started_at,
+            "finished_at": self.finished_at,
+            "error":       self.error,
+            "error_code":  self.error_code,
+            "articles":    self.result.get("articles"),
+            "timings":     self.result.get("timings"),
+        }
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+# Every backend keeps a record (Job.record(), as JSON) and the event list of
+# each job until JOB_RESULT_TTL seconds after its last write.
+
+class MemoryJobStore:
+    """The default: nothing is shared, so only the running process knows a job."""
+
+    def save(self, job: Job) -> None:
+        pass
+
+    def add_event(self, job_id: str, event: Dict) -> None:
+        pass
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        return None
+
+    def events(self, job_id: str, after: int) -> List[Dict]:
+        return []
+
+    def find_unfinished(self, key: str) -> Optional[str]:
+        return None
+
+    def purge(self) -> List[Dict]:
+        return []
+
+
+class SqliteJobStore:
+    """Jobs and their events in the SQLite file the other shared stores use."""
+
+    def __init__(self, path: str = token_store.DEFAULT_SQLITE_PATH):
+        self.path   = path
+        self._local = threading.local()
+        self._lock  = threading.Lock()
+        self._purged_at = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = token_store.connect(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " key TEXT,"
+                " finished INTEGER NOT NULL,"
+                " record TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key) WHERE finished = 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                " job_id TEXT NOT NULL,"
+                " id INTEGER NOT NULL,"
+                " event TEXT NOT NULL,"
+                " PRIMARY KEY (job_id, id))"
+            )
+            self._local.conn = conn
+        return conn
+
+    def save(self, job: Job) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO jobs (id, key, finished, record, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (job.id, job.key, job.finished, json.dumps(job.record()), time.time() + JOB_RESULT_TTL),
+        )
+
+    def add_event(self, job_id: str, event: Dict) -> None:
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO job_events (job_id, id, event) VALUES (?, ?, ?)",
+                     (job_id, event["id"], json.dumps(event)))
+        conn.execute("UPDATE jobs SET expires_at = ? WHERE id = ?", (time.time() + JOB_RESULT_TTL, job_id))
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT record FROM jobs WHERE id = ? AND expires_at >= ?", (job_id, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def events(self, job_id: str, after: int) -> List[Dict]:
+        rows = self._conn().execute(
+            "SELECT event FROM job_events WHERE job_id = ? AND id > ? ORDER BY id", (job_id, after),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def find_unfinished(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT id FROM jobs WHERE key = ? AND finished = 0 AND expires_at >= ?", (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def purge(self) -> List[Dict]:
+        """Delete expired jobs (at most once per PURGE_INTERVAL); their records."""
+        now = time.time()
+        with self._lock:
+            if now - self._purged_at < token_store.PURGE_INTERVAL:
+                return []
+            self._purged_at = now
+        conn = self._conn()
+        rows = conn.execute("SELECT id, record FROM jobs WHERE expires_at < ?", (now,)).fetchall()
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id, _ in rows])
+        conn.executemany("DELETE FROM job_events WHERE job_id = ?", [(job_id,) for job_id, _ in rows])
+        return [json.loads(record) for _, record in rows]
+
+
+class RedisJobStore:
+    """A record key and an event list per job, both with a native TTL."""
+
+    PREFIX = "digest:job:"
+
+    def __init__(self, url: str):
+        import redis    # optional dependency, only needed for this backend
+        self._redis = redis.Redis.from_url(url)
+
+    def save(self, job: Job) -> None:
+        pipe = self._redis.pipeline()
+        pipe.set(self.PREFIX + job.id, json.dumps(job.record()), ex=JOB_RESULT_TTL)
+        if job.key is not None:
+            if job.finished:
+                pipe.delete(self.PREFIX + "key:" + job.key)
+            else:
+                pipe.set(self.PREFIX + "key:" + job.key, job.id, ex=JOB_RESULT_TTL)
+        pipe.execute()
+
+    def add_event(self, job_id: str, event: Dict) -> None:
+        pipe = self._redis.pipeline()
+        pipe.rpush(self.PREFIX + job_id + ":events", json.dumps(event))
+        pipe.expire(self.PREFIX + job_id + ":events", JOB_RESULT_TTL)
+        pipe.expire(self.PREFIX + job_id, JOB_RESULT_TTL)
+        pipe.execute()
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        raw = self._redis.get(self.PREFIX + job_id)
+        return json.loads(raw) if raw else None
+
+    def events(self, job_id: str, after: int) -> List[Dict]:
+        return [json.loads(raw) for raw in self._redis.lrange(self.PREFIX + job_id + ":events", after, -1)]
+
+    def find_unfinished(self, key: str) -> Optional[str]:
+        job_id = self._redis.get(self.PREFIX + "key:" + key)
+        return job_id.decode() if job_id else None
+
+    def purge(self) -> List[Dict]:
+        return []       # Redis expires keys itself
+
+
+def store_from_url(url: str):
+    """Job store for *url* (memory://, sqlite://<path> or redis[s]://...)."""
+    scheme = url.split("://", 1)[0].lower()
+    if scheme == "memory":
+        return MemoryJobStore()
+    if scheme == "sqlite":
+        return SqliteJobStore(token_store.sqlite_path(url))
+    if scheme in ("redis", "rediss"):
+        return RedisJobStore(url)
+    raise ValueError(f"Unsupported JOB_STORE_URL scheme '{scheme}'.")
+
+
+store = store_from_url(JOB_STORE_URL)
+
+
+# ── Queue ─────────────────────────────────────────────────────────────────────
+
+_jobs: Dict[str, Job] = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+
+
+def _remove_result(result: Dict) -> None:
+    path = result.get("pdf_path")
+    if result.get("pdf_cached"):
+        return
+    if path and os.path.exists(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _purge_expired_jobs() -> None:
+    """
+    Drop finished jobs older than JOB_RESULT_TTL (called on submit + get),
+    and the store's expired jobs, whose process may have exited since.
+    """
+    now = time.time()
+    with _lock:
+        expired = [j for j in _jobs.values()
+                   if j.finished and j.finished_at is not None and now - j.finished_at > JOB_RESULT_TTL]
+        for job in expired:
+            del _jobs[job.id]
+    for job in expired:
+        _remove_result(job.result)
+    for record in store.purge():
+        _remove_result(record["result"])
+
+
+def queue_depth() -> int:
+    """Jobs waiting for this process's workers."""
+    with _lock:
+        return sum(1 for j in _jobs.values() if j.status == "queued")
+
+
+def status_counts() -> Dict[str, int]:
+    """Jobs this process holds, by status (for metrics)."""
+    counts = {"queued": 0, "running": 0, "done": 0, "error": 0}
+    with _lock:
+        for job in _jobs.values():
+            counts[job.status] += 1
+    return counts
+
+
+def _run(job: Job, fn: Callable, args: tuple) -> None:
+    job.status     = "running"
+    job.started_at = time.time()
+    store.save(job)
+    metrics.observe("job_queue_wait", job.started_at - job.created_at)
+    job.emit("status", {"status": "running"})
+    status = "error"
+    try:
+        job.result = fn(job, *args) or {}
+        status = "done"
+    except JobError as e:
+        job.error, job.error_code = str(e), e.status_code
+    except Exception as e:
+        job.error, job.error_code = f"Generation failed: {e}", 500
+    finally:
+        # Together under _lock: a finished job always has finished_at, which
+        # _purge_expired_jobs() reads from the polling threads.
+        with _lock:
+            job.finished_at = time.time()
+            job.status      = status
+        store.save(job)
+        metrics.observe("job", job.finished_at - job.started_at)
+        job.emit("status", {"status": job.status, "error": job.error, "error_code": job.error_code})
+
+
+def submit(fn: Callable, *args, key: Optional[str] = None) -> Job:
+    """
+    Queue ``fn(job, *args)``. Raises QueueFull when the queue is at capacity.
+    With *key*, an unfinished job submitted under the same key is returned
+    instead of queueing a duplicate, whichever process runs it. The
+    JOB_MAX_QUEUED limit is per process, as is the pool that drains it.
+    """
+    _purge_expired_jobs()
+    job = Job(key)
+    shared_id = store.find_unfinished(key) if key is not None else None
+    shared    = store.load(shared_id) if shared_id else None
+    with _lock:
+        if key is not None:
+            running = next((j for j in _jobs.values() if j.key == key and not j.finished), None)
+            if running is not None:
+                return running
+            if shared is not None and shared["id"] not in _jobs:
+                return Job.from_record(shared)
+        if sum(1 for j in _jobs.values() if j.status == "queued") >= JOB_MAX_QUEUED:
+            raise QueueFull()
+        _jobs[job.id] = job
+    store.save(job)
+    job.emit("status", {"status": "queued"})
+    _executor.submit(_run, job, fn, args)
+    return job
+
+
+def get(job_id: str) -> Optional[Job]:
+    """
+    Return the job, or None if unknown or expired: this process's live Job,
+    or a snapshot from the store of one that another process runs.
+    """
+    _purge_expired_jobs()
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is not None:
+        return job
+    record = store.load(job_id)
+    return Job.from_record(record) if record else None
@@ -2,30 +2,37 @@
 Serifdigest — Core scraper & PDF builder
 ------------------------------------
 Callable directly (CLI) or imported by server.py (API mode).
+
+Importing this module is cheap: newspaper3k/NLTK load on the first
+extraction fallback and Playwright on the first render (see bootstrap.py).
 """
 
-import feedparser
 import asyncio
+import contextlib
 import datetime
-import unicodedata
-import nltk
+import functools
 import os
-from typing import Optional, List, Dict
-from newspaper import Article
-from email.utils import parsedate_to_datetime
-from jinja2 import Environment, FileSystemLoader
-from playwright.async_api import async_playwright
-import requests
-from bs4 import BeautifulSoup
-
-# ── NLTK bootstrap ────────────────────────────────────────────────────────────
-
-for _resource in ("punkt", "punkt_tab", "stopwords"):
-    try:
-        nltk.download(_resource, quiet=True)
-    except Exception:
-        pass
-
+import pathlib
+import threading
+import time
+from typing import Callable, Optional, List, Dict, Tuple
+from concurrent.futures import Future, as_completed
+from urllib.parse import unquote, urlsplit
+
+import article_cache
+import bootstrap
+import browser_pool
+import cpu_pool
+import extract
+import feed_fetch
+import http_client
+import images
+import metrics
+import scrape_pool
+import singleflight
+import templating
+from extract import clean_text           # re-exported for existing callers
+from feed_fetch import parse_entry_date  # re-exported for existing callers
 
 # ── Config (CLI defaults — overridden by API caller) ─────────────────────────
 
@@ -37,248 +44,573 @@ DEFAULT_FEEDS = [
 
 DEFAULT_DAYS_BACK      = 3
 DEFAULT_SUMMARY_SENTENCES = 3
-TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+TEMPLATES_DIR = templating.TEMPLATES_DIR
 DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "outputs", "Tech_Weekly_Pro.pdf")
 
+#: Parse article pages while they download and stop after a complete
+#: <head> (see scrape_article). Off = always read the whole page.
+SCRAPE_HEAD_ONLY   = os.getenv("SCRAPE_HEAD_ONLY", "true").lower() != "false"
+SCRAPE_CHUNK_BYTES = int(os.getenv("SCRAPE_CHUNK_BYTES", 16 * 1024))
+
+#: After a complete <head>, read (and discard) the rest of the body so the
+#: connection goes back to the pool, but only when Content-Length shows the
+#: rest is at most this big. A longer or unknown remainder is cut off, which
+#: drops the connection: the next page on that host then pays a new TCP +
+#: TLS handshake. That costs 2-3 round trips on a real network, far more
+#: than bench/run.py's loopback server shows, but draining most of a page
+#: would undo the head-only saving. 0 = always cut off.
+SCRAPE_DRAIN_MAX_BYTES = int(os.getenv("SCRAPE_DRAIN_MAX_BYTES", 4 * SCRAPE_CHUNK_BYTES))
+
+#: Render readiness: how long one image may take, and how long we wait for
+#: all images + web fonts before printing anyway.
+RENDER_IMAGE_TIMEOUT_MS = int(os.getenv("RENDER_IMAGE_TIMEOUT_MS", 4000))
+RENDER_READY_TIMEOUT_MS = int(os.getenv("RENDER_READY_TIMEOUT_MS", 8000))
+
+#: Articles per render chunk. Larger magazines are split into chunks, each
+#: printed from its own page (bounded DOM and memory), in parallel up to
+#: BROWSER_MAX_CONCURRENT, then merged in order. 0 = always one document.
+RENDER_CHUNK_ARTICLES = int(os.getenv("RENDER_CHUNK_ARTICLES", 40))
+
+#: Swapped in for hero images that fail or miss the deadline, so the page
+#: never prints an empty box. Matches --paper / --ink-muted in layout.html.
+IMAGE_PLACEHOLDER = (
+    "data:image/svg+xml;charset=utf-8,"
+    "%3Csvg xmlns='http://www.w3.org/2000/svg' width='1200' height='400'%3E"
+    "%3Crect width='100%25' height='100%25' fill='%23eee8e1'/%3E"
+    "%3Ctext x='50%25' y='50%25' fill='%238a7f7a' font-family='monospace' font-size='18' "
+    "letter-spacing='4' text-anchor='middle' dominant-baseline='middle'%3EDIGEST%3C/text%3E"
+    "%3C/svg%3E"
+)
+
+
+# ── Scraping ──────────────────────────────────────────────────────────────────
+
+def scrape_article(
+    url: str,
+    summary_sentences: int = DEFAULT_SUMMARY_SENTENCES,
+    defer_summary: bool = False,
+) -> Dict:
+    """
+    Fetch *url* and extract it with extract.py (one lxml parse; newspaper3k
+    only when the meta tags fall short). The result's ``extraction`` key
+    names the path taken, or "failed". With *defer_summary*, a page that
+    needs a generated summary is left for _finish_summaries().
+
+    With SCRAPE_HEAD_ONLY the page is parsed as it streams in and the
+    download stops once </head> has every required meta tag; the body is
+    read only when a fallback needs it. Those full pages are extracted in
+    cpu_pool workers (raw bytes in, the result dict out), so newspaper3k
+    never holds this process's GIL. After the head, a remainder that
+    Content-Length puts within SCRAPE_DRAIN_MAX_BYTES is drained so the
+    keep-alive connection is reused; a longer or unknown one is cut off.
+
+    ``transfer`` reports ``bytes_read`` (on the wire), ``bytes_saved``
+    (Content-Length minus bytes read, None when the server sent no
+    length), ``drained`` / ``closed`` (what happened after the head) and
+    the ``connects`` / ``tls_handshakes`` the fetch had to make.
+    """
+    try:
+        # --- Stream raw HTML (shared keep-alive pool) ---
+        fetch_started = time.perf_counter()
+        connects_before = http_client.thread_connects()
+        with http_client.get(url, stream=True) as resp:
+            resp.raise_for_status()
+            # Only trust an explicit header charset; otherwise lxml reads the
+            # page's own <meta charset> from the bytes.
+            encoding = resp.encoding if "charset" in resp.headers.get("Content-Type", "").lower() else None
+            scanner  = extract.HeadScanner(encoding)
+            length    = resp.headers.get("Content-Length")
+            chunks    = resp.iter_content(SCRAPE_CHUNK_BYTES)
+            head_only = drained = closed = False
+            for chunk in chunks:
+                scanner.feed(chunk)
+                if SCRAPE_HEAD_ONLY and scanner.head_complete:
+                    head_only = True
+                    break
+            if head_only:
+                drained = _drain(resp, chunks, length)
+                closed  = not drained
+            bytes_read = resp.raw.tell()
+        connects, tls_handshakes = (
+            after - before for after, before in zip(http_client.thread_connects(), connects_before)
+        )
+        metrics.observe("article_fetch", time.perf_counter() - fetch_started,
+                        host=metrics.host_of(url), kind="article")
+
+        # Head-complete pages were parsed while streaming; everything else
+        # (body fallback, summaries) is CPU-heavy and goes to a worker.
+        extract_started = time.perf_counter()
+        if head_only:
+            result = scanner.extract(url, summary_sentences, defer_summary)
+        else:
+            result = cpu_pool.run(extract.extract_article, scanner.content, url, encoding,
+                                  summary_sentences, defer_summary)
+        elapsed = time.perf_counter() - extract_started
+        metrics.observe("extract", elapsed)
+        metrics.EXTRACT_SECONDS.observe(elapsed, path=result["extraction"])
+        result["transfer"] = {
+            "head_only":      head_only,
+            "drained":        drained,
+            "closed":         closed,
+            "bytes_read":     bytes_read,
+            "bytes_saved":    max(0, int(length) - bytes_read) if length and length.isdigit() else None,
+            "connects":       connects,
+            "tls_handshakes": tls_handshakes,
+        }
+        return result
+    except Exception as e:
+        metrics.STAGE_ERRORS.inc(stage="article_fetch")
+        print(f"  [!] Could not scrape {url}: {e}")
 
-# ── Helpers ───────────────────────────────────────────────────────────────────
-
-def clean_text(text: str) -> str:
-    if not text:
-        return ""
-    text = unicodedata.normalize("NFKC", text)
-    for old, new in {
-        "\u2013": "-", "\u2014": "-",
-        "\u2018": "'", "\u2019": "'",
-        "\u201c": '"', "\u201d": '"',
-    }.items():
-        text = text.replace(old, new)
-    return text.strip()
-
-
-def parse_entry_date(entry) -> Optional[datetime.datetime]:
-    for attr in ("published", "updated"):
-        raw = getattr(entry, attr, None)
-        if raw:
-            try:
-                return parsedate_to_datetime(raw)
-            except Exception:
-                pass
-    for attr in ("published_parsed", "updated_parsed"):
-        parsed = getattr(entry, attr, None)
-        if parsed:
-            try:
-                return datetime.datetime(*parsed[:6], tzinfo=datetime.timezone.utc)
-            except Exception:
-                pass
-    return None
-
-
-
-
-META_PRIORITY = [
-    "og:description",
-    "twitter:description",
-    "description"
-]
+    return extract.empty_result("failed")
 
-AUTHOR_META_KEYS = [
-    "author",
-    "article:author"
-]
 
-IMAGE_META_KEYS = [
-    "og:image",
-    "twitter:image"
-]
+def _drain(resp, chunks, length: Optional[str]) -> bool:
+    """
+    Read the rest of *resp* if Content-Length says it fits in
+    SCRAPE_DRAIN_MAX_BYTES, so closing it returns the connection to the
+    pool. False if the rest was left unread (too long, or no length to tell),
+    in which case the connection is dropped when *resp* closes.
+    """
+    if not (length and length.isdigit()):
+        return False
+    if int(length) - resp.raw.tell() > SCRAPE_DRAIN_MAX_BYTES:
+        return False
+    for _chunk in chunks:
+        pass
+    return True
 
-TITLE_META_KEYS = [
-    "og:title",
-    "twitter:title"
-]
 
+def _scrape_and_cache(url: str) -> Dict:
+    scraped = scrape_article(url, defer_summary=True)
+    # Pages still waiting for a summary are cached by _finish_summaries().
+    if "summary_text" not in scraped:
+        _cache_if_useful(url, scraped)
+    return scraped
+
+
+def _submit_scrape(url: str) -> Tuple[Future, bool]:
+    """
+    Queue a scrape of *url* on the shared pool, or join the one already in
+    flight for the same normalised URL. Returns ``(future, shared)``.
+    """
+    return singleflight.articles.submit(
+        article_cache.normalize_url(url),
+        lambda: scrape_pool.submit(url, _scrape_and_cache, url),
+    )
 
-def extract_meta(soup: BeautifulSoup, keys):
-    for key in keys:
-        tag = soup.find("meta", property=key) or soup.find("meta", attrs={"name": key})
-        if tag and tag.get("content"):
-            return tag["content"].strip()
-    return None
 
+def _cache_if_useful(url: str, scraped: Dict) -> None:
+    # Only cache real extractions — a failed fetch returns the empty shell,
+    # and that should be retried on the next request, not served for hours.
+    if scraped["title"] or scraped["summary"] or scraped["top_image"]:
+        article_cache.put(url, scraped)
 
-def extract_all_meta_authors(soup: BeautifulSoup):
-    authors = set()
-    for key in AUTHOR_META_KEYS:
-        for tag in soup.find_all("meta", attrs={"name": key}) + soup.find_all("meta", property=key):
-            if tag.get("content"):
-                authors.add(tag["content"].strip())
-    return list(authors)
 
-def get_rss_summary(entry) -> str:
+def _finish_summaries(scraped: List[Tuple[str, Dict]]) -> None:
     """
-    Attempt to extract a summary from the RSS <content:encoded> field.
+    Summarise every deferred fallback page in *scraped* ((url, result)
+    pairs) in one batch, then cache them.
     """
-    content = entry.get("content", [])
-    if content:
-        # content is usually a list of dicts with 'value' key
-        html = content[0].get("value", "")
-        if html:
-            soup = BeautifulSoup(html, "html.parser")
-            p = soup.find("p")
-            if p and p.get_text(strip=True):
-                return p.get_text(strip=True)
-    return ""
-
-def scrape_article(url: str, summary_sentences: int = DEFAULT_SUMMARY_SENTENCES) -> Dict:
-    result: Dict = {
-        "title": None,
-        "top_image": None,
-        "summary": "",
-        "authors": [],
-        "published_at": None,
-        "site_name": None
-    }
-
+    deferred = [(url, result) for url, result in scraped if "summary_text" in result]
+    if not deferred:
+        return
+    with metrics.stage("summarize"):
+        done = cpu_pool.run(extract.complete_summaries,
+                            [result for _, result in deferred], DEFAULT_SUMMARY_SENTENCES)
+    # The worker returns copies; update the dicts the callers hold. A
+    # coalesced scrape hands the same dict to several requests, so fill it
+    # in before dropping summary_text: a request that still sees the marker
+    # summarises again, one that does not already sees the summary.
+    for (url, result), finished in zip(deferred, done):
+        result.update(finished)
+        result.pop("summary_text", None)
+        _cache_if_useful(url, result)
+
+
+#: Signature of the optional progress callback: progress(event, data).
+ProgressCallback = Callable[[str, Dict], None]
+
+
+def _emit(progress: Optional[ProgressCallback], event: str, **data) -> None:
+    """Report a pipeline event; a failing listener never breaks the pipeline."""
+    if progress is None:
+        return
     try:
-        # --- Fetch raw HTML first ---
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            )
-        }
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        # --- META TAG EXTRACTION (PRIMARY) ---
-        result["title"]       = extract_meta(soup, TITLE_META_KEYS)
-        result["summary"]     = extract_meta(soup, META_PRIORITY) or ""
-        result["top_image"]   = extract_meta(soup, IMAGE_META_KEYS)
-        result["site_name"]   = extract_meta(soup, ["og:site_name"])
-        result["published_at"] = extract_meta(
-            soup,
-            ["article:published_time", "og:published_time", "pubdate"]
-        )
-        result["authors"] = extract_all_meta_authors(soup)
-
-        if result["summary"]:
-            result["summary"] = clean_text(result["summary"])
-        
-                # --- TEXT FALLBACK ---
-        if not result["summary"]:
-            paragraphs = [p.strip() for p in art.text.split("\n") if len(p.strip()) > 60]
-            if paragraphs:
-                result["summary"] = clean_text(" ".join(paragraphs[:summary_sentences]))
-            else:
-                # fallback to RSS content:encoded first paragraph
-                if "rss_entry" in locals():  # pass the feedparser entry here
-                    rss_summary = get_rss_summary(rss_entry)
-                    if rss_summary:
-                        result["summary"] = clean_text(rss_summary)
-
-        # --- NEWSPAPER3K FALLBACK ---
-        art = Article(url)
-        art.download(input_html=resp.text)
-        art.parse()
-
-        result["title"]     = result["title"] or art.title or None
-        result["top_image"] = result["top_image"] or art.top_image or None
-        result["authors"]   = result["authors"] or art.authors or []
-
-        # --- NLP ONLY IF STILL NO SUMMARY ---
-        if not result["summary"]:
-            try:
-                art.nlp()
-                if art.summary and len(art.summary) > 80:
-                    result["summary"] = clean_text(art.summary)
-            except Exception:
-                pass
-
-        # --- TEXT FALLBACK ---
-        if not result["summary"]:
-            paragraphs = [
-                p.strip()
-                for p in art.text.split("\n")
-                if len(p.strip()) > 60
-            ]
-            result["summary"] = clean_text(
-                " ".join(paragraphs[:summary_sentences])
-            )
-
+        progress(event, data)
     except Exception as e:
-        print(f"  [!] Could not scrape {url}: {e}")
+        print(f"  [!] Progress listener failed on '{event}': {e}")
 
-    return result
 
-# ── Core fetch ────────────────────────────────────────────────────────────────
+def _completed(value) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
 
-def fetch_articles(feeds: List[str], days_back: int = DEFAULT_DAYS_BACK) -> List[Dict]:
-    cutoff = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=days_back)
-    all_articles: List[Dict] = []
 
-    for feed_url in feeds:
-        print(f"\n=== Feed: {feed_url} ===")
-        feed       = feedparser.parse(feed_url)
-        feed_title = feed.feed.get("title", feed_url)
+# ── Core fetch ────────────────────────────────────────────────────────────────
 
-        for entry in feed.entries:
-            pub_date = parse_entry_date(entry)
+def fetch_articles(
+    feeds: List[str],
+    days_back: int = DEFAULT_DAYS_BACK,
+    stats: Optional[Dict] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Dict]:
+    """
+    Collect and scrape every in-window entry from *feeds*, in feed order.
+
+    If *stats* is given it is filled with this request's counters
+    (``cache_hits``, ``cache_misses``, ``feeds_not_modified``, and
+    ``extraction`` — articles per extraction path, see extract.py — and,
+    for fresh scrapes, ``head_only`` (split into ``drained`` and
+    ``closed``), ``bytes_read``, ``bytes_saved``, ``connects`` and
+    ``tls_handshakes``;
+    ``coalesced`` counts misses that joined a scrape already in flight).
+
+    If *progress* is given it receives, in order: ``feed_fetched`` per feed,
+    ``feeds_fetched``, ``article_scraped`` per article (``scraped``/``total``
+    so far), ``articles_scraped`` and ``articles_ready``.
+    """
+    stats = stats if stats is not None else {}
+    stats.update({"cache_hits": 0, "cache_misses": 0, "feeds_not_modified": 0, "extraction": {},
+                  "coalesced": 0, "head_only": 0, "drained": 0, "closed": 0, "bytes_read": 0,
+                  "bytes_saved": 0, "connects": 0, "tls_handshakes": 0})
+
+    counter_lock = threading.Lock()
+    counts = {"queued": 0, "scraped": 0}
+
+    def track(future: Future) -> Future:
+        with counter_lock:
+            counts["queued"] += 1
+
+        def on_done(_f):
+            with counter_lock:
+                counts["scraped"] += 1
+                scraped, total = counts["scraped"], counts["queued"]
+            _emit(progress, "article_scraped", scraped=scraped, total=total,
+                  cache_hits=stats["cache_hits"])
+
+        future.add_done_callback(on_done)
+        return future
+
+    cutoff  = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=days_back)
+    started = time.perf_counter()
+
+    # Every feed downloads at once; each one's scrapes are queued as soon as
+    # it has been parsed, without waiting for slower feeds.
+    feed_futures = {feed_fetch.submit_feed(url): i for i, url in enumerate(feeds)}
+    pending: List[List[Tuple[Dict, Future, bool]]] = [[] for _ in feeds]
+
+    for feeds_done, done in enumerate(as_completed(feed_futures), 1):
+        i          = feed_futures[done]
+        feed_url   = feeds[i]
+        feed       = done.result()
+        feed_title = feed["title"]
+        print(f"\n=== Feed: {feed_url}{' (not modified)' if feed.get('not_modified') else ''} ===")
+        stats["feeds_not_modified"] += bool(feed.get("not_modified"))
+        _emit(progress, "feed_fetched", feed=feed_url, done=feeds_done, total=len(feeds),
+              not_modified=bool(feed.get("not_modified")))
+
+        for entry in feed["entries"]:
+            pub_date = datetime.datetime.fromisoformat(entry["published"]) if entry["published"] else None
 
             if pub_date is not None and pub_date < cutoff:
                 continue
             if pub_date is None:
-                print(f"  [?] No date for '{entry.get('title', '(no title)')}' — including anyway")
-
-            title      = clean_text(entry.get("title", "(No title)"))
-            source_url = entry.get("link", "")
+                print(f"  [?] No date for '{entry['title']}' — including anyway")
 
-            print(f"  Scraping: {title[:70]}...")
-            scraped = scrape_article(source_url)
+            title      = clean_text(entry["title"])
+            source_url = entry["link"]
 
-            all_articles.append({
+            article = {
                 "feed":       feed_title,
                 "title":      title,
                 "url":        source_url,
                 "source_url": source_url,
                 "date":       pub_date.strftime("%B %d, %Y") if pub_date else "Unknown",
-                "authors":    scraped["authors"],
-                "image":      scraped["top_image"],
-                "paragraphs": [scraped["summary"]] if scraped["summary"] else [],
-            })
+            }
+            cached = article_cache.get(source_url)
+            if cached is not None:
+                stats["cache_hits"] += 1
+                pending[i].append((article, track(_completed(cached)), True))
+                continue
+
+            # Scrapes run concurrently (bounded globally and per host); the
+            # list keeps feed/entry order regardless of completion order.
+            stats["cache_misses"] += 1
+            future, shared = _submit_scrape(source_url)
+            stats["coalesced"] += shared
+            print(f"  {'Joining' if shared else 'Scraping'}: {title[:70]}...")
+            pending[i].append((article, track(future), False))
+
+    # Scrapes overlap the slower feeds, so "feeds" is time to the last parsed
+    # feed and "scrape" is the remainder.
+    feeds_done_at = time.perf_counter()
+    metrics.observe("feeds", feeds_done_at - started)
+    _emit(progress, "feeds_fetched", feeds=len(feeds), articles=counts["queued"],
+          cache_hits=stats["cache_hits"])
+
+    items = [(article, future.result(), from_cache)
+             for feed_items in pending for article, future, from_cache in feed_items]
+    _finish_summaries([(article["source_url"], scraped) for article, scraped, from_cache in items
+                       if not from_cache])
+
+    all_articles: List[Dict] = []
+    for article, scraped, from_cache in items:
+        path    = scraped.get("extraction", "meta")
+        stats["extraction"][path] = stats["extraction"].get(path, 0) + 1
+        if not from_cache and scraped.get("transfer"):
+            transfer = scraped["transfer"]
+            for key in ("head_only", "drained", "closed", "bytes_read", "connects", "tls_handshakes"):
+                stats[key] += transfer[key]
+            stats["bytes_saved"] += transfer["bytes_saved"] or 0
+        article.update({
+            "authors":    scraped["authors"],
+            "image":      scraped["top_image"],
+            "paragraphs": [scraped["summary"]] if scraped["summary"] else [],
+        })
+        all_articles.append(article)
+    metrics.observe("scrape", time.perf_counter() - feeds_done_at)
+    _emit(progress, "articles_scraped", articles=len(all_articles))
 
     print(f"\n✓ Collected {len(all_articles)} articles from {len(feeds)} feed(s).")
+    print(f"  Article cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses"
+          + (f" ({stats['coalesced']} joined in-flight scrapes)" if stats["coalesced"] else ""))
+    if stats["extraction"]:
+        print("  Extraction: " + ", ".join(f"{n} {path}" for path, n in sorted(stats["extraction"].items())))
+    if stats["cache_misses"]:
+        print(f"  Head-only: {stats['head_only']}/{stats['cache_misses']} pages "
+              f"({stats['drained']} drained, {stats['closed']} cut off), "
+              f"{stats['bytes_read'] // 1024} KB read, {stats['bytes_saved'] // 1024} KB saved, "
+              f"{stats['connects']} connects ({stats['tls_handshakes']} TLS)")
+    pool = http_client.stats()
+    print(f"  HTTP pool: {pool['requests']} requests over {pool['connections']} TCP connects "
+          f"({pool['reuse_ratio']:.0%} reused)")
+    _emit(progress, "articles_ready", articles=len(all_articles), cache_hits=stats["cache_hits"],
+          cache_misses=stats["cache_misses"])
     return all_articles
 
 
+def warm_feed(feed_url: str, days_back: int = DEFAULT_DAYS_BACK) -> Dict:
+    """
+    Scrape every uncached in-window entry of *feed_url* into the article
+    cache ahead of time (see prewarm.py). Returns what was found:
+
+        {"entries": int, "scraped": int, "not_modified": bool,
+         "published": [datetime, ...], "error": str | None}
+    """
+    cutoff = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=days_back)
+    feed   = feed_fetch.submit_feed(feed_url).result()
+
+    published: List[datetime.datetime] = []
+    futures:   List[Tuple[str, Future]] = []
+    for entry in feed["entries"]:
+        pub_date = datetime.datetime.fromisoformat(entry["published"]) if entry["published"] else None
+        if pub_date is not None:
+            published.append(pub_date)
+            if pub_date < cutoff:
+                continue
+        link = entry["link"]
+        if link and article_cache.get(link) is None:
+            futures.append((link, _submit_scrape(link)[0]))
+
+    _finish_summaries([(link, future.result()) for link, future in futures])
+
+    return {
+        "entries":      len(feed["entries"]),
+        "scraped":      len(futures),
+        "not_modified": bool(feed.get("not_modified")),
+        "published":    published,
+        "error":        feed["error"],
+    }
+
+
 # ── PDF generation ────────────────────────────────────────────────────────────
 
-async def build_pdf(articles: List[Dict], output_path: str = DEFAULT_OUTPUT) -> str:
-    """Render Jinja2 templates and export a PDF via Playwright. Returns output_path."""
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+# Waits for every <img> to load or fail (each bounded by imageTimeout) and for
+# web fonts, all under one overall deadline. Images still pending or broken
+# get the placeholder. Returns counts and the time spent waiting.
+_WAIT_FOR_ASSETS_JS = """
+async ({ imageTimeout, overallTimeout, placeholder }) => {
+  const started = performance.now();
+  const sleep = (ms) => new Promise((r) => setTimeout(r, ms));
+  const images = Array.from(document.images);
+
+  const settle = (img) => {
+    if (img.complete) return Promise.resolve(img.naturalWidth > 0 ? "loaded" : "failed");
+    return Promise.race([
+      new Promise((r) => {
+        img.addEventListener("load", () => r("loaded"), { once: true });
+        img.addEventListener("error", () => r("failed"), { once: true });
+      }),
+      sleep(imageTimeout).then(() => "timed_out"),
+    ]);
+  };
+
+  const outcomes = images.map(() => "timed_out");
+  await Promise.race([
+    Promise.all([
+      ...images.map((img, i) => settle(img).then((o) => { outcomes[i] = o; })),
+      document.fonts ? document.fonts.ready : Promise.resolve(),
+    ]),
+    sleep(overallTimeout),
+  ]);
+
+  const swapped = images.filter((img, i) => outcomes[i] !== "loaded");
+  await Promise.all(swapped.map((img) => {
+    img.src = placeholder;
+    return img.decode ? img.decode().catch(() => {}) : Promise.resolve();
+  }));
+
+  return {
+    images:    images.length,
+    loaded:    outcomes.filter((o) => o === "loaded").length,
+    failed:    outcomes.filter((o) => o === "failed").length,
+    timed_out: outcomes.filter((o) => o === "timed_out").length,
+    waited_ms: Math.round(performance.now() - started),
+  };
+}
+"""
 
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+def _chunk_articles(articles: List[Dict], size: int) -> List[List[Dict]]:
+    if size <= 0 or len(articles) <= size:
+        return [articles]
+    return [articles[i:i + size] for i in range(0, len(articles), size)]
 
-    css_path = os.path.join(TEMPLATES_DIR, "master.css")
-    with open(css_path, "r", encoding="utf-8") as f:
-        css_styling = f.read()
 
-    final_html = env.get_template("layout.html").render(
-        articles=articles,
-        custom_css=css_styling,
-        date=datetime.datetime.now(),
-    )
+def _local_file_allowed(url: str, html_path: str) -> bool:
+    """
+    True for the chunk's own HTML and files in images.IMAGE_CACHE_DIR — the
+    only file:// URLs a rendered magazine needs. Anything else (a feed
+    pointing at /proc/self/environ, say) must never reach the PDF.
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "file" or parts.netloc not in ("", "localhost"):
+        return False
+    path = os.path.realpath(unquote(parts.path))
+    if path == os.path.realpath(html_path):
+        return True
+    return path.startswith(os.path.join(os.path.realpath(images.IMAGE_CACHE_DIR), ""))
+
+
+async def _print_chunk(html_path: str, pdf_path: str, page) -> Dict:
+    """Load one rendered chunk in *page*, wait for its assets and print it."""
+    async def guard_files(route):
+        if _local_file_allowed(route.request.url, html_path):
+            await route.continue_()
+        else:
+            await route.abort("accessdenied")
+
+    # The page has a file:// origin, so it could otherwise read any local
+    # file; layout.html's CSP is the second line of defence.
+    await page.route("file://**", guard_files)
+    # Don't let navigation block on the load event (i.e. on the slowest
+    # remote image) — readiness is decided by _WAIT_FOR_ASSETS_JS.
+    with metrics.stage("pdf_load"):
+        await page.goto(pathlib.Path(html_path).as_uri(), wait_until="domcontentloaded")
+    ready = await page.evaluate(_WAIT_FOR_ASSETS_JS, {
+        "imageTimeout":   RENDER_IMAGE_TIMEOUT_MS,
+        "overallTimeout": RENDER_READY_TIMEOUT_MS,
+        "placeholder":    IMAGE_PLACEHOLDER,
+    })
+    metrics.observe("pdf_assets_wait", ready["waited_ms"] / 1000)
+    with metrics.stage("pdf_print"):
+        await page.pdf(path=pdf_path, format="A4", print_background=True)
+    return ready
+
+
+def _merge_pdfs(paths: List[str], output_path: str) -> None:
+    from pypdf import PdfWriter   # only needed for chunked renders
+
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    with open(output_path, "wb") as f:
+        writer.write(f)
+
+
+async def build_pdf(
+    articles: List[Dict],
+    output_path: str = DEFAULT_OUTPUT,
+    progress: Optional[ProgressCallback] = None,
+) -> str:
+    """
+    Render Jinja2 templates and export a PDF via Playwright. Returns output_path.
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page    = await browser.new_page()
-        await page.set_content(final_html)
-        await page.wait_for_timeout(3000)
-        await page.pdf(path=output_path, format="A4", print_background=True)
-        await browser.close()
+    More than RENDER_CHUNK_ARTICLES articles are rendered as separate
+    chunks in parallel and merged into one PDF with pypdf.
 
+    *progress* receives ``render_started``, ``images_prepared``, ``render_done``
+    (with ``chunks``), ``pdf_started``, ``images_ready`` (image outcomes and
+    ``waited_ms``, over all chunks) and ``pdf_written`` (with ``bytes``).
+
+    Stage timings (images, template, pdf, pdf_merge) go to metrics.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    _emit(progress, "render_started", articles=len(articles))
+
+    # Hero images are fetched, resized and inlined up front so Chromium never
+    # waits on third-party CDNs or embeds multi-megabyte originals.
+    with metrics.stage("images"):
+        articles, image_stats = await asyncio.to_thread(images.localize_images, articles)
+    print(f"  Images: {image_stats['fetched']} fetched, {image_stats['cached']} cached, "
+          f"{image_stats['failed'] + image_stats['unsafe']} skipped "
+          f"({image_stats['source_bytes'] // 1024} KB in → {image_stats['output_bytes'] // 1024} KB out)")
+    _emit(progress, "images_prepared", **image_stats)
+
+    # Each chunk's document is streamed to a file next to the PDF and
+    # Chromium loads it from there, so the HTML never sits in this process
+    # as one string. Only the first chunk carries the cover.
+    chunks = _chunk_articles(articles, RENDER_CHUNK_ARTICLES)
+    base   = os.path.splitext(output_path)[0]
+    if len(chunks) == 1:
+        parts = [(base + ".html", output_path)]
+    else:
+        parts = [(f"{base}.part{i}.html", f"{base}.part{i}.pdf") for i in range(len(chunks))]
+
+    try:
+        issue_date = datetime.datetime.now()
+        custom_css = templating.css()
+        with metrics.stage("template"):
+            html_bytes = 0
+            for i, ((html_path, _), chunk) in enumerate(zip(parts, chunks)):
+                html_bytes += await asyncio.to_thread(
+                    templating.render_to_file, "layout.html", html_path,
+                    articles=chunk,
+                    custom_css=custom_css,
+                    date=issue_date,
+                    cover=i == 0,
+                )
+        _emit(progress, "render_done", html_bytes=html_bytes, chunks=len(parts))
+
+        _emit(progress, "pdf_started")
+        with metrics.stage("pdf"):
+            # Wait for every chunk even if one fails, so none is still
+            # writing when the part files are cleaned up below.
+            results = await asyncio.gather(*(
+                browser_pool.with_page(functools.partial(_print_chunk, html_path, pdf_path))
+                for html_path, pdf_path in parts
+            ), return_exceptions=True)
+            failed = next((r for r in results if isinstance(r, BaseException)), None)
+            if failed is not None:
+                raise failed
+            if len(parts) > 1:
+                with metrics.stage("pdf_merge"):
+                    await asyncio.to_thread(_merge_pdfs, [pdf for _, pdf in parts], output_path)
+    finally:
+        leftovers = [html for html, _ in parts] + ([pdf for _, pdf in parts] if len(parts) > 1 else [])
+        for path in leftovers:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    ready = {key: sum(r[key] for r in results) for key in ("images", "loaded", "failed", "timed_out")}
+    ready["waited_ms"] = max(r["waited_ms"] for r in results)
+    print(f"  Images: {ready['loaded']}/{ready['images']} loaded, "
+          f"{ready['failed']} failed, {ready['timed_out']} timed out "
+          f"(waited {ready['waited_ms']} ms)")
+    _emit(progress, "images_ready", **ready)
+
+    _emit(progress, "pdf_written", bytes=os.path.getsize(output_path))
     print(f"✓ PDF saved → {output_path}", flush=True)
     return output_path
 
@@ -289,6 +621,7 @@ async def _cli() -> None:
     raw  = input(f"Days back to fetch? [default {DEFAULT_DAYS_BACK}]: ").strip()
     days = int(raw) if raw else DEFAULT_DAYS_BACK
 
+    bootstrap.warm_up()
     articles = fetch_articles(DEFAULT_FEEDS, days_back=days)
 
     if not articles:
@@ -0,0 +1,280 @@
+"""
+metrics.py — Stage timings, counters and Prometheus exposition
+---------------------------------------------------------------
+Provides:
+  - Histogram / Counter primitives with labels, rendered in the Prometheus
+    text format (0.0.4) by render() — no client library needed
+  - stage(): a timer for one pipeline stage (feed_download, article_fetch,
+    extract, images, template, pdf, ...), optionally per host
+  - Collectors: callables registered by the modules that own live state
+    (caches, pools, job queue) and sampled only when /api/metrics is scraped
+    (server.py serves it only with METRICS_TOKEN set)
+  - request_timings(): a per-request summary of stage wall times, carried
+    in a ContextVar so nested code does not need a parameter threaded
+    through (asyncio.run and asyncio.to_thread copy it; thread pools do
+    not, so per-article stages only reach the histograms)
+
+Typical use:
+
+    import metrics
+
+    with metrics.stage("feed_download", host=metrics.host_of(url)):
+        resp = http_client.get(url)
+
+    with metrics.request_timings() as timings:
+        run_pipeline()
+    timings.summary()   # -> {"total": 4.2, "stages": {"feeds": 0.8, ...}}
+
+Environment variables:
+    METRICS_MAX_HOSTS   Distinct host label values kept before the rest are
+                        reported as "other" (default 200)
+"""
+
+import contextlib
+import contextvars
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+METRICS_MAX_HOSTS = int(os.getenv("METRICS_MAX_HOSTS", 200))
+
+#: Seconds. Covers a cached lookup (ms) up to a full Chromium export (minutes).
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+PREFIX = "digest_"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ── Primitives ────────────────────────────────────────────────────────────────
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name      = PREFIX + name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name      = PREFIX + name
+        self.help_text = help_text
+        self.buckets   = tuple(sorted(buckets)) + (math.inf,)
+        # label key -> [bucket counts..., sum, count]
+        self._series: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = ("le", _format_value(bound) if bound == math.inf else repr(float(bound)))
+                    lines.append(f"{self.name}_bucket{_format_labels(key, le)} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+#: A collector returns (name, type, help, [(labels, value), ...]) tuples.
+Sample     = Tuple[Dict[str, str], float]
+Family     = Tuple[str, str, str, List[Sample]]
+Collector  = Callable[[], List[Family]]
+
+
+# ── Registry ──────────────────────────────────────────────────────────────────
+
+STAGE_SECONDS = Histogram(
+    "stage_seconds",
+    "Wall time of one pipeline stage.",
+)
+HOST_FETCH_SECONDS = Histogram(
+    "host_fetch_seconds",
+    "Wall time of one outbound fetch, by kind (feed/article/image) and host.",
+)
+STAGE_ERRORS = Counter(
+    "stage_errors_total",
+    "Pipeline stages that raised.",
+)
+EXTRACT_SECONDS = Histogram(
+    "extract_seconds",
+    "Article extraction time by path (meta, body, body+summary, body+nlp, body+text, failed).",
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "API request latency by endpoint, method and status.",
+)
+
+_metrics: List = [STAGE_SECONDS, HOST_FETCH_SECONDS, STAGE_ERRORS, EXTRACT_SECONDS, HTTP_REQUEST_SECONDS]
+_collectors: List[Collector] = []
+_hosts: Dict[str, None] = {}
+_hosts_lock = threading.Lock()
+
+
+def register_collector(collector: Collector) -> None:
+    """Add a callable sampled on every render() (e.g. pool or cache stats)."""
+    _collectors.append(collector)
+
+
+def host_of(url: str) -> str:
+    """Host label for *url*, capped at METRICS_MAX_HOSTS distinct values."""
+    host = (urlparse(url).hostname or "unknown").lower()
+    with _hosts_lock:
+        if host in _hosts:
+            return host
+        if len(_hosts) < METRICS_MAX_HOSTS:
+            _hosts[host] = None
+            return host
+    return "other"
+
+
+def render() -> str:
+    """Everything registered, in Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            families = collector()
+        except Exception as e:
+            print(f"  [!] Metrics collector failed: {e}")
+            continue
+        for name, kind, help_text, samples in families:
+            name = PREFIX + name
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Per-request timings ───────────────────────────────────────────────────────
+
+class Timings:
+    """Stage wall times for one request or job."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def summary(self) -> Dict:
+        return {
+            "total":  round(time.perf_counter() - self.started, 4),
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+        }
+
+    def server_timing(self) -> str:
+        """Value for a Server-Timing response header (milliseconds)."""
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Optional[Timings]] = contextvars.ContextVar("timings", default=None)
+
+
+def begin_timings() -> Tuple[Timings, contextvars.Token]:
+    """Start collecting stage timings in this context; pair with end_timings()."""
+    timings = Timings()
+    return timings, _current.set(timings)
+
+
+def end_timings(token: contextvars.Token) -> None:
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def request_timings() -> Iterator[Timings]:
+    """Collect the stage() timings of everything run inside the block."""
+    timings, token = begin_timings()
+    try:
+        yield timings
+    finally:
+        end_timings(token)
+
+
+def current_timings() -> Optional[Timings]:
+    return _current.get()
+
+
+# ── Stage timer ───────────────────────────────────────────────────────────────
+
+@contextlib.contextmanager
+def stage(name: str, host: Optional[str] = None, kind: Optional[str] = None) -> Iterator[None]:
+    """
+    Time the block as pipeline stage *name*. With *host*, the time is also
+    recorded per host under *kind* (defaults to the stage name).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        observe(name, time.perf_counter() - started, host=host, kind=kind)
+
+
+def observe(name: str, seconds: float, host: Optional[str] = None, kind: Optional[str] = None) -> None:
+    """Record an already-measured stage (for spans that are not one block)."""
+    STAGE_SECONDS.observe(seconds, stage=name)
+    if host is not None:
+        HOST_FETCH_SECONDS.observe(seconds, kind=kind or name, host=host)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
@@ -0,0 +1,197 @@
+"""
+pdf_cache.py — On-disk cache of rendered magazines
+---------------------------------------------------
+Provides:
+  - make_key(): a content key for one magazine — the sorted feed list,
+    days_back, every article's URL and content hash, the template version
+    and the issue date printed on the cover
+  - get_or_build(): returns the cached PDF for a key, or runs the build
+    once; concurrent callers with the same key wait for that one build
+    instead of starting their own (singleflight.pdfs)
+  - Size-bounded LRU eviction and TTL expiry (a file's mtime is when it
+    was rendered, its atime when it was last served)
+  - Process-wide hit / miss / shared counters
+
+Identical magazines are rendered once and then served from disk; the key
+doubles as the PDF's ETag.
+
+Environment variables:
+    PDF_CACHE_DIR         Where PDFs are kept (default api/cache/pdfs)
+    PDF_CACHE_TTL         Seconds a PDF stays servable (default 6 hours)
+    PDF_CACHE_MAX_BYTES   Total size bound (default 500 MB). 0 disables
+                          the cache; server.py then renders per job
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import singleflight
+import templating
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PDF_CACHE_DIR = os.getenv(
+    "PDF_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "cache", "pdfs"),
+)
+PDF_CACHE_TTL       = int(os.getenv("PDF_CACHE_TTL", 6 * 60 * 60))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 500 * 1024 * 1024))
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+
+def article_hash(article: Dict) -> str:
+    """Hash of everything about *article* that ends up on the page."""
+    return hashlib.sha256(
+        json.dumps(article, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def make_key(feeds: List[str], days_back: int, articles: List[Dict],
+             issue_date: Optional[str] = None) -> str:
+    """
+    Content key of a magazine. Feed order does not matter (the list is
+    sorted); article order, content, templates and the cover date do.
+    """
+    payload = {
+        "feeds":     sorted(feeds),
+        "days_back": days_back,
+        "articles":  [(a.get("url"), article_hash(a)) for a in articles],
+        "template":  templating.template_version(),
+        "issued":    issue_date or time.strftime("%Y-%m-%d"),
+    }
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:40]
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+
+class PdfCache:
+    """Directory of <key>.pdf files with TTL, LRU size bound and in-flight sharing."""
+
+    def __init__(self, directory: str = PDF_CACHE_DIR, ttl: int = PDF_CACHE_TTL,
+                 max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl       = ttl
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        self._hits     = 0
+        self._misses   = 0
+        self._shared   = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached PDF for *key*, or None if absent or expired."""
+        if not self.enabled:
+            return None
+        path = self.path_for(key)
+        now  = time.time()
+        try:
+            rendered = os.stat(path).st_mtime
+            if now - rendered > self.ttl:
+                os.unlink(path)
+                return None
+            os.utime(path, (now, rendered))     # atime = last use (LRU)
+            return path
+        except OSError:
+            return None
+
+    def get_or_build(self, key: str, build: Callable[[str], None]) -> Tuple[str, str]:
+        """
+        Return ``(path, outcome)`` for *key*. outcome is "hit" (served from
+        disk), "shared" (waited for an identical build already running) or
+        "built" (*build(path)* ran here and wrote the PDF). A failed build
+        raises in every caller waiting on it.
+        """
+        path = self.get(key)
+        if path is not None:
+            with self._lock:
+                self._hits += 1
+            return path, "hit"
+
+        path, shared = singleflight.pdfs.do(key, self._build, key, build)
+        with self._lock:
+            if shared:
+                self._shared += 1
+            else:
+                self._misses += 1
+        return path, "shared" if shared else "built"
+
+    def _build(self, key: str, build: Callable[[str], None]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        final   = self.path_for(key)
+        partial = f"{final}.{threading.get_ident()}.tmp.pdf"
+        try:
+            build(partial)
+            os.replace(partial, final)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+        self.evict()
+        return final
+
+    def evict(self) -> int:
+        """Drop expired PDFs, then least-recently-used ones beyond max_bytes."""
+        now = time.time()
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            if not name.endswith(".pdf") or ".tmp." in name:    # builds in progress
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_mtime, st.st_size, path))
+
+        removed = 0
+        total   = sum(size for _, _, size, _ in entries)
+        for _used, rendered, size, path in sorted(entries):
+            if now - rendered <= self.ttl and total <= self.max_bytes:
+                continue
+            try:
+                os.unlink(path)
+                removed += 1
+                total   -= size
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits, misses, shared = self._hits, self._misses, self._shared
+        total = hits + misses + shared
+        return {
+            "hits":      hits,
+            "misses":    misses,
+            "shared":    shared,
+            "building":  singleflight.pdfs.stats()["in_flight"],
+            "hit_ratio": round((hits + shared) / total, 3) if total else 0.0,
+        }
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+cache = PdfCache()
+
+
+def get_or_build(key: str, build: Callable[[str], None]) -> Tuple[str, str]:
+    return cache.get_or_build(key, build)
+
+
+def stats() -> Dict:
+    return cache.stats()
@@ -0,0 +1,256 @@
+"""
+prewarm.py — Background pre-warming of popular feeds
+-----------------------------------------------------
+Provides:
+  - An in-process scheduler thread that polls registered feeds and scrapes
+    their new entries into the article cache before anyone asks for them,
+    so /api/generate for the preset feeds only has to render
+  - Adaptive polling: each feed's interval follows how often it publishes
+    (half its median gap between posts), backs off when a poll finds
+    nothing new, and backs off harder on errors
+  - One scheduler per host: the thread polls only while it holds an
+    exclusive lock on PREWARM_LOCK_PATH. Every other worker process waits
+    on that lock in standby and takes over if the holder exits
+  - status() for the /api/prewarm/status endpoint
+
+Started by server.start_background_tasks() — from the entry points, from
+gunicorn.conf.py's post_worker_init hook, or on a worker's first request —
+rather than at import, so processes that only import the pipeline never poll:
+
+    import prewarm
+    prewarm.start()
+
+Environment variables:
+    PREWARM_ENABLED        "false" to disable (default "true")
+    PREWARM_LOCK_PATH      Lock file electing the polling process
+                           (default api/cache/prewarm.lock)
+    PREWARM_FEEDS          Comma-separated feed URLs (default: main.DEFAULT_FEEDS,
+                           i.e. the client's Technology preset)
+    PREWARM_DAYS_BACK      Window to keep warm (default 7, the client default)
+    PREWARM_INTERVAL       Starting poll interval in seconds (default 900)
+    PREWARM_MIN_INTERVAL   Lower bound in seconds (default 300)
+    PREWARM_MAX_INTERVAL   Upper bound in seconds (default 6 hours)
+"""
+
+import datetime
+import os
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional
+
+from main import DEFAULT_FEEDS, warm_feed
+
+try:
+    import fcntl
+except ImportError:     # Windows: no cross-process election, every process polls
+    fcntl = None
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PREWARM_ENABLED      = os.getenv("PREWARM_ENABLED", "true") == "true"
+PREWARM_FEEDS        = [u.strip() for u in os.getenv("PREWARM_FEEDS", "").split(",") if u.strip()] or list(DEFAULT_FEEDS)
+PREWARM_DAYS_BACK    = int(os.getenv("PREWARM_DAYS_BACK", 7))
+PREWARM_INTERVAL     = float(os.getenv("PREWARM_INTERVAL", 15 * 60))
+PREWARM_MIN_INTERVAL = float(os.getenv("PREWARM_MIN_INTERVAL", 5 * 60))
+PREWARM_MAX_INTERVAL = float(os.getenv("PREWARM_MAX_INTERVAL", 6 * 60 * 60))
+PREWARM_LOCK_PATH    = os.getenv(
+    "PREWARM_LOCK_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "prewarm.lock"),
+)
+
+#: Interval multiplier after a poll with nothing new / after a failed poll.
+_IDLE_BACKOFF  = 1.5
+_ERROR_BACKOFF = 2.0
+
+
+# ── Per-feed state ────────────────────────────────────────────────────────────
+
+class _FeedState:
+    def __init__(self, url: str):
+        self.url        = url
+        self.interval   = PREWARM_INTERVAL
+        self.next_run   = time.time()
+        self.last_run:  Optional[float] = None
+        self.last_ok:   Optional[float] = None
+        self.last_new   = 0
+        self.runs       = 0
+        self.errors     = 0
+        self.last_error: Optional[str] = None
+        self.publish_gap: Optional[float] = None
+
+    def as_dict(self) -> Dict:
+        def iso(ts):
+            return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).isoformat() if ts else None
+        return {
+            "url":                 self.url,
+            "interval_seconds":    round(self.interval),
+            "publish_gap_seconds": round(self.publish_gap) if self.publish_gap else None,
+            "last_run":            iso(self.last_run),
+            "last_success":        iso(self.last_ok),
+            "next_run":            iso(self.next_run),
+            "last_new_articles":   self.last_new,
+            "runs":                self.runs,
+            "errors":              self.errors,
+            "last_error":          self.last_error,
+        }
+
+
+def _clamp(seconds: float) -> float:
+    return max(PREWARM_MIN_INTERVAL, min(PREWARM_MAX_INTERVAL, seconds))
+
+
+def _median_gap(published: List[datetime.datetime]) -> Optional[float]:
+    """Median seconds between the 20 most recent posts, or None if unknown."""
+    recent = sorted(published, reverse=True)[:20]
+    gaps   = [(a - b).total_seconds() for a, b in zip(recent, recent[1:]) if a > b]
+    return statistics.median(gaps) if gaps else None
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+
+class PrewarmScheduler:
+    """
+    Single daemon thread that runs the feed due soonest, then sleeps. With
+    *lock_path*, it first waits for an exclusive lock on that file, so of
+    several processes sharing the path only one polls at a time.
+    """
+
+    def __init__(self, feeds: List[str], days_back: int = PREWARM_DAYS_BACK,
+                 lock_path: Optional[str] = PREWARM_LOCK_PATH):
+        self.days_back = days_back
+        self.lock_path = lock_path
+        self._feeds    = {url: _FeedState(url) for url in feeds}
+        self._lock     = threading.Lock()
+        self._wake     = threading.Event()
+        self._stop     = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._leader   = False
+        self._lock_error: Optional[str] = None
+
+    def register(self, url: str) -> None:
+        """Add a feed at runtime; it is polled right away."""
+        with self._lock:
+            self._feeds.setdefault(url, _FeedState(url))
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        """True while this process's thread is polling (not in standby)."""
+        return bool(self._thread and self._thread.is_alive() and self._leader)
+
+    def _elect(self):
+        """
+        Block until this process holds the lock; returns the open lock file
+        (kept open for as long as the thread lives), or None without locking.
+        """
+        if not self.lock_path or fcntl is None:
+            return None
+        try:
+            os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+            handle = open(self.lock_path, "a")
+        except OSError as e:
+            self._lock_error = str(e)
+            print(f"  [!] Pre-warm lock unavailable ({self.lock_path}): {e} — polling without it")
+            return None
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _loop(self) -> None:
+        handle = self._elect()
+        self._leader = True
+        try:
+            self._run()
+        finally:
+            self._leader = False
+            if handle is not None:
+                handle.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                state = min(self._feeds.values(), key=lambda s: s.next_run, default=None)
+            delay = (state.next_run - time.time()) if state else PREWARM_MAX_INTERVAL
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue
+            self._poll(state)
+
+    def _poll(self, state: _FeedState) -> None:
+        state.last_run = time.time()
+        state.runs    += 1
+        try:
+            result = warm_feed(state.url, days_back=self.days_back)
+            if result["error"]:
+                raise RuntimeError(result["error"])
+        except Exception as e:
+            state.errors    += 1
+            state.last_error = str(e)
+            state.interval   = _clamp(state.interval * _ERROR_BACKOFF)
+            print(f"  [!] Pre-warm failed for {state.url}: {e}")
+        else:
+            state.last_ok    = time.time()
+            state.last_new   = result["scraped"]
+            state.last_error = None
+            gap = _median_gap(result["published"])
+            if gap:
+                state.publish_gap = gap
+            if result["scraped"] and state.publish_gap:
+                # Poll about twice per publishing interval while it's active.
+                state.interval = _clamp(state.publish_gap / 2)
+            elif not result["scraped"]:
+                state.interval = _clamp(state.interval * _IDLE_BACKOFF)
+            if result["scraped"]:
+                print(f"✓ Pre-warmed {result['scraped']} article(s) from {state.url}")
+        state.next_run = time.time() + state.interval
+
+    @property
+    def state(self) -> str:
+        """"disabled", "not_started", "standby" (another process polls) or "running"."""
+        if not PREWARM_ENABLED:
+            return "disabled"
+        if not (self._thread and self._thread.is_alive()):
+            return "not_started"
+        return "running" if self._leader else "standby"
+
+    def status(self) -> Dict:
+        with self._lock:
+            feeds = [s.as_dict() for s in self._feeds.values()]
+        return {
+            "enabled":    PREWARM_ENABLED,
+            "running":    self.running,
+            "state":      self.state,
+            "pid":        os.getpid(),
+            "lock_path":  self.lock_path if fcntl is not None else None,
+            "lock_error": self._lock_error,
+            "days_back":  self.days_back,
+            "feeds":      feeds,
+        }
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+scheduler = PrewarmScheduler(PREWARM_FEEDS)
+
+
+def start() -> None:
+    """Start the background scheduler if PREWARM_ENABLED."""
+    if PREWARM_ENABLED:
+        scheduler.start()
+
+
+def status() -> Dict:
+    return scheduler.status()
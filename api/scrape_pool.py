@@ -0,0 +1,140 @@
+"""
+scrape_pool.py — Concurrent article scraping for Digest
+--------------------------------------------------------
+Provides:
+  - One process-wide worker pool shared by every fetch_articles call
+    (its size is the global in-flight limit)
+  - A per-host limit, so a feed with 30 techcrunch.com links never opens
+    30 simultaneous connections to the same publisher
+  - Host-aware dispatch: work queued behind a busy host never occupies a
+    worker thread, so other hosts keep flowing while it waits
+
+Typical use:
+
+    from scrape_pool import submit
+
+    futures = [submit(url, scrape_article, url) for url in urls]
+    results = [f.result() for f in futures]     # same order as urls
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+#: Maximum article fetches in flight across the whole process.
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", 16))
+
+#: Maximum article fetches in flight against any single host.
+SCRAPE_PER_HOST = int(os.getenv("SCRAPE_PER_HOST", 4))
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+
+_Task = Tuple[Future, Callable, tuple, dict]
+
+
+def _host_key(url: str) -> str:
+    try:
+        return (urlparse(url).hostname or "").lower()
+    except Exception:
+        return ""
+
+
+class HostScheduler:
+    """
+    Thread pool with a global worker cap and a per-host concurrency cap.
+
+    Tasks are only handed to the executor once their host has a free slot;
+    the rest wait in a per-host queue and are released as earlier tasks for
+    that host finish.  Results come back through ordinary Futures.
+    """
+
+    def __init__(self, max_workers: int = SCRAPE_MAX_WORKERS, per_host: int = SCRAPE_PER_HOST):
+        self.max_workers = max(1, max_workers)
+        self.per_host    = max(1, per_host)
+        self._executor   = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scrape")
+        self._lock       = threading.Lock()
+        self._active:  Dict[str, int]          = {}
+        self._pending: Dict[str, Deque[_Task]] = {}
+
+    def submit(self, url: str, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule ``fn(*args, **kwargs)`` against the host of *url*."""
+        host   = _host_key(url)
+        future: Future = Future()
+        task   = (future, fn, args, kwargs)
+
+        with self._lock:
+            if self._active.get(host, 0) < self.per_host:
+                self._active[host] = self._active.get(host, 0) + 1
+                run_now = True
+            else:
+                self._pending.setdefault(host, deque()).append(task)
+                run_now = False
+
+        if run_now:
+            self._dispatch(host, task)
+        return future
+
+    def _dispatch(self, host: str, task: _Task) -> None:
+        self._executor.submit(self._run, host, task)
+
+    def _run(self, host: str, task: _Task) -> None:
+        future, fn, args, kwargs = task
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            self._release(host)
+
+    def _release(self, host: str) -> None:
+        nxt: Optional[_Task] = None
+        with self._lock:
+            queue = self._pending.get(host)
+            if queue:
+                nxt = queue.popleft()          # slot passes straight to the next task
+                if not queue:
+                    del self._pending[host]
+            else:
+                self._active[host] -= 1
+                if not self._active[host]:
+                    del self._active[host]
+        if nxt is not None:
+            self._dispatch(host, nxt)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "active_hosts": len(self._active),
+                "in_flight":    sum(self._active.values()),
+                "queued":       sum(len(q) for q in self._pending.values()),
+            }
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+_scheduler: Optional[HostScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> HostScheduler:
+    """Return the shared scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = HostScheduler()
+    return _scheduler
+
+
+def submit(url: str, fn: Callable, *args, **kwargs) -> Future:
+    """Shortcut for ``get_scheduler().submit(url, fn, *args, **kwargs)``."""
+    return get_scheduler().submit(url, fn, *args, **kwargs)
@@ -4,7 +4,9 @@ security.py — API security middleware for Digest
 Provides:
   - CSRF token authentication (single-use + expiring)
   - Rate limiting via flask-limiter
-  - SSRF protection (private IP / scheme blocking + DNS rebinding defence)
+  - SSRF protection (private IP / scheme blocking + DNS rebinding defence),
+    resolving through dns_cache so http_client connects to the addresses
+    that were checked
   - Feed count and request body size limits
   - Malicious URL scraping prevention
 
@@ -28,18 +30,19 @@ Typical setup in server.py:
 """
 
 import os
-import time
 import secrets
-import socket
 import ipaddress
 import functools
 from urllib.parse import urlparse
-from typing import Dict, List, Tuple
+from typing import List, Tuple
 
 from flask import Flask, request, jsonify
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
+import dns_cache
+import token_store
+
 
 # ── Constants ─────────────────────────────────────────────────────────────────
 
@@ -86,20 +89,9 @@ _PRIVATE_NETWORKS = [
 
 # ── CSRF token store ──────────────────────────────────────────────────────────
 #
-# Simple in-memory dict: { token: expires_at_unix_timestamp }
-# Fine for a single-dyno deployment. If you ever scale to multiple dynos,
-# swap this for a Redis-backed store using RATELIMIT_STORAGE_URI.
-
-_token_store: Dict[str, float] = {}
-
-
-def _purge_expired_tokens() -> None:
-    """Remove stale tokens from the store (called on every issue + verify)."""
-    now = time.time()
-    expired = [t for t, exp in _token_store.items() if exp < now]
-    for t in expired:
-        del _token_store[t]
-
+# Tokens live in token_store.store, chosen by TOKEN_STORE_URL: in-process
+# memory by default, or a SQLite file / Redis shared by every worker so a
+# token issued by one process can be consumed by another.
 
 def issue_csrf_token() -> str:
     """
@@ -113,9 +105,8 @@ def issue_csrf_token() -> str:
         def get_token():
             return jsonify({"token": issue_csrf_token()})
     """
-    _purge_expired_tokens()
     token = secrets.token_hex(32)
-    _token_store[token] = time.time() + TOKEN_TTL_SECONDS
+    token_store.store.add(token, TOKEN_TTL_SECONDS)
     return token
 
 
@@ -125,18 +116,9 @@ def _consume_csrf_token(token: str) -> bool:
 
     Returns True if the token was valid and unexpired, False otherwise.
     """
-    _purge_expired_tokens()
-
-    if not token or token not in _token_store:
+    if not token:
         return False
-
-    if time.time() > _token_store[token]:
-        del _token_store[token]
-        return False
-
-    # Valid — consume it so it can never be reused
-    del _token_store[token]
-    return True
+    return token_store.store.consume(token)
 
 
 # ── CSRF decorator ────────────────────────────────────────────────────────────
@@ -151,7 +133,7 @@ def require_csrf(fn):
       3. Use it within TOKEN_TTL_SECONDS (default 5 minutes)
 
     Tokens are single-use — consumed on first valid use, preventing replays.
-    Expired tokens in the store are purged automatically on each call.
+    Expired tokens are purged by the store (see token_store.py).
 
     Example:
         @app.post("/api/generate")
@@ -177,6 +159,8 @@ def _is_private_ip(ip_str: str) -> bool:
     """Return True if the IP falls within any blocked/private network."""
     try:
         addr = ipaddress.ip_address(ip_str)
+        if getattr(addr, "ipv4_mapped", None):
+            addr = addr.ipv4_mapped      # ::ffff:127.0.0.1 reaches 127.0.0.1
         return any(addr in net for net in _PRIVATE_NETWORKS)
     except ValueError:
         return True   # unparseable → treat as unsafe
@@ -184,14 +168,11 @@ def _is_private_ip(ip_str: str) -> bool:
 
 def _resolve_host(hostname: str) -> List[str]:
     """
-    Resolve hostname to a deduplicated list of IP strings.
+    Resolve hostname to a deduplicated list of IP strings (through the
+    shared DNS cache, which http_client pins its connections to).
     Returns an empty list on DNS failure.
     """
-    try:
-        results = socket.getaddrinfo(hostname, None)
-        return list({r[4][0] for r in results})
-    except socket.gaierror:
-        return []
+    return dns_cache.resolve(hostname)
 
 
 def check_url_safe(url: str) -> Tuple[bool, str]:
@@ -259,6 +240,18 @@ def validate_feed_urls(urls: List[str]) -> Tuple[bool, str]:
     if len(urls) > MAX_FEEDS:
         return False, f"A maximum of {MAX_FEEDS} feed URLs are allowed per request."
 
+    # Resolve every feed host at once; the per-URL checks below then read
+    # the DNS cache instead of blocking on one lookup after another.
+    hosts = set()
+    for url in urls:
+        try:
+            hosts.add(urlparse(url).hostname or "")
+        except (AttributeError, TypeError, ValueError):
+            pass    # check_url_safe() reports it below
+    hosts.discard("")
+    if len(hosts) > 1:
+        dns_cache.resolve_many(hosts)
+
     for url in urls:
         safe, reason = check_url_safe(url)
         if not safe:
@@ -286,9 +279,12 @@ def init_security(app: Flask) -> Limiter:
         def generate(): ...
 
     Environment variables:
-        RATELIMIT_STORAGE_URI   Redis URL for distributed rate limiting.
-                                Defaults to in-process memory — perfectly
-                                fine for a single-dyno indie deployment.
+        RATELIMIT_STORAGE_URI   Redis URL (or sqlite://<path>, see
+                                token_store.py) for rate limits shared by
+                                several workers. Defaults to TOKEN_STORE_URL
+                                when that is shared, else in-process memory —
+                                perfectly fine for a single-dyno deployment.
+        TOKEN_STORE_URL         Where CSRF tokens live (see token_store.py).
         FLASK_SECRET_KEY        Required for session support. Generate with:
                                   openssl rand -hex 32
     """
@@ -317,7 +313,7 @@ def init_security(app: Flask) -> Limiter:
         key_func=get_remote_address,
         app=app,
         default_limits=["200 per hour"],
-        storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
+        storage_uri=os.getenv("RATELIMIT_STORAGE_URI", token_store.TOKEN_STORE_URL),
     )
 
     @app.errorhandler(429)
@@ -1,15 +1,36 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from dotenv import load_dotenv
 load_dotenv()
 
 
 import os
+import hmac
+import json
 import asyncio
+import concurrent.futures
 import tempfile
-import feedparser
+import threading
 import requests
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from typing import Optional, Set
+from flask import Flask, Response, g, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 
+import article_cache
+import bootstrap
+import browser_pool
+import cpu_pool
+import dns_cache
+import feed_store
+import http_client
+import jobs
+import metrics
+import pdf_cache
+import prewarm
+import scrape_pool
+import singleflight
+from feed_fetch import download_feed, parse_feed
 from main import fetch_articles, build_pdf, scrape_article
 from security import init_security, require_csrf, validate_feed_urls, check_url_safe, issue_csrf_token
 
@@ -20,28 +41,123 @@ CORS(app, origins=_cors_origins, supports_credentials=False)
 
 limiter = init_security(app)
 
-# Realistic browser headers — many RSS endpoints 403 bot user-agents
-FETCH_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/124.0.0.0 Safari/537.36"
-    ),
-    "Accept":          "application/rss+xml, application/atom+xml, application/xml, text/xml, */*",
-    "Accept-Language": "en-GB,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Cache-Control":   "no-cache",
-}
+
+_background_lock    = threading.Lock()
+_background_started = False
+
+
+def start_background_tasks() -> None:
+    """
+    Start the prewarm scheduler and bootstrap's warm-up, once per process.
+    Called by the entry points (below, asgi.py's lifespan startup and
+    gunicorn.conf.py's post_worker_init) and, as a fallback for any other
+    WSGI server, by the first request a process handles — never at import,
+    so processes that only import this module (cpu_pool workers, benchmarks,
+    tooling) do not each start polling the same feeds. Of several worker
+    processes, prewarm's lock lets only one poll at a time.
+    """
+    global _background_started
+    if _background_started:
+        return
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    prewarm.start()
+    bootstrap.start_warm_up()
+
+
+@app.before_request
+def _ensure_background_tasks():
+    if not _background_started:
+        start_background_tasks()
+
+
+#: SSE: comment line sent while a job is quiet, and the client reconnect delay.
+SSE_KEEPALIVE_SECONDS = 15
+SSE_RETRY_MS          = 2000
+
+#: Longest a job's event stream stays open under a single-threaded WSGI
+#: worker (wsgi.multithread false, e.g. gunicorn's sync worker). There the
+#: stream blocks the worker's heartbeat too, so a stream longer than
+#: gunicorn's timeout (30s by default) gets the worker killed; 25s stays
+#: under it, and the client's EventSource reconnects with Last-Event-ID.
+#: Threaded workers (gthread, as gunicorn.conf.py uses, or the Flask dev
+#: server) heartbeat from another thread, and asgi.py holds no thread at
+#: all, so they stream for the life of the job. SSE_WSGI_MAX_SECONDS
+#: overrides both (0 = no limit).
+SSE_SYNC_WORKER_MAX_SECONDS = 25
+SSE_WSGI_MAX_SECONDS: Optional[float] = (
+    float(os.environ["SSE_WSGI_MAX_SECONDS"]) if os.getenv("SSE_WSGI_MAX_SECONDS") else None
+)
+
+
+def _sse_max_seconds(environ) -> float:
+    if SSE_WSGI_MAX_SECONDS is not None:
+        return SSE_WSGI_MAX_SECONDS
+    return 0 if environ.get("wsgi.multithread") else SSE_SYNC_WORKER_MAX_SECONDS
+
+#: Where finished job PDFs live until jobs.JOB_RESULT_TTL expires them.
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "digest-jobs"))
+
+#: Import-to-ready time the server should start within. Startup is logged
+#: either way; going over budget is logged as a warning. Heavy libraries
+#: (newspaper3k, NLTK, Playwright) load lazily or in bootstrap's warm-up.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", 0.5))
+
+#: Bearer token required by /api/metrics. Unset = the endpoint answers 404
+#: (behind the proxy every client looks local, so there is no safe open mode).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+# ── Request timing ────────────────────────────────────────────────────────────
+# Every request gets a metrics.Timings; stages timed while handling it show up
+# in a Server-Timing header, and requests that ran pipeline stages log one
+# structured JSON line.
+
+@app.before_request
+def _start_timing():
+    g.timings, g.timings_token = metrics.begin_timings()
+
+
+@app.after_request
+def _finish_timing(response):
+    timings = getattr(g, "timings", None)
+    if timings is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - timings.started,
+        endpoint=endpoint, method=request.method, status=response.status_code,
+    )
+    response.headers["Server-Timing"] = timings.server_timing()
+    if timings.stages:
+        print(json.dumps({
+            "event":    "request_timing",
+            "endpoint": endpoint,
+            "method":   request.method,
+            "status":   response.status_code,
+            **timings.summary(),
+        }), flush=True)
+    return response
+
+
+@app.teardown_request
+def _end_timing(_exc):
+    token = g.pop("timings_token", None)
+    if token is not None:
+        metrics.end_timings(token)
 
 
 # ── Health ────────────────────────────────────────────────────────────────────
-# Public — no auth, no tight rate limit.  Used by uptime monitors.
+# Public — no auth, no tight rate limit.  Used by uptime monitors.  "warm_up"
+# is bootstrap's state in the answering worker ("done" once it is warm).
 
 @app.get("/api/health")
 @require_csrf
 @limiter.limit("60/minute")
 def health():
-    return jsonify({"status": "ok"})
+    return jsonify({"status": "ok", "warm_up": bootstrap.status()["state"]})
 
 @app.get("/api/csrf-token")
 @limiter.limit("30/minute")
@@ -56,15 +172,22 @@ def get_csrf_token():
 @limiter.limit("30/hour")
 def validate():
     body = request.get_json(silent=True) or {}
-    url  = (body.get("url") or "").strip()
+    report, status = validate_report((body.get("url") or "").strip())
+    return jsonify(report), status
+
 
+def validate_report(url: str):
+    """
+    Run the /api/validate checks on *url*; returns ``(report, http_status)``.
+    Blocking: it downloads the feed and scrapes a sample article.
+    """
     if not url:
-        return jsonify({"error": "A feed URL is required."}), 400
+        return {"error": "A feed URL is required."}, 400
 
     # ── SSRF check before we touch the network ─────────────────────────────
     safe, reason = check_url_safe(url)
     if not safe:
-        return jsonify({"error": f"URL rejected: {reason}"}), 400
+        return {"error": f"URL rejected: {reason}"}, 400
 
     report = {
         "url":    url,
@@ -78,27 +201,27 @@ def validate():
         "sample_article": None,
     }
 
-    # 1 — Reachable
+    # 1 — Reachable (the body is kept and parsed below — one download only)
     try:
-        resp = requests.get(url, timeout=10, headers=FETCH_HEADERS)
-        resp.raise_for_status()
-        report["checks"]["reachable"] = {"ok": True, "detail": f"HTTP {resp.status_code}"}
+        raw = download_feed(url)
+        report["checks"]["reachable"] = {"ok": True, "detail": f"HTTP {raw['status']}"}
     except requests.exceptions.Timeout:
-        report["checks"]["reachable"] = {"ok": False, "detail": "Timed out after 10s"}
+        report["checks"]["reachable"] = {"ok": False, "detail": f"Timed out after {http_client.HTTP_READ_TIMEOUT:g}s"}
         report["status"] = "error"
-        return jsonify(report)
+        return report, 200
     except requests.exceptions.RequestException as e:
         report["checks"]["reachable"] = {"ok": False, "detail": str(e)}
         report["status"] = "error"
-        return jsonify(report)
+        return report, 200
 
     # 2 — Parseable
     try:
-        feed    = feedparser.parse(url, agent=FETCH_HEADERS["User-Agent"])
-        entries = feed.entries
+        with metrics.stage("feed_parse"):
+            feed = cpu_pool.run(parse_feed, raw, url)
+        entries = feed["entries"]
         count   = len(entries)
-        if feed.bozo and not entries:
-            raise ValueError(str(feed.bozo_exception))
+        if feed["error"]:
+            raise ValueError(feed["error"])
         report["checks"]["parseable"] = {
             "ok":          count > 0,
             "detail":      f"{count} {'entry' if count == 1 else 'entries'} found" if count > 0 else "No entries found",
@@ -106,18 +229,15 @@ def validate():
         }
         if count == 0:
             report["status"] = "error"
-            return jsonify(report)
+            return report, 200
     except Exception as e:
         report["checks"]["parseable"] = {"ok": False, "detail": str(e), "entry_count": 0}
         report["status"] = "error"
-        return jsonify(report)
+        return report, 200
 
     # 3 — Has dates
     sample_size = min(len(entries), 10)
-    dated = sum(
-        1 for e in entries[:sample_size]
-        if any(getattr(e, a, None) for a in ("published", "updated", "published_parsed", "updated_parsed"))
-    )
+    dated = sum(1 for e in entries[:sample_size] if e["published"])
     report["checks"]["has_dates"] = {
         "ok":    dated > 0,
         "detail": f"{dated}/{sample_size} entries have timestamps" if dated > 0 else "No date fields found",
@@ -128,15 +248,15 @@ def validate():
     # 4 — Scrapeable
     # Only scrape article URLs that also pass the SSRF check
     sample_entry = next(
-        (e for e in entries[:5] if e.get("link") and check_url_safe(e["link"])[0]),
+        (e for e in entries[:5] if e["link"] and check_url_safe(e["link"])[0]),
         None,
     )
     if not sample_entry:
         report["checks"]["scrapeable"] = {"ok": False, "detail": "No safe article links in feed", "sample_title": ""}
         report["status"] = "partial" if report["status"] == "ok" else report["status"]
     else:
-        sample_url   = sample_entry.get("link", "")
-        sample_title = sample_entry.get("title", "(No title)")
+        sample_url   = sample_entry["link"]
+        sample_title = sample_entry["title"]
         scraped      = scrape_article(sample_url)
         if scraped["summary"]:
             report["checks"]["scrapeable"] = {"ok": True, "detail": "Article body extracted", "sample_title": sample_title}
@@ -159,11 +279,121 @@ def validate():
     any_ok = any(c["ok"] for c in report["checks"].values())
     report["status"] = "ok" if all_ok else ("partial" if any_ok else "error")
 
-    return jsonify(report)
+    return report, 200
 
 
 # ── Generate ──────────────────────────────────────────────────────────────────
-# Most expensive endpoint — tightest rate limit.
+# Most expensive endpoint — tightest rate limit.  The work runs as a background
+# job; the client polls /api/jobs/<id> and downloads from /api/jobs/<id>/pdf.
+
+#: The ASGI server's event loop, once asgi.py has started. PDF renders then
+#: run on that one long-lived loop instead of a fresh asyncio.run() per job.
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+#: Job coroutines running on _event_loop, cancelled when it is taken away.
+_loop_futures: Set[concurrent.futures.Future] = set()
+_loop_lock = threading.Lock()
+
+LOOP_SHUTDOWN_MESSAGE = "The server shut down before the PDF was ready. Please try again."
+
+
+def use_event_loop(loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """
+    Run job coroutines on *loop* (None: back to asyncio.run per job).
+    Coroutines still running on the previous loop are cancelled, so the
+    jobs waiting on them fail instead of blocking forever once it stops.
+    """
+    global _event_loop
+    with _loop_lock:
+        _event_loop = loop
+        outstanding = list(_loop_futures)
+    for future in outstanding:
+        future.cancel()
+
+
+def _run_coroutine(coro):
+    """Drive *coro* to completion from a job thread."""
+    with _loop_lock:
+        loop = _event_loop
+        future = None
+        if loop is not None and loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+            _loop_futures.add(future)
+    if future is None:
+        return asyncio.run(coro)
+    try:
+        return future.result()
+    except concurrent.futures.CancelledError:
+        raise jobs.JobError(LOOP_SHUTDOWN_MESSAGE, 503) from None
+    finally:
+        with _loop_lock:
+            _loop_futures.discard(future)
+
+
+def _run_generation(job: jobs.Job, feeds, days_back):
+    with metrics.request_timings() as timings:
+        timings.add("queue_wait", job.started_at - job.created_at)
+        try:
+            result = _generate(job, feeds, days_back)
+        finally:
+            summary = timings.summary()
+            print(json.dumps({"event": "generation_timing", "job_id": job.id, **summary}), flush=True)
+    result["timings"] = summary
+    return result
+
+
+def _generate(job: jobs.Job, feeds, days_back):
+    stats = {}
+    try:
+        articles = fetch_articles(feeds, days_back=days_back, stats=stats, progress=job.emit)
+    except Exception as e:
+        raise jobs.JobError(f"Scraping failed: {str(e)}")
+
+    if not articles:
+        raise jobs.JobError("No articles found in the requested time window.", 404)
+
+    if pdf_cache.cache.enabled:
+        return _generate_cached(job, feeds, days_back, articles, stats)
+
+    os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+    pdf_path = os.path.join(JOB_OUTPUT_DIR, f"{job.id}.pdf")
+    try:
+        _run_coroutine(build_pdf(articles, output_path=pdf_path, progress=job.emit))
+    except Exception as e:
+        if os.path.exists(pdf_path):
+            os.unlink(pdf_path)
+        if isinstance(e, jobs.JobError):
+            raise
+        raise jobs.JobError(f"PDF generation failed: {str(e)}")
+
+    return {"pdf_path": pdf_path, "articles": len(articles), "stats": stats}
+
+
+def _generate_cached(job: jobs.Job, feeds, days_back, articles, stats):
+    """Serve an identical magazine from pdf_cache, or render it there once."""
+    key = pdf_cache.make_key(feeds, days_back, articles)
+
+    def build(path: str) -> None:
+        _run_coroutine(build_pdf(articles, output_path=path, progress=job.emit))
+
+    try:
+        pdf_path, outcome = pdf_cache.get_or_build(key, build)
+    except jobs.JobError:
+        raise
+    except Exception as e:
+        raise jobs.JobError(f"PDF generation failed: {str(e)}")
+
+    if outcome != "built":
+        job.emit("pdf_written", {"bytes": os.path.getsize(pdf_path), "cached": outcome})
+    return {
+        "pdf_path":   pdf_path,
+        "pdf_cached": True,
+        "pdf_etag":   key,
+        "pdf_cache":  outcome,
+        "articles":   len(articles),
+        "stats":      stats,
+    }
+
 
 @app.post("/api/generate")
 @require_csrf
@@ -181,36 +411,270 @@ def generate():
     if not ok:
         return jsonify({"error": err}), 400
 
-    # ── Scrape ────────────────────────────────────────────────────────────
+    # ── Queue ──────────────────────────────────────────────────────────────
     try:
-        articles = fetch_articles(feeds, days_back=days_back)
-    except Exception as e:
-        return jsonify({"error": f"Scraping failed: {str(e)}"}), 500
+        job = submit_generation(feeds, days_back)
+    except jobs.QueueFull:
+        response = jsonify({"error": BUSY_MESSAGE})
+        response.headers["Retry-After"] = "60"
+        return response, 503
 
-    if not articles:
-        return jsonify({"error": "No articles found in the requested time window."}), 404
+    return jsonify(job_links(job)), 202
+
+
+BUSY_MESSAGE = "The server is busy. Please try again in a minute."
+
+
+def submit_generation(feeds, days_back) -> jobs.Job:
+    """Queue a generation job (raises jobs.QueueFull)."""
+    # Identical requests (same feeds in any order, same window) while one
+    # is still queued or running share that job.
+    return jobs.submit(_run_generation, feeds, days_back,
+                       key=json.dumps([sorted(feeds), days_back]))
+
+
+def job_links(job: jobs.Job):
+    """The 202 body of /api/generate: the job plus where to follow it."""
+    return {
+        **job.as_dict(),
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events",
+        "pdf_url":    f"/api/jobs/{job.id}/pdf",
+    }
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+# No CSRF: the unguessable job id is the credential, and polling would
+# otherwise burn through the csrf-token rate limit.
+
+@app.get("/api/jobs/<job_id>")
+@limiter.limit("120/minute")
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found or expired."}), 404
+    return jsonify(job.as_dict())
+
+
+@app.get("/api/jobs/<job_id>/events")
+@limiter.limit("30/minute")
+def job_events(job_id):
+    """
+    Server-Sent Events stream of the job's progress. Replays everything after
+    Last-Event-ID (so EventSource reconnects resume cleanly) and closes after
+    the final ``status`` event — under a sync WSGI worker, also after
+    SSE_SYNC_WORKER_MAX_SECONDS (see _sse_max_seconds).
+    """
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found or expired."}), 404
 
-    # ── Build PDF & stream it back (temp file always cleaned up) ──────────
-    pdf_path = None
     try:
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            pdf_path = tmp.name
-        asyncio.run(build_pdf(articles, output_path=pdf_path))
-        return send_file(
-            pdf_path,
-            mimetype="application/pdf",
-            as_attachment=True,
-            download_name="Tech_Weekly_Pro.pdf",
-        )
-    except Exception as e:
-        return jsonify({"error": f"PDF generation failed: {str(e)}"}), 500
-    finally:
-        # Always clean up the temp file — even if send_file raises
-        if pdf_path and os.path.exists(pdf_path):
-            try:
-                os.unlink(pdf_path)
-            except OSError:
-                pass
+        last_id = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        last_id = 0
+
+    hand_off = request.environ.get(SSE_HAND_OFF)
+    if hand_off is not None:
+        # Under asgi.py: the checks above ran here, the stream itself waits
+        # on the event loop (job_event_stream_async) instead of this thread.
+        hand_off.update(job=job, last_id=last_id)
+        return Response(iter(()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+    return Response(job_event_stream(job, last_id, max_seconds=_sse_max_seconds(request.environ)),
+                    mimetype="text/event-stream", headers=SSE_HEADERS)
+
+
+#: WSGI environ key asgi.py sets to take over a job's event stream.
+SSE_HAND_OFF = "digest.sse_hand_off"
+
+SSE_HEADERS = {
+    "Cache-Control":     "no-cache",
+    "X-Accel-Buffering": "no",     # stop nginx buffering the stream
+}
+
+
+def _sse_messages(events, last_id: int):
+    """``(text, last_id, finished)`` for a batch of job events; [] is a keep-alive."""
+    if not events:
+        return ": keep-alive\n\n", last_id, False
+    parts = []
+    for e in events:
+        last_id = e["id"]
+        parts.append(f"id: {e['id']}\nevent: {e['event']}\ndata: {json.dumps(e['data'])}\n\n")
+        if e["event"] == "status" and e["data"].get("status") in ("done", "error"):
+            return "".join(parts), last_id, True
+    return "".join(parts), last_id, False
+
+
+def job_event_stream(job: jobs.Job, last_id: int, max_seconds: float = 0):
+    """
+    The SSE body for *job*, resuming after *last_id*; ends after the final
+    status, or once it has been open *max_seconds* (0 = no limit).
+    """
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    while True:
+        timeout = SSE_KEEPALIVE_SECONDS
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            timeout = min(timeout, remaining)
+        events = job.wait_events(last_id, timeout=timeout)
+        text, last_id, finished = _sse_messages(events, last_id)
+        yield text
+        if finished:
+            return
+
+
+async def job_event_stream_async(job: jobs.Job, last_id: int):
+    """job_event_stream() for an event loop (asgi.py), as encoded bytes."""
+    yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+    while True:
+        events = await job.wait_events_async(last_id, timeout=SSE_KEEPALIVE_SECONDS)
+        text, last_id, finished = _sse_messages(events, last_id)
+        yield text.encode()
+        if finished:
+            return
+
+
+@app.get("/api/jobs/<job_id>/pdf")
+@limiter.limit("30/minute")
+def job_pdf(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found or expired."}), 404
+    if job.status == "error":
+        return jsonify({"error": job.error}), job.error_code or 500
+    if job.status != "done" or not job.pdf_path:
+        return jsonify({"error": "The PDF is not ready yet.", "status": job.status}), 409
+    if not os.path.exists(job.pdf_path):
+        return jsonify({"error": "The PDF has expired. Please generate it again."}), 410
+
+    # Cached magazines carry their content key as a strong ETag, so a client
+    # re-downloading the same issue gets 304 Not Modified (send_file handles
+    # If-None-Match / If-Modified-Since and Range).
+    stats    = job.result.get("stats", {})
+    response = send_file(
+        job.pdf_path,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name="Tech_Weekly_Pro.pdf",
+        etag=job.result.get("pdf_etag", True),
+        conditional=True,
+        max_age=0,
+    )
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["X-Article-Cache"] = f"hits={stats.get('cache_hits', 0)}; misses={stats.get('cache_misses', 0)}"
+    if job.result.get("pdf_cache"):
+        response.headers["X-PDF-Cache"] = job.result["pdf_cache"]
+    return response
+
+
+# ── Pre-warm status ───────────────────────────────────────────────────────────
+# Read-only view of the background feed scheduler. "state" tells a worker in
+# standby (another process polls) from one whose scheduler never started.
+
+@app.get("/api/prewarm/status")
+@limiter.limit("60/minute")
+def prewarm_status():
+    return jsonify(prewarm.status())
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+# Prometheus text format. Stage histograms come from metrics.py; the gauges
+# below are sampled from the live pools and caches at scrape time.
+
+def _collect_runtime():
+    cache    = article_cache.stats()
+    feeds    = feed_store.store.stats()
+    scrapes  = scrape_pool.get_scheduler().stats()
+    browsers = browser_pool.stats()
+    pool     = http_client.stats()
+    cpu      = cpu_pool.stats()
+    pdfs     = pdf_cache.stats()
+    flights  = singleflight.stats()
+    dns      = dns_cache.stats()
+    job_counts = jobs.status_counts()
+    warm_up    = bootstrap.status()
+    feed_total = sum(feeds.values())
+    return [
+        ("article_cache_lookups_total", "counter", "Article cache lookups by result.",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("article_cache_hit_ratio", "gauge", "Share of article lookups served from the cache.",
+         [({}, cache["hit_ratio"])]),
+        ("feed_fetches_total", "counter", "Feed fetches by outcome (not_modified = conditional GET hit).",
+         [({"outcome": outcome}, n) for outcome, n in feeds.items()]),
+        ("feed_not_modified_ratio", "gauge", "Share of feed fetches answered 304 Not Modified.",
+         [({}, round(feeds.get("not_modified", 0) / feed_total, 3) if feed_total else 0.0)]),
+        ("scrapes_in_flight", "gauge", "Article and image fetches running now.",
+         [({}, scrapes["in_flight"])]),
+        ("scrapes_queued", "gauge", "Fetches waiting for a per-host slot.",
+         [({}, scrapes["queued"])]),
+        ("browser_pool_in_use", "gauge", "PDF renders running now.",
+         [({}, browsers["in_use"])]),
+        ("browser_pool_capacity", "gauge", "PDF renders allowed at once.",
+         [({}, browsers["max_concurrent"])]),
+        ("browser_pool_utilization", "gauge", "in_use / capacity.",
+         [({}, round(browsers["in_use"] / browsers["max_concurrent"], 3))]),
+        ("browser_pool_healthy", "gauge", "Connected Chromium instances.",
+         [({}, sum(1 for b in browsers["browsers"] if b["healthy"]))]),
+        ("browser_renders_total", "counter", "PDF renders completed by the pool.",
+         [({}, browsers["renders"])]),
+        ("job_queue_depth", "gauge", "Generation jobs waiting for a worker.",
+         [({}, job_counts["queued"])]),
+        ("jobs", "gauge", "Generation jobs held, by status.",
+         [({"status": status}, n) for status, n in job_counts.items()]),
+        ("http_client_requests_total", "counter", "Outbound requests through the shared session.",
+         [({}, pool["requests"])]),
+        ("http_client_connections_total", "counter", "Outbound TCP connects, reconnects of pooled connections included.",
+         [({}, pool["connections"])]),
+        ("http_client_reuse_ratio", "gauge", "Share of outbound requests on a reused connection.",
+         [({}, pool["reuse_ratio"])]),
+        ("cpu_pool_workers", "gauge", "Worker processes for parsing and extraction (0 = in-process).",
+         [({}, cpu["workers"])]),
+        ("cpu_pool_tasks_total", "counter", "CPU-bound tasks by where they ran.",
+         [({"where": "worker"}, cpu["tasks"]), ({"where": "inline"}, cpu["inline"])]),
+        ("cpu_pool_recycles_total", "counter", "Pools replaced after a worker crashed.",
+         [({"reason": "broken"}, cpu["broken"])]),
+        ("pdf_cache_requests_total", "counter", "Rendered-PDF lookups by outcome (shared = joined an in-flight build).",
+         [({"result": "hit"}, pdfs["hits"]), ({"result": "miss"}, pdfs["misses"]),
+          ({"result": "shared"}, pdfs["shared"])]),
+        ("pdf_cache_hit_ratio", "gauge", "Share of PDF requests that did not render.",
+         [({}, pdfs["hit_ratio"])]),
+        ("singleflight_calls_total", "counter",
+         "Feed fetches, article scrapes, PDF builds and DNS lookups by role (coalesced = joined one in flight).",
+         [({"kind": kind, "role": role}, counts[role])
+          for kind, counts in flights.items() for role in ("origin", "coalesced")]),
+        ("singleflight_in_flight", "gauge", "Distinct feed fetches, article scrapes, PDF builds and DNS lookups running now.",
+         [({"kind": kind}, counts["in_flight"]) for kind, counts in flights.items()]),
+        ("dns_cache_lookups_total", "counter", "Hostname lookups by result (failed = resolved to nothing).",
+         [({"result": "hit"}, dns["hits"]), ({"result": "miss"}, dns["misses"] - dns["failures"]),
+          ({"result": "failed"}, dns["failures"])]),
+        ("dns_cache_hit_ratio", "gauge", "Share of hostname lookups served from the DNS cache.",
+         [({}, dns["hit_ratio"])]),
+        ("dns_cache_hosts", "gauge", "Hostnames held in the DNS cache.",
+         [({}, dns["hosts"])]),
+        ("startup_seconds", "gauge", "Time from importing server.py to ready.",
+         [({}, STARTUP_SECONDS)]),
+        ("warm_up_seconds", "gauge", "Duration of bootstrap.warm_up() (0 until it finishes).",
+         [({}, warm_up.get("seconds", 0))]),
+    ]
+
+
+metrics.register_collector(_collect_runtime)
+
+
+@app.get("/api/metrics")
+@limiter.limit("120/minute")
+def metrics_endpoint():
+    if not METRICS_TOKEN:
+        return jsonify({"error": "Not found."}), 404
+    supplied = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+        return jsonify({"error": "Unauthorized."}), 401
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 # ── Static (frontend) ─────────────────────────────────────────────────────────
@@ -224,9 +688,21 @@ def static_files(path):
     return send_from_directory("../frontend/dist", path)
 
 
+# ── Startup budget ────────────────────────────────────────────────────────────
+
+STARTUP_SECONDS = round(time.perf_counter() - _IMPORT_STARTED, 3)
+if __name__ == "__mp_main__":
+    pass    # a cpu_pool worker importing the entry script, not a server start
+elif STARTUP_SECONDS > STARTUP_BUDGET_SECONDS:
+    print(f"  [!] Startup took {STARTUP_SECONDS}s (budget {STARTUP_BUDGET_SECONDS}s)")
+else:
+    print(f"✓ Server ready in {STARTUP_SECONDS}s (budget {STARTUP_BUDGET_SECONDS}s)")
+
+
 # ── Entry point ───────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    start_background_tasks()
     app.run(
         host="0.0.0.0",
         port=int(os.getenv("PORT", 5002)),
@@ -0,0 +1,113 @@
+"""
+singleflight.py — Request coalescing for duplicate in-flight work
+------------------------------------------------------------------
+Provides:
+  - Group: at most one call per key in flight; concurrent callers asking
+    for the same key get the Future of the call already running instead of
+    starting their own
+  - Process-wide groups for feed fetches, article scrapes, PDF builds and
+    DNS lookups
+  - Per-group counters of originating and coalesced calls
+
+Nothing is remembered once a call finishes — caching results is the job of
+article_cache / feed_store / pdf_cache. This only stops N simultaneous
+magazine requests from fetching the same URL N times. Callers that share a
+result share the same object, so treat it as read-only (or mutate it in an
+order that is safe to repeat, see main._finish_summaries()).
+
+Typical use:
+
+    future, shared = singleflight.articles.submit(
+        article_cache.normalize_url(url),
+        lambda: scrape_pool.submit(url, scrape_article, url),
+    )
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Tuple
+
+
+# ── Group ─────────────────────────────────────────────────────────────────────
+
+class Group:
+    """Keyed registry of in-flight calls, with origin / coalesced counters."""
+
+    def __init__(self, name: str):
+        self.name       = name
+        self._lock      = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._origin    = 0
+        self._coalesced = 0
+
+    def submit(self, key: str, start: Callable[[], Future]) -> Tuple[Future, bool]:
+        """
+        Return ``(future, shared)`` for *key*. If a call for *key* is in
+        flight, its Future is returned with shared=True; otherwise *start()*
+        is called (it must return promptly, handing the work to a pool) and
+        its Future becomes the one later callers join.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, True
+            future = self._calls[key] = start()
+            self._origin += 1
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future, False
+
+    def do(self, key: str, fn: Callable, *args) -> Tuple[object, bool]:
+        """
+        Blocking form: run ``fn(*args)`` in this thread unless a call for
+        *key* is already in flight, in which case wait for that one. Returns
+        ``(result, shared)``; a failed call raises in every caller waiting on it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            owner  = future is None
+            if owner:
+                future = self._calls[key] = Future()
+                self._origin += 1
+            else:
+                self._coalesced += 1
+        if not owner:
+            return future.result(), True
+
+        try:
+            result = fn(*args)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._forget(key, future)
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "origin":    self._origin,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+# ── Process-wide groups ───────────────────────────────────────────────────────
+
+feeds    = Group("feed")
+articles = Group("article")
+pdfs     = Group("pdf")
+dns      = Group("dns")
+
+GROUPS = (feeds, articles, pdfs, dns)
+
+
+def stats() -> Dict[str, Dict]:
+    """Counters of every process-wide group, by group name."""
+    return {group.name: group.stats() for group in GROUPS}
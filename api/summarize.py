@@ -0,0 +1,226 @@
+"""
+summarize.py — Vectorised extractive summariser
+------------------------------------------------
+Provides:
+  - summarize_batch(): summaries for many (title, text) documents in one
+    call. Every sentence of every document is scored together with NumPy
+    instead of one Python loop per sentence per article
+  - summarize(): the single-document convenience wrapper
+  - split_sentences(): a regex sentence splitter (no NLTK punkt data needed)
+
+Scoring follows newspaper3k's Article.nlp() so summaries stay comparable:
+each sentence gets
+
+    (1.5 * title overlap + 2.0 * keyword frequency + length + position) / 4
+
+where keyword frequency averages the density of the document's top-10
+keywords in the sentence (sbs) and the proximity of consecutive keywords
+(dbs), and stopwords come from newspaper3k's NLP list, loaded once.
+
+Pure functions with picklable inputs and outputs, so a batch can run in a
+worker process.
+"""
+
+import importlib.util
+import os
+import re
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+#: Keywords per document (newspaper3k's NUM_KEYWORDS).
+NUM_KEYWORDS = 10
+
+#: Sentence length (in words) that scores best.
+IDEAL_SENTENCE_WORDS = 20.0
+
+#: Sentences shorter than this many characters are never picked.
+MIN_SENTENCE_CHARS = 10
+
+# newspaper3k's sentence_position() table: upper bound of the relative
+# position -> score. Positions past 1.0 cannot happen here.
+_POSITION_BOUNDS = np.array([0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0])
+_POSITION_SCORES = np.array([0.0, 0.17, 0.23, 0.14, 0.08, 0.05, 0.04, 0.06, 0.04, 0.04, 0.15])
+
+# Used only if newspaper3k's stopword file cannot be found.
+_FALLBACK_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor
+not now of off on once only or other our ours ourselves out over own said same
+she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours yourself
+yourselves also says one two new
+""".split())
+
+_WORD_RE     = re.compile(r"[^\W_]+")
+_BOUNDARY_RE = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+_ABBREVIATIONS = frozenset(
+    "mr mrs ms dr prof sr jr st vs etc inc ltd co corp gov sen rep gen col lt no "
+    "jan feb mar apr jun jul aug sep sept oct nov dec u.s u.k e.g i.e".split()
+)
+
+
+# ── Stopwords ─────────────────────────────────────────────────────────────────
+
+_stopwords: Optional[FrozenSet[str]] = None
+_stopword_arr: Optional[np.ndarray] = None
+
+
+def stopwords() -> FrozenSet[str]:
+    """newspaper3k's English NLP stopword list, read once (without importing it)."""
+    global _stopwords
+    if _stopwords is None:
+        words = _FALLBACK_STOPWORDS
+        spec  = importlib.util.find_spec("newspaper")
+        if spec and spec.submodule_search_locations:
+            path = os.path.join(spec.submodule_search_locations[0],
+                                "resources", "misc", "stopwords-nlp-en.txt")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    words = frozenset(w.strip() for w in f if w.strip())
+            except OSError:
+                pass
+        _stopwords = words
+    return _stopwords
+
+
+def _stopword_array() -> np.ndarray:
+    global _stopword_arr
+    if _stopword_arr is None:
+        _stopword_arr = np.asarray(sorted(stopwords()))
+    return _stopword_arr
+
+
+# ── Sentences ─────────────────────────────────────────────────────────────────
+
+def split_sentences(text: str) -> List[str]:
+    """Split on line breaks and sentence punctuation, skipping abbreviations."""
+    sentences: List[str] = []
+    for block in text.split("\n"):
+        pending = ""
+        for part in _BOUNDARY_RE.split(block.strip()):
+            pending = f"{pending} {part}" if pending else part
+            last = pending.rsplit(None, 1)[-1].rstrip(".").lower() if pending else ""
+            if last in _ABBREVIATIONS or (len(last) == 1 and last.isalpha()):
+                continue        # "Mr. Smith", "J. Doe" — not a boundary
+            sentences.append(pending)
+            pending = ""
+        if pending:
+            sentences.append(pending)
+    return [s.strip() for s in sentences if len(s.strip()) > MIN_SENTENCE_CHARS]
+
+
+# ── Batch scoring ─────────────────────────────────────────────────────────────
+
+def summarize_batch(docs: Sequence[Tuple[str, str]], max_sents: int = 3) -> List[str]:
+    """
+    Return one summary per ``(title, text)`` in *docs*: the *max_sents*
+    best-scoring sentences, in their original order. Documents without
+    sentences get "".
+    """
+    sentences:   List[str] = []
+    sent_doc:    List[int] = []
+    sent_len:    List[int] = []
+    sent_place:  List[float] = []      # (i + 1) / number of sentences
+    words:       List[str] = []        # every word of every sentence, in order
+    title_words: List[str] = []
+    title_doc:   List[int] = []
+    doc_start:   List[int] = []        # first sentence index per document
+
+    # The only per-document Python work: splitting and tokenising. Term ids,
+    # stopword filtering and all scoring happen on the flat arrays below.
+    for d, (title, text) in enumerate(docs):
+        doc_start.append(len(sentences))
+        split = split_sentences(text or "")
+        for i, sentence in enumerate(split):
+            tokens = _WORD_RE.findall(sentence.lower())
+            sentences.append(sentence)
+            sent_doc.append(d)
+            sent_len.append(len(tokens))
+            sent_place.append((i + 1) / len(split))
+            words.extend(tokens)
+        tokens = _WORD_RE.findall((title or "").lower())
+        title_words.extend(tokens)
+        title_doc.extend([d] * len(tokens))
+
+    if not words:
+        return ["" for _ in docs]
+
+    n_sent  = len(sentences)
+    s_doc   = np.asarray(sent_doc, dtype=np.int64)
+    s_len   = np.asarray(sent_len, dtype=np.int64)
+    vocab, ids = np.unique(np.asarray(words + title_words), return_inverse=True)
+    n_vocab = len(vocab)
+    is_stop = np.isin(vocab, _stopword_array())
+
+    starts  = np.cumsum(s_len) - s_len
+    t_all   = ids[:len(words)]
+    t_sent  = np.repeat(np.arange(n_sent), s_len)
+    t_pos   = (np.arange(len(words)) - np.repeat(starts, s_len)).astype(np.float64)
+    keep    = ~is_stop[t_all]
+    t_term, t_sent, t_pos = t_all[keep], t_sent[keep], t_pos[keep]
+    t_key   = s_doc[t_sent] * n_vocab + t_term                 # (doc, term) per token
+    s_len   = s_len.astype(np.float64)
+
+    # ── Keywords: top NUM_KEYWORDS terms per document by frequency ─────────
+    doc_words = np.bincount(s_doc, weights=s_len, minlength=len(docs))
+    keys, inverse, counts = np.unique(t_key, return_inverse=True, return_counts=True)
+    key_doc = keys // n_vocab
+    order   = np.lexsort((-keys, -counts, key_doc))            # per doc: count desc
+    first   = np.searchsorted(key_doc[order], key_doc[order], side="left")
+    rank    = np.empty_like(order)
+    rank[order] = np.arange(len(order)) - first
+    weight  = np.where(rank < NUM_KEYWORDS, counts / np.maximum(doc_words[key_doc], 1) * 1.5 + 1, 0.0)
+    t_weight = weight[inverse]
+
+    # ── sbs: keyword density ────────────────────────────────────────────────
+    sbs = np.bincount(t_sent, weights=t_weight, minlength=n_sent) / np.maximum(s_len, 1) / 10.0
+
+    # ── dbs: products of consecutive keywords over squared distance ────────
+    is_kw  = t_weight > 0
+    k_sent = t_sent[is_kw]
+    k_pos  = t_pos[is_kw]
+    k_w    = t_weight[is_kw]
+    same   = k_sent[1:] == k_sent[:-1]
+    pair   = np.zeros(len(same))
+    gap    = k_pos[1:] - k_pos[:-1]
+    pair[same] = k_w[1:][same] * k_w[:-1][same] / gap[same] ** 2
+    summ   = np.bincount(k_sent[1:], weights=pair, minlength=n_sent) if len(pair) else np.zeros(n_sent)
+    distinct = np.unique(k_sent * n_vocab + t_term[is_kw]) // n_vocab
+    k      = np.bincount(distinct, minlength=n_sent) + 1.0
+    dbs    = summ / (k * (k + 1.0))
+
+    frequency = (sbs + dbs) / 2.0 * 10.0
+
+    # ── Title overlap: share of the title's distinct terms in the sentence ──
+    title_ids = ids[len(words):]
+    title_key = np.unique(np.asarray(title_doc, dtype=np.int64)[~is_stop[title_ids]] * n_vocab
+                          + title_ids[~is_stop[title_ids]])
+    title_len = np.bincount(title_key // n_vocab, minlength=len(docs)).astype(np.float64)
+    in_title  = np.isin(t_key, title_key).astype(np.float64)
+    title     = np.bincount(t_sent, weights=in_title, minlength=n_sent) / np.maximum(title_len[s_doc], 1)
+
+    length   = 1 - np.abs(IDEAL_SENTENCE_WORDS - s_len) / IDEAL_SENTENCE_WORDS
+    position = _POSITION_SCORES[np.searchsorted(_POSITION_BOUNDS, np.asarray(sent_place), side="left")]
+
+    score = (title * 1.5 + frequency * 2.0 + length + position) / 4.0
+
+    # ── Pick: best max_sents per document, back in reading order ───────────
+    order  = np.lexsort((np.arange(n_sent), -score, s_doc))   # per doc: score desc
+    rank   = np.arange(n_sent) - np.asarray(doc_start)[s_doc[order]]
+    picked = np.sort(order[rank < max_sents])
+
+    chosen: List[List[str]] = [[] for _ in docs]
+    for i in picked.tolist():
+        chosen[sent_doc[i]].append(sentences[i])
+    return [" ".join(parts) for parts in chosen]
+
+
+def summarize(title: str, text: str, max_sents: int = 3) -> str:
+    return summarize_batch([(title, text)], max_sents)[0]
@@ -0,0 +1,148 @@
+"""
+templating.py — Shared Jinja2 environment for the PDF templates
+---------------------------------------------------------------
+Provides:
+  - env: one module-level Environment for the process, so compiled
+    templates (layout.html and the per-article include) are reused across
+    renders instead of being re-read and re-compiled on every build_pdf()
+  - A FileSystemBytecodeCache, so a fresh process (or worker) loads the
+    compiled templates from disk rather than compiling them again
+  - css(): master.css, read once and minified
+  - template_version(): a hash of the template directory, for caches of
+    rendered output (see pdf_cache.py)
+  - render_to_file(): streams the rendered document to disk with
+    Template.generate(), so a large magazine never exists as one string
+
+Templates are only re-checked on disk (auto_reload) in debug mode. Output
+is HTML-escaped (autoescape): titles, descriptions and image URLs come
+from third-party feeds and pages, and Chromium loads the result from a
+file:// URL. Only custom_css is marked safe in layout.html.
+
+Typical use:
+
+    html_bytes = templating.render_to_file("layout.html", path, articles=articles)
+
+Environment variables:
+    TEMPLATE_CACHE_DIR   Compiled-template cache (default api/cache/jinja)
+    TEMPLATE_DEBUG       Reload templates and CSS when they change on disk
+                         (default: follows FLASK_DEBUG)
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_CACHE_DIR = os.getenv(
+    "TEMPLATE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "jinja"),
+)
+TEMPLATE_DEBUG = os.getenv("TEMPLATE_DEBUG", os.getenv("FLASK_DEBUG", "false")).lower() == "true"
+
+#: Rendered output is flushed to disk in pieces of about this size.
+WRITE_BUFFER_BYTES = 64 * 1024
+
+#: Part of the bytecode file names. Jinja keys cached bytecode on the template
+#: source only, so bump this whenever Environment options that change the
+#: compiled code (autoescape, extensions, ...) change.
+BYTECODE_VERSION = "autoescape-1"
+
+
+# ── Environment ───────────────────────────────────────────────────────────────
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"  [!] Template cache disabled ({TEMPLATE_CACHE_DIR}): {e}")
+        return None
+    return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR, f"__jinja2_{BYTECODE_VERSION}_%s.cache")
+
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    bytecode_cache=_bytecode_cache(),
+    auto_reload=TEMPLATE_DEBUG,
+    autoescape=select_autoescape(["html"]),
+)
+
+
+# ── CSS ───────────────────────────────────────────────────────────────────────
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPACE_RE   = re.compile(r"\s+")
+_PUNCT_RE   = re.compile(r"\s*([{};,>])\s*")
+_COLON_RE   = re.compile(r":\s+")
+
+_css: Optional[Tuple[float, str]] = None      # (mtime, minified)
+_css_lock = threading.Lock()
+
+
+def minify_css(text: str) -> str:
+    """Drop comments and redundant whitespace (no rewriting of values)."""
+    text = _COMMENT_RE.sub("", text)
+    text = _SPACE_RE.sub(" ", text)
+    text = _PUNCT_RE.sub(r"\1", text)
+    text = _COLON_RE.sub(":", text)
+    return text.replace(";}", "}").strip()
+
+
+def css() -> str:
+    """Minified master.css; re-read only in debug mode, when it changed."""
+    global _css
+    path = os.path.join(TEMPLATES_DIR, "master.css")
+    with _css_lock:
+        if _css is not None and not TEMPLATE_DEBUG:
+            return _css[1]
+        mtime = os.path.getmtime(path)
+        if _css is None or _css[0] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                _css = (mtime, minify_css(f.read()))
+        return _css[1]
+
+
+# ── Version ───────────────────────────────────────────────────────────────────
+
+_version: Optional[str] = None
+
+
+def template_version() -> str:
+    """Hash of every file in TEMPLATES_DIR; recomputed only in debug mode."""
+    global _version
+    if _version is None or TEMPLATE_DEBUG:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(TEMPLATES_DIR)):
+            path = os.path.join(TEMPLATES_DIR, name)
+            if os.path.isfile(path):
+                digest.update(name.encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        _version = digest.hexdigest()[:16]
+    return _version
+
+
+# ── Rendering ─────────────────────────────────────────────────────────────────
+
+def render_to_file(template_name: str, path: str, **context) -> int:
+    """
+    Render *template_name* into *path* piece by piece and return the bytes
+    written. Only a small write buffer is held in memory at any time.
+    """
+    buffer: List[str] = []
+    buffered = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in env.get_template(template_name).generate(**context):
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= WRITE_BUFFER_BYTES:
+                f.write("".join(buffer))
+                buffer, buffered = [], 0
+        f.write("".join(buffer))
+    return os.path.getsize(path)
@@ -0,0 +1,288 @@
+"""
+token_store.py — Pluggable CSRF token store (and shared rate-limit storage)
+---------------------------------------------------------------------------
+Provides:
+  - MemoryTokenStore: the in-process default. Expiry is kept in a heap, so
+    purging stale tokens costs O(log n) per expired token instead of a scan
+    of every live token on each issue / verify
+  - SqliteTokenStore: one SQLite file (WAL) shared by every worker process
+    on the host — the local stand-in for Redis under a multi-process
+    gunicorn / uvicorn deployment
+  - RedisTokenStore: keys with a native TTL, for several hosts or dynos
+    (needs the `redis` package)
+  - from_url(): picks the store from TOKEN_STORE_URL
+  - A "sqlite://" storage backend for flask-limiter, so rate limits can be
+    shared through the same file (RATELIMIT_STORAGE_URI=sqlite://...)
+
+Consuming a token is a single atomic delete in every backend, so a token
+replayed at two workers at once is still accepted only once.
+
+Typical use:
+
+    import token_store
+
+    token_store.store.add(token, ttl=300)
+    token_store.store.consume(token)      # True once, then False
+
+Environment variables:
+    TOKEN_STORE_URL   memory:// (default), sqlite://<path> or redis://...
+                      "sqlite://" alone uses api/cache/shared.sqlite3
+"""
+
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from limits.storage import Storage
+
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+TOKEN_STORE_URL = os.getenv("TOKEN_STORE_URL", "memory://")
+
+#: SQLite file used when a sqlite:// URL names no path.
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(__file__), "cache", "shared.sqlite3")
+
+#: Seconds between sweeps of expired rows from the shared stores.
+PURGE_INTERVAL = 60
+
+
+def sqlite_path(url: str) -> str:
+    """File named by a sqlite:// URL ("sqlite:///abs/path", "sqlite://rel/path")."""
+    return url[len("sqlite://"):] or DEFAULT_SQLITE_PATH
+
+
+def connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# ── In-memory ─────────────────────────────────────────────────────────────────
+
+class MemoryTokenStore:
+    """token -> expiry dict plus a min-heap of (expiry, token) for purging."""
+
+    def __init__(self):
+        self._expires: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, token: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._expires[token] = now + ttl
+            heapq.heappush(self._heap, (now + ttl, token))
+
+    def consume(self, token: str) -> bool:
+        """Remove *token*; True if it existed and had not expired."""
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            expires = self._expires.pop(token, None)
+        return expires is not None and expires >= now
+
+    def purge(self) -> int:
+        with self._lock:
+            return self._purge(time.time())
+
+    def _purge(self, now: float) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] < now:
+            expires, token = heapq.heappop(self._heap)
+            # Consumed tokens leave a stale heap entry behind; skip those.
+            if self._expires.get(token) == expires:
+                del self._expires[token]
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+# ── SQLite ────────────────────────────────────────────────────────────────────
+
+class SqliteTokenStore:
+    """Tokens in a SQLite table shared by every process using the same file."""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path   = path
+        self._local = threading.local()
+        self._lock  = threading.Lock()
+        self._purged_at = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS csrf_tokens ("
+                " token TEXT PRIMARY KEY,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS csrf_tokens_expiry ON csrf_tokens (expires_at)")
+            self._local.conn = conn
+        return conn
+
+    def add(self, token: str, ttl: float) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO csrf_tokens (token, expires_at) VALUES (?, ?)",
+            (token, time.time() + ttl),
+        )
+        self._maybe_purge()
+
+    def consume(self, token: str) -> bool:
+        now = time.time()
+        consumed = self._conn().execute(
+            "DELETE FROM csrf_tokens WHERE token = ? AND expires_at >= ?", (token, now),
+        ).rowcount == 1
+        if not consumed:
+            # Expired (or unknown) — make sure an expired row cannot linger.
+            self._conn().execute("DELETE FROM csrf_tokens WHERE token = ?", (token,))
+        return consumed
+
+    def purge(self) -> int:
+        return self._conn().execute(
+            "DELETE FROM csrf_tokens WHERE expires_at < ?", (time.time(),)
+        ).rowcount
+
+    def _maybe_purge(self) -> None:
+        # The expiry index makes a sweep cheap; once a minute is plenty.
+        now = time.time()
+        with self._lock:
+            due = now - self._purged_at >= PURGE_INTERVAL
+            if due:
+                self._purged_at = now
+        if due:
+            self.purge()
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM csrf_tokens WHERE expires_at >= ?", (time.time(),)
+        ).fetchone()[0]
+
+
+# ── Redis ─────────────────────────────────────────────────────────────────────
+
+class RedisTokenStore:
+    """One key per token with a native TTL; DEL is the atomic consume."""
+
+    PREFIX = "digest:csrf:"
+
+    def __init__(self, url: str):
+        import redis    # optional dependency, only needed for this backend
+        self._redis = redis.Redis.from_url(url)
+
+    def add(self, token: str, ttl: float) -> None:
+        self._redis.set(self.PREFIX + token, 1, ex=max(1, int(ttl)))
+
+    def consume(self, token: str) -> bool:
+        return self._redis.delete(self.PREFIX + token) == 1
+
+    def purge(self) -> int:
+        return 0        # Redis expires keys itself
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._redis.scan_iter(match=self.PREFIX + "*"))
+
+
+def from_url(url: str):
+    """Token store for *url* (memory://, sqlite://<path> or redis[s]://...)."""
+    scheme = url.split("://", 1)[0].lower()
+    if scheme == "memory":
+        return MemoryTokenStore()
+    if scheme == "sqlite":
+        return SqliteTokenStore(sqlite_path(url))
+    if scheme in ("redis", "rediss"):
+        return RedisTokenStore(url)
+    raise ValueError(f"Unsupported TOKEN_STORE_URL scheme '{scheme}'.")
+
+
+# ── Rate-limit storage ────────────────────────────────────────────────────────
+
+class SqliteRateLimitStorage(Storage):
+    """
+    flask-limiter / limits storage for ``sqlite://<path>`` URIs: fixed-window
+    counters in a table of the shared SQLite file. Registered with limits
+    by subclassing, so RATELIMIT_STORAGE_URI=sqlite://... just works.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path   = sqlite_path(uri or "sqlite://")
+        self._local = threading.local()
+        self._lock  = threading.Lock()
+        self._purged_at = 0.0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY,"
+                " count INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            due = now - self._purged_at >= PURGE_INTERVAL
+            if due:
+                self._purged_at = now
+        if due:
+            self._conn().execute("DELETE FROM rate_limits WHERE expires_at < ?", (now,))
+        # One statement: a window that has run out restarts at *amount*.
+        return self._conn().execute(
+            "INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET"
+            " count = CASE WHEN expires_at < ? THEN excluded.count ELSE count + excluded.count END,"
+            " expires_at = CASE WHEN expires_at < ? OR ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now, bool(elastic_expiry)),
+        ).fetchone()[0]
+
+    def get(self, key: str) -> int:
+        row = self._conn().execute(
+            "SELECT count FROM rate_limits WHERE key = ? AND expires_at >= ?", (key, time.time()),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self._conn().execute(
+            "SELECT expires_at FROM rate_limits WHERE key = ?", (key,),
+        ).fetchone()
+        return row[0] if row and row[0] >= time.time() else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._conn().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self._conn().execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        self._conn().execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+
+store = from_url(TOKEN_STORE_URL)
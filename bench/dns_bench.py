@@ -0,0 +1,121 @@
+"""
+dns_bench.py — DNS time per magazine request, before and after dns_cache
+-------------------------------------------------------------------------
+Replays the hostname lookups one /api/generate request makes and reports
+the DNS wall time per request:
+
+  - before:  what the code did without dns_cache — validate_feed_urls()
+    resolved each feed host with a blocking getaddrinfo() in turn, images
+    were checked the same way, and requests resolved every host again to
+    connect
+  - cold:    security.validate_feed_urls() / check_url_safe() through
+    dns_cache with an empty cache (the feed list resolves as one batch;
+    connections read the entries the checks stored)
+  - warm:    the same request again while the entries are live
+
+Lookups go to a simulated resolver (socket.getaddrinfo is replaced for
+the run) with a fixed --latency-ms per query, so numbers do not depend on
+the network and no real names are needed. dnspython, if installed, is
+bypassed for the same reason.
+
+Typical use (from the repository root):
+
+    python bench/dns_bench.py
+    python bench/dns_bench.py --feeds 10 --image-hosts 20 --latency-ms 40
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR   = os.path.join(os.path.dirname(BENCH_DIR), "api")
+sys.path.insert(0, API_DIR)
+
+import dns_cache  # noqa: E402
+import security   # noqa: E402
+
+#: A public (non-private) address for every simulated host.
+BENCH_ADDRESS = "93.184.215.14"
+
+
+# ── Simulated resolver ────────────────────────────────────────────────────────
+
+def _install_resolver(latency: float) -> Dict[str, int]:
+    """Replace socket.getaddrinfo with a fixed-latency fake; returns its counter."""
+    calls = {"queries": 0}
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        calls["queries"] += 1
+        time.sleep(latency)
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (BENCH_ADDRESS, port or 0))]
+
+    socket.getaddrinfo = getaddrinfo
+    dns_cache._query = dns_cache._query_getaddrinfo
+    return calls
+
+
+# ── Requests ──────────────────────────────────────────────────────────────────
+
+def _request_before(feeds: List[str], images: List[str]) -> None:
+    for url in feeds + images:                       # SSRF checks, one by one
+        socket.getaddrinfo(url.split("/")[2], None)
+    for url in feeds + images:                       # requests connects
+        socket.getaddrinfo(url.split("/")[2], 80)
+
+
+def _request_after(feeds: List[str], images: List[str]) -> None:
+    ok, err = security.validate_feed_urls(feeds)
+    assert ok, err
+    for url in images:
+        assert security.check_url_safe(url)[0]
+    for url in feeds + images:                       # what pinned connections do
+        dns_cache.resolve(url.split("/")[2])
+
+
+def _measure(fn: Callable[[], None], repeat: int, before_each: Callable[[], None]) -> float:
+    """Median wall time of *fn* in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        before_each()
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--feeds", type=int, default=security.MAX_FEEDS, help="feed hosts per request")
+    parser.add_argument("--image-hosts", type=int, default=10, help="distinct image hosts per request")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="simulated resolver latency per query")
+    parser.add_argument("--repeat", type=int, default=5, help="timed requests per mode (median is reported)")
+    args = parser.parse_args()
+
+    calls  = _install_resolver(args.latency_ms / 1000)
+    feeds  = [f"http://feed{i}.bench.example/rss" for i in range(args.feeds)]
+    images = [f"http://img{i}.bench.example/a.jpg" for i in range(args.image_hosts)]
+
+    rows = []
+    for mode, fn, before_each in (
+        ("before", lambda: _request_before(feeds, images), lambda: None),
+        ("cold",   lambda: _request_after(feeds, images),  dns_cache.cache.clear),
+        ("warm",   lambda: _request_after(feeds, images),  lambda: None),
+    ):
+        calls["queries"] = 0
+        ms = _measure(fn, args.repeat, before_each)
+        rows.append((mode, ms, calls["queries"] / args.repeat))
+
+    print(f"\n{args.feeds} feed hosts, {args.image_hosts} image hosts, "
+          f"{args.latency_ms:.0f} ms per query")
+    print(f"\n{'mode':<8} {'dns ms/request':>15} {'queries/request':>16}")
+    for mode, ms, queries in rows:
+        print(f"{mode:<8} {ms:>15.1f} {queries:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
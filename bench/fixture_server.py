@@ -0,0 +1,248 @@
+"""
+fixture_server.py — Local HTTP fixture server for the benchmark harness
+-----------------------------------------------------------------------
+Provides:
+  - Recorded RSS feeds and article pages (bench/fixtures/) served from
+    127.0.0.1, so benchmark runs never touch the network
+  - Configurable latency (base + random jitter per request)
+  - Failure injection: HTTP 503s and dropped connections at given rates
+  - A share of "body-only" pages without meta tags, to exercise the
+    newspaper3k fallback
+  - Byte / request counters per route (bytes written to the socket — a
+    client that stops reading early still shows the full page here)
+
+Routes:
+    /feed/<f>.xml?n=<count>     RSS feed <f> with <count> items
+    /article/<f>/<i>            article page (meta-rich or body-only)
+    /img/<f>/<i>.jpg            hero image (one shared JPEG)
+
+Typical use:
+
+    server = FixtureServer(latency_ms=50, fail_rate=0.01)
+    server.start()
+    feeds = server.feed_urls(articles=100, per_feed=25)
+    ...
+    server.stats()
+    server.stop()
+"""
+
+import email.utils
+import datetime
+import http.server
+import io
+import math
+import os
+import random
+import socketserver
+import sys
+import threading
+import time
+from string import Template
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _template(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def _hero_jpeg() -> bytes:
+    """A 1600x900 gradient JPEG — the size a news hero image usually is."""
+    if Image is None:
+        # Smallest valid JPEG-ish payload; images.py will record a failure.
+        return b"\xff\xd8\xff\xd9"
+    img = Image.linear_gradient("L").resize((1600, 900)).convert("RGB")
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+class _ThreadingServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads      = True
+    request_queue_size  = 256
+
+    def handle_error(self, request, client_address):
+        # Head-only scrapes and injected resets close sockets mid-response.
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        fail_rate: float = 0.0,
+        reset_rate: float = 0.0,
+        fallback_rate: float = 0.1,
+        body_kb: int = 120,
+        seed: int = 1,
+    ):
+        self.latency_ms    = latency_ms
+        self.jitter_ms     = jitter_ms
+        self.fail_rate     = fail_rate
+        self.reset_rate    = reset_rate
+        self.fallback_rate = fallback_rate
+        self.body_kb       = body_kb
+        self.seed          = seed
+
+        self._feed      = _template("feed.xml")
+        self._item      = _template("feed_item.xml")
+        self._meta_page = _template("article_meta.html")
+        self._body_page = _template("article_body.html")
+        with open(os.path.join(FIXTURES_DIR, "paragraph.html"), "r", encoding="utf-8") as f:
+            paragraph = f.read()
+        self._body  = paragraph * max(1, math.ceil(body_kb * 1024 / len(paragraph)))
+        self._image = _hero_jpeg()
+
+        self._rng   = random.Random(seed)
+        self._lock  = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._httpd = None
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def start(self) -> "FixtureServer":
+        fixture = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fixture._handle(self)
+
+        self._httpd = _ThreadingServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._httpd.serve_forever, name="fixture", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def feed_urls(self, articles: int, per_feed: int = 25) -> List[str]:
+        """Feed URLs that together list exactly *articles* items."""
+        urls, remaining, f = [], articles, 0
+        while remaining > 0:
+            n = min(per_feed, remaining)
+            urls.append(f"{self.base_url}/feed/{f}.xml?n={n}")
+            remaining -= n
+            f += 1
+        return urls
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {route: dict(counts) for route, counts in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    # ── Requests ───────────────────────────────────────────────────────────
+
+    def _count(self, route: str, key: str, n: int = 1) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(route, {"requests": 0, "bytes": 0, "failed": 0, "reset": 0})
+            counts[key] += n
+
+    def _handle(self, handler: http.server.BaseHTTPRequestHandler) -> None:
+        parsed = urlparse(handler.path)
+        parts  = parsed.path.strip("/").split("/")
+        route  = parts[0] if parts else ""
+        self._count(route, "requests")
+
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            roll  = self._rng.random()
+        if delay:
+            time.sleep(delay / 1000)
+
+        # Feeds never fail: a missing feed just shrinks the run, which would
+        # make scales incomparable. Articles and images do.
+        if route != "feed":
+            if roll < self.reset_rate:
+                self._count(route, "reset")
+                handler.close_connection = True
+                return
+            if roll < self.reset_rate + self.fail_rate:
+                self._count(route, "failed")
+                self._send(handler, route, 503, b"unavailable", "text/plain")
+                return
+
+        try:
+            if route == "feed" and len(parts) == 2:
+                n = int(parse_qs(parsed.query).get("n", ["25"])[0])
+                body = self._render_feed(parts[1].split(".")[0], n)
+                self._send(handler, route, 200, body, "application/rss+xml; charset=utf-8")
+            elif route == "article" and len(parts) == 3:
+                body = self._render_article(parts[1], int(parts[2]))
+                self._send(handler, route, 200, body, "text/html; charset=utf-8")
+            elif route == "img":
+                self._send(handler, route, 200, self._image, "image/jpeg")
+            else:
+                self._send(handler, route, 404, b"not found", "text/plain")
+        except (BrokenPipeError, ConnectionResetError):
+            pass       # client stopped reading (head-only scrape)
+
+    def _send(self, handler, route: str, status: int, body: bytes, content_type: str) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+        self._count(route, "bytes", len(body))
+
+    # ── Fixtures ───────────────────────────────────────────────────────────
+
+    def _render_feed(self, feed: str, n: int) -> bytes:
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        items = "".join(
+            self._item.substitute(
+                title=f"Bench story {feed}-{i}: shipping small changes, often",
+                link=f"{self.base_url}/article/{feed}/{i}",
+                author=f"Reporter {i % 7}",
+                published=email.utils.format_datetime(now - datetime.timedelta(minutes=i)),
+            )
+            for i in range(n)
+        )
+        return self._feed.substitute(
+            title=f"Bench Feed {feed}",
+            base=self.base_url,
+            now=email.utils.format_datetime(now),
+            items=items,
+        ).encode("utf-8")
+
+    def _render_article(self, feed: str, i: int) -> bytes:
+        # Deterministic per URL, so repeated runs see the same page mix.
+        fallback = random.Random(f"{self.seed}:{feed}:{i}").random() < self.fallback_rate
+        page     = self._body_page if fallback else self._meta_page
+        now      = datetime.datetime.now(tz=datetime.timezone.utc)
+        return page.substitute(
+            title=f"Bench story {feed}-{i}: shipping small changes, often",
+            base=self.base_url,
+            link=f"{self.base_url}/article/{feed}/{i}",
+            image=f"{self.base_url}/img/{feed}/{i}.jpg",
+            author=f"Reporter {i % 7}",
+            published=now.strftime("%B %d, %Y"),
+            published_iso=now.isoformat(),
+            body=self._body,
+        ).encode("utf-8")
@@ -0,0 +1,323 @@
+"""
+run.py — Scrape-and-render pipeline benchmark
+----------------------------------------------
+Runs fetch_articles → image stage → build_pdf against the local fixture
+server (fixture_server.py) at several scales and reports, per scale:
+
+  - wall time per stage (import, feeds, scrape, images, template, pdf, and
+    optionally a second warm-cache pass)
+  - peak RSS of the pipeline process and of its CPU-pool workers
+  - bytes transferred: read by the scraper and image stage (client side)
+    and written by the fixture per route, plus HTTP pool reuse (real TCP
+    connects, so reconnects after a dropped keep-alive socket count)
+  - PDF size, extraction paths and cache counters
+
+Every scale runs in a fresh child process with empty caches, so results do
+not leak between scales and peak RSS is per scale.
+
+Typical use (from the repository root):
+
+    python bench/run.py                                   # 1, 10, 100, 1000
+    python bench/run.py --scales 10,100 --latency-ms 80 --fail-rate 0.02
+    python bench/run.py --no-render --output before.json
+    python bench/run.py --no-render --compare before.json
+    SCRAPE_DRAIN_MAX_BYTES=0 python bench/run.py --no-render   # always cut off
+    python bench/run.py --no-render --scales 100 --min-reuse 0.05
+
+--compare also reports the change in connection reuse and flags a drop of
+more than 10 points; --min-reuse exits non-zero when any scale's reuse
+ratio falls below it (e.g. after a change to SCRAPE_DRAIN_MAX_BYTES).
+The fixture's article pages run past the default drain cap, so most
+head-only scrapes are cut off and reuse stays low. A loopback connect costs
+almost nothing, so the bench cannot weigh that against the bytes saved;
+judge the cap on a real network.
+
+The PDF stage needs Playwright's Chromium; when it is missing the run
+records ``render_error`` and keeps the stages measured before it.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR   = os.path.join(os.path.dirname(BENCH_DIR), "api")
+
+DEFAULT_SCALES = "1,10,100,1000"
+
+
+# ── Child: one scale, one process ─────────────────────────────────────────────
+
+def _peak_rss_kb(pid: int) -> Optional[int]:
+    """VmHWM of *pid* in KB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _run_child(args: argparse.Namespace) -> Dict:
+    work = args.work_dir
+    os.environ.update({
+        "ARTICLE_CACHE_PATH": os.path.join(work, "articles.sqlite3"),
+        "FEED_STORE_PATH":    os.path.join(work, "feeds.sqlite3"),
+        "IMAGE_CACHE_DIR":    os.path.join(work, "images"),
+        "PREWARM_ENABLED":    "false",
+    })
+    sys.path.insert(0, API_DIR)
+    feeds = json.loads(args.feeds)
+
+    stages: Dict[str, float] = {}
+    marks:  Dict[str, float] = {}
+    events: Dict[str, Dict]  = {}
+
+    def progress(event: str, data: Dict) -> None:
+        marks[event]  = time.perf_counter()
+        events[event] = data
+
+    t = time.perf_counter()
+    import main
+    import cpu_pool
+    import http_client
+    import images
+    stages["import"] = time.perf_counter() - t
+
+    # The fixture lives on 127.0.0.1, which the SSRF guard rightly refuses
+    # (both the URL check and the connect-time address check).
+    images.check_url_safe = lambda url: (True, "")
+    http_client.address_allowed = lambda address: True
+
+    result: Dict = {"scale": args.scale, "feeds": len(feeds)}
+    stats:  Dict = {}
+
+    t = time.perf_counter()
+    articles = main.fetch_articles(feeds, days_back=1, stats=stats, progress=progress)
+    # Scrapes start while later feeds are still downloading, so "feeds" is
+    # time to the last parsed feed and "scrape" is whatever remains.
+    stages["feeds"]  = marks["feeds_fetched"] - t
+    stages["scrape"] = marks["articles_ready"] - marks["feeds_fetched"]
+    stages["fetch"]  = time.perf_counter() - t
+    result["articles"] = len(articles)
+    result["fetch_stats"] = stats
+    result["http"] = http_client.stats()
+
+    if args.render:
+        output = os.path.join(work, "digest.pdf")
+        t = time.perf_counter()
+        try:
+            asyncio.run(main.build_pdf(articles, output, progress=progress))
+        except Exception as e:
+            result["render_error"] = f"{type(e).__name__}: {str(e).splitlines()[0][:200]}"
+        if "images_prepared" in marks:
+            stages["images"] = marks["images_prepared"] - marks["render_started"]
+            result["images"] = events["images_prepared"]
+        if "render_done" in marks:
+            stages["template"] = marks["render_done"] - marks["images_prepared"]
+        if "pdf_written" in marks:
+            stages["pdf"] = marks["pdf_written"] - marks["pdf_started"]
+            result["pdf_bytes"] = events["pdf_written"]["bytes"]
+        stages["render"] = time.perf_counter() - t
+    else:
+        t = time.perf_counter()
+        _, result["images"] = images.localize_images(articles)
+        stages["images"] = time.perf_counter() - t
+
+    if args.warm:
+        t = time.perf_counter()
+        main.fetch_articles(feeds, days_back=1, stats={})
+        stages["fetch_warm"] = time.perf_counter() - t
+
+    result["stages"] = {name: round(seconds, 4) for name, seconds in stages.items()}
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    workers = getattr(cpu_pool._pool, "_processes", None) or {}
+    result["worker_peak_rss_kb"] = [_peak_rss_kb(pid) for pid in workers]
+    return result
+
+
+# ── Parent: fixture server + one child per scale ──────────────────────────────
+
+def _run_scale(args: argparse.Namespace, server, scale: int) -> Dict:
+    feeds = server.feed_urls(scale, per_feed=args.per_feed)
+    server.reset_stats()
+    with tempfile.TemporaryDirectory(prefix="digest-bench-") as work:
+        out_path = os.path.join(work, "result.json")
+        cmd = [
+            sys.executable, os.path.abspath(__file__), "--child",
+            "--scale", str(scale), "--feeds", json.dumps(feeds),
+            "--work-dir", work, "--child-out", out_path,
+            "--render" if args.render else "--no-render",
+        ]
+        if args.warm:
+            cmd.append("--warm")
+        started = time.perf_counter()
+        proc = subprocess.run(
+            cmd,
+            cwd=API_DIR,
+            stdout=None if args.verbose else subprocess.DEVNULL,
+            stderr=None if args.verbose else subprocess.PIPE,
+            text=True,
+        )
+        if proc.returncode != 0 or not os.path.exists(out_path):
+            tail = (proc.stderr or "").strip().splitlines()[-5:]
+            return {"scale": scale, "error": f"child exited {proc.returncode}", "stderr": tail}
+        with open(out_path) as f:
+            result = json.load(f)
+    result["wall"]   = round(time.perf_counter() - started, 4)
+    result["served"] = server.stats()
+    result["bytes_served"] = sum(route["bytes"] for route in result["served"].values())
+    result["bytes_read"]   = (result["fetch_stats"].get("bytes_read", 0)
+                              + (result.get("images") or {}).get("source_bytes", 0))
+    return result
+
+
+def _print_summary(runs: List[Dict]) -> None:
+    print(f"\n{'scale':>6} {'articles':>8} {'feeds':>7} {'scrape':>7} {'images':>7} "
+          f"{'pdf':>7} {'wall':>7} {'rss MB':>7} {'read MB':>7} {'pdf KB':>7} {'connects':>9} {'reused':>7}")
+    for run in runs:
+        if "error" in run:
+            print(f"{run['scale']:>6}  {run['error']}")
+            continue
+        s = run["stages"]
+        col = lambda key: f"{s[key]:>7.2f}" if key in s else f"{'-':>7}"
+        pdf_kb = f"{run['pdf_bytes'] // 1024:>7}" if "pdf_bytes" in run else f"{'-':>7}"
+        print(f"{run['scale']:>6} {run['articles']:>8} {col('feeds')} {col('scrape')} {col('images')} "
+              f"{col('pdf')} {run['wall']:>7.2f} {run['peak_rss_kb'] / 1024:>7.1f} "
+              f"{run['bytes_read'] / 1e6:>7.2f} {pdf_kb} {run['http']['connections']:>9} "
+              f"{run['http']['reuse_ratio']:>7.0%}")
+        fetch = run["fetch_stats"]
+        if fetch.get("head_only"):
+            # Cut-off bodies drop the keep-alive connection; drained ones
+            # (Content-Length within SCRAPE_DRAIN_MAX_BYTES) read a little
+            # more but keep it.
+            print(f"{'':>6}  head-only {fetch['head_only']}: {fetch['drained']} drained, "
+                  f"{fetch['closed']} cut off, {fetch['bytes_saved'] // 1024} KB saved, "
+                  f"{fetch['connects']} scrape connects ({fetch['tls_handshakes']} TLS)")
+        if run.get("render_error"):
+            print(f"{'':>6}  render skipped — {run['render_error']}")
+
+
+#: Drop in connection reuse (percentage points) that --compare flags.
+REUSE_DROP_WARN = 0.10
+
+
+def _print_comparison(runs: List[Dict], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {run["scale"]: run for run in json.load(f)["runs"] if "stages" in run}
+    print(f"\nvs {baseline_path} (negative = faster / smaller):")
+    for run in runs:
+        before = baseline.get(run["scale"])
+        if before is None or "stages" not in run:
+            continue
+        deltas = []
+        for stage, seconds in run["stages"].items():
+            old = before["stages"].get(stage)
+            if old:
+                deltas.append(f"{stage} {(seconds - old) / old:+.0%}")
+        if before.get("peak_rss_kb"):
+            deltas.append(f"rss {(run['peak_rss_kb'] - before['peak_rss_kb']) / before['peak_rss_kb']:+.0%}")
+        reuse_before, reuse = before["http"]["reuse_ratio"], run["http"]["reuse_ratio"]
+        deltas.append(f"reuse {reuse_before:.0%} → {reuse:.0%}")
+        print(f"  {run['scale']:>6}: " + ", ".join(deltas))
+        if reuse_before - reuse > REUSE_DROP_WARN:
+            print(f"  {'':>6}  [!] connection reuse dropped {reuse_before - reuse:.0%} — check SCRAPE_DRAIN_MAX_BYTES")
+
+
+def _reuse_failures(runs: List[Dict], minimum: float) -> List[str]:
+    return [f"scale {run['scale']}: reuse {run['http']['reuse_ratio']:.0%} < {minimum:.0%}"
+            for run in runs if "http" in run and run["http"]["reuse_ratio"] < minimum]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma-separated article counts")
+    parser.add_argument("--per-feed", type=int, default=25, help="articles per fixture feed")
+    parser.add_argument("--latency-ms", type=float, default=30, help="base latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="extra random latency, 0..N ms")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of article/image requests answered 503")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="share of article/image connections dropped")
+    parser.add_argument("--fallback-rate", type=float, default=0.1, help="share of pages without meta tags")
+    parser.add_argument("--body-kb", type=int, default=120, help="article body size")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--render", action=argparse.BooleanOptionalAction, default=True,
+                        help="run build_pdf (needs Chromium); --no-render times the image stage only")
+    parser.add_argument("--warm", action="store_true", help="add a second, warm-cache fetch pass")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="print deltas against an earlier --output file")
+    parser.add_argument("--min-reuse", type=float, help="fail if a scale reuses fewer connections (0-1)")
+    parser.add_argument("--verbose", action="store_true", help="show pipeline output")
+    # Internal: a single scale inside the child process.
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--feeds", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = _run_child(args)
+        with open(args.child_out, "w") as f:
+            json.dump(result, f, default=str)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    from fixture_server import FixtureServer
+
+    server = FixtureServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        fail_rate=args.fail_rate,
+        reset_rate=args.reset_rate,
+        fallback_rate=args.fallback_rate,
+        body_kb=args.body_kb,
+        seed=args.seed,
+    ).start()
+
+    runs: List[Dict] = []
+    try:
+        for scale in (int(s) for s in args.scales.split(",") if s.strip()):
+            print(f"→ {scale} article(s)...", flush=True)
+            runs.append(_run_scale(args, server, scale))
+    finally:
+        server.stop()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: v for k, v in vars(args).items()
+                   if k not in ("child", "scale", "feeds", "work_dir", "child_out", "verbose")},
+        "machine": {
+            "python":   platform.python_version(),
+            "platform": platform.platform(),
+            "cpus":     os.cpu_count(),
+        },
+        "runs": runs,
+    }
+
+    _print_summary(runs)
+    if args.compare:
+        _print_comparison(runs, args.compare)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n✓ Results written → {args.output}")
+    if args.min_reuse is not None:
+        failures = _reuse_failures(runs, args.min_reuse)
+        if failures:
+            sys.exit("Connection reuse below --min-reuse: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    with contextlib.suppress(KeyboardInterrupt):
+        main()
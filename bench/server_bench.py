@@ -0,0 +1,240 @@
+"""
+server_bench.py — Flask (threaded WSGI) vs asgi.py under concurrent load
+------------------------------------------------------------------------
+Starts each server in its own child process and drives it with N
+concurrent keep-alive clients, reporting per server and concurrency level:
+
+  - throughput: completed requests per second
+  - latency: p50 / p99 per request in milliseconds
+  - errors: non-2xx responses and dropped connections
+
+Each client loops over the API's cheap round trip — GET /api/csrf-token,
+then GET /api/health with that token (CSRF checked and consumed), then a
+job status poll — so the numbers are server overhead (routing, CSRF store,
+timing middleware, JSON) rather than pipeline work. Rate limits are turned
+off in the child processes; prewarm and bootstrap are skipped.
+
+The Flask side is server.py's own entry point (app.run, one thread per
+connection); the ASGI side is `python3 asgi.py` (uvicorn, one event loop).
+
+With --slow-clients, that many extra clients loop on a blocking handler
+that sleeps --slow-ms (standing in for /api/validate's outbound fetches),
+and a simulated job keeps --render-threads threads of the event loop's
+default executor busy, as a PDF render does (asyncio.to_thread via
+server._run_coroutine). Only the cheap round trip is reported, so the
+numbers show whether slow requests and a running job delay it.
+
+Typical use (from the repository root):
+
+    python bench/server_bench.py
+    python bench/server_bench.py --concurrency 1,32,128 --seconds 10
+    python bench/server_bench.py --servers asgi --slow-clients 8
+    ASGI_BRIDGE_THREADS=0 python bench/server_bench.py --servers asgi --slow-clients 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR   = os.path.join(os.path.dirname(BENCH_DIR), "api")
+
+SERVERS = ("flask", "asgi")
+
+
+# ── Child process: the server under test ──────────────────────────────────────
+
+def _add_slow_load(server, slow_ms: float, render_threads: int) -> None:
+    """A blocking /bench/slow route, and a job thread keeping the loop's executor busy."""
+    import threading
+    from flask import jsonify
+
+    seconds = slow_ms / 1000
+
+    @server.app.get("/bench/slow")
+    def bench_slow():
+        time.sleep(seconds)
+        return jsonify({"slept": seconds})
+
+    async def render():
+        await asyncio.gather(*(asyncio.to_thread(time.sleep, seconds) for _ in range(render_threads)))
+
+    def job():
+        while True:
+            if server._event_loop is None:      # Flask: jobs run on their own threads
+                time.sleep(seconds)
+                continue
+            server._run_coroutine(render())
+
+    if render_threads:
+        threading.Thread(target=job, name="bench-job", daemon=True).start()
+
+
+def serve(kind: str, port: int, slow_ms: float, render_threads: int) -> None:
+    sys.path.insert(0, API_DIR)
+    os.chdir(API_DIR)
+    import server
+    server.limiter.enabled = False
+    _add_slow_load(server, slow_ms, render_threads)
+    if kind == "flask":
+        server.app.run(host="127.0.0.1", port=port, threaded=True)
+    else:
+        import uvicorn
+        import asgi
+        uvicorn.run(asgi.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start(kind: str, args: argparse.Namespace) -> Tuple[subprocess.Popen, int]:
+    port = _free_port()
+    env  = {**os.environ, "PREWARM_ENABLED": "false", "BOOTSTRAP_WARM_UP": "off",
+            "TOKEN_STORE_URL": "memory://"}
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", kind, "--port", str(port),
+         "--slow-ms", str(args.slow_ms), "--render-threads", str(args.render_threads)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{kind} server did not start on port {port}")
+
+
+# ── Load generator ────────────────────────────────────────────────────────────
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client (Content-Length responses only)."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, path: str, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        lines = [f"GET {path} HTTP/1.1", f"Host: 127.0.0.1:{self.port}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        fields = {k.lower(): v.strip() for k, _, v in (h.partition(":") for h in header_lines if h)}
+        body = await self.reader.readexactly(int(fields.get("content-length", 0)))
+        if fields.get("connection", "").lower() == "close" or status_line.startswith("HTTP/1.0"):
+            self.close()
+        return int(status_line.split()[1]), body
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _client(port: int, until: float, latencies: List[float], errors: List[int]) -> None:
+    conn = Connection(port)
+
+    async def timed(path: str, headers: Dict[str, str]) -> Tuple[int, bytes]:
+        started = time.perf_counter()
+        status, body = await conn.request(path, headers)
+        latencies.append(time.perf_counter() - started)
+        return status, body
+
+    while time.perf_counter() < until:
+        try:
+            status, body = await timed("/api/csrf-token", {})
+            token = json.loads(body)["token"] if status == 200 else ""
+            status_health, _ = await timed("/api/health", {"X-CSRF-Token": token})
+            status_job, _ = await timed("/api/jobs/bench-missing-job", {})
+            errors[0] += (status != 200) + (status_health != 200) + (status_job != 404)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            errors[0] += 1
+            conn.close()
+    conn.close()
+
+
+async def _slow_client(port: int, until: float) -> None:
+    conn = Connection(port)
+    while time.perf_counter() < until:
+        try:
+            await conn.request("/bench/slow", {})
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            conn.close()
+    conn.close()
+
+
+async def _load(port: int, concurrency: int, seconds: float, slow_clients: int = 0) -> Dict:
+    latencies: List[float] = []
+    errors = [0]
+    started = time.perf_counter()
+    until = started + seconds
+    await asyncio.gather(*(_client(port, until, latencies, errors) for _ in range(concurrency)),
+                         *(_slow_client(port, until) for _ in range(slow_clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps":      len(latencies) / elapsed,
+        "p50_ms":   statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms":   latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "errors":   errors[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--concurrency", default="1,16,64", help="comma-separated client counts")
+    parser.add_argument("--seconds", type=float, default=5.0, help="load duration per level")
+    parser.add_argument("--servers", default=",".join(SERVERS), help="which servers to run")
+    parser.add_argument("--slow-clients", type=int, default=0, help="extra clients on a slow blocking route")
+    parser.add_argument("--slow-ms", type=float, default=2000, help="how long each slow request blocks")
+    parser.add_argument("--render-threads", type=int, default=0,
+                        help="default-executor threads a simulated job keeps busy (default: 4 with --slow-clients)")
+    parser.add_argument("--serve", choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.slow_ms, args.render_threads)
+        return
+    if args.slow_clients and not args.render_threads:
+        args.render_threads = 4
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    rows = []
+    for kind in args.servers.split(","):
+        proc, port = _start(kind, args)
+        try:
+            asyncio.run(_load(port, 1, 1.0))        # warm-up, not reported
+            for level in levels:
+                rows.append((kind, level, asyncio.run(_load(port, level, args.seconds, args.slow_clients))))
+        finally:
+            proc.terminate()
+            proc.wait(10)
+
+    print(f"\n{args.seconds:.0f} s per level, token + health + job status per client loop")
+    if args.slow_clients:
+        print(f"alongside {args.slow_clients} client(s) on {args.slow_ms:g} ms blocking requests "
+              f"and a job holding {args.render_threads} executor thread(s)")
+    print(f"\n{'server':<7} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for kind, level, r in rows:
+        print(f"{kind:<7} {level:>7} {r['rps']:>9.0f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
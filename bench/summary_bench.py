@@ -0,0 +1,221 @@
+"""
+summary_bench.py — Built-in summariser vs newspaper3k's Article.nlp()
+---------------------------------------------------------------------
+Summarises the same documents with both paths and reports:
+
+  - throughput: documents per second (summarize_batch() over the whole
+    corpus in one call vs newspaper.nlp.summarize() once per document)
+  - agreement: share of the newspaper3k summary's sentences that the
+    built-in summary also picked
+  - quality: ROUGE-1 F1 of each summary against the page's own meta
+    description (an editor-written summary), when the pages have one
+
+Documents come from saved article pages (--pages DIR of .html files, run
+through newspaper3k's body extraction first, outside the timings) or, by
+default, from synthetic articles built out of the fixture paragraphs.
+
+newspaper3k splits sentences with NLTK punkt. Without that data (see
+api/bootstrap.py) its scoring runs on summarize.split_sentences() instead
+and the report says so — throughput is then slightly flattering to it.
+
+Typical use (from the repository root):
+
+    python bench/summary_bench.py
+    python bench/summary_bench.py --pages ~/saved-articles --sentences 3
+    python bench/summary_bench.py --check        # fixed corpus, fails on regression
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR   = os.path.join(os.path.dirname(BENCH_DIR), "api")
+sys.path.insert(0, API_DIR)
+
+import extract    # noqa: E402
+import summarize  # noqa: E402
+
+#: (title, text, reference description or None)
+Doc = Tuple[str, str, Optional[str]]
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+
+def _synthetic_docs(count: int, seed: int) -> List[Doc]:
+    with open(os.path.join(BENCH_DIR, "fixtures", "paragraph.html"), "r", encoding="utf-8") as f:
+        text = re.sub(r"<[^>]+>", "", f.read())
+    sentences = summarize.split_sentences(text)
+    rng  = random.Random(seed)
+    docs: List[Doc] = []
+    for i in range(count):
+        body = []
+        for _ in range(rng.randint(4, 12)):          # paragraphs
+            body.append(" ".join(rng.sample(sentences, k=min(len(sentences), rng.randint(2, 4)))))
+        title = " ".join(rng.sample(_TOKEN_RE.findall(body[0]), k=6)).capitalize()
+        docs.append((title, "\n".join(body), None))
+    return docs
+
+
+def _page_docs(pages_dir: str) -> List[Doc]:
+    from newspaper import Article
+
+    docs: List[Doc] = []
+    for path in sorted(glob.glob(os.path.join(pages_dir, "*.htm*"))):
+        with open(path, "rb") as f:
+            content = f.read()
+        meta = extract.collect_meta(extract.parse_html(content))
+        art  = Article("https://example.com/")
+        art.download(input_html=content.decode("utf-8", errors="replace"))
+        art.parse()
+        if len(art.text) < 500:
+            continue
+        title = extract.first_meta(meta, extract.TITLE_META_KEYS) or art.title or ""
+        docs.append((title, art.text, extract.first_meta(meta, extract.META_PRIORITY)))
+    return docs
+
+
+# ── Scoring ───────────────────────────────────────────────────────────────────
+
+def _rouge1(summary: str, reference: str) -> float:
+    got  = Counter(_TOKEN_RE.findall(summary.lower()))
+    want = Counter(_TOKEN_RE.findall(reference.lower()))
+    overlap = sum((got & want).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(got.values())
+    recall    = overlap / sum(want.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def _newspaper_summarizer() -> Tuple[object, str]:
+    """newspaper.nlp.summarize, plus which sentence splitter it will use."""
+    from newspaper import nlp
+
+    nlp.load_stopwords("en")
+    try:
+        nlp.split_sentences("One sentence here. Another one here.")
+        return nlp.summarize, "punkt"
+    except LookupError:
+        nlp.split_sentences = summarize.split_sentences
+        return nlp.summarize, "regex (punkt data missing)"
+
+
+def _run(docs: List[Doc], sentences: int, repeat: int) -> Dict:
+    pairs = [(title, text) for title, text, _ in docs]
+
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        builtin = summarize.summarize_batch(pairs, sentences)
+        best = min(best, time.perf_counter() - t)
+    report: Dict = {"docs": len(docs), "builtin": {
+        "docs_per_s": len(docs) / best,
+        "empty":      sum(1 for summary in builtin if not summary),
+        "too_long":   sum(1 for summary in builtin if len(summarize.split_sentences(summary)) > sentences),
+    }}
+
+    try:
+        summarize_one, splitter = _newspaper_summarizer()
+    except ImportError as e:
+        report["newspaper"] = {"error": str(e)}
+        return report
+
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        legacy = [" ".join(summarize_one(title=title, text=text, max_sents=sentences))
+                  for title, text in pairs]
+        best = min(best, time.perf_counter() - t)
+    report["newspaper"] = {"docs_per_s": len(docs) / best, "splitter": splitter}
+
+    shared, total = 0, 0
+    for ours, theirs in zip(builtin, legacy):
+        picked = set(summarize.split_sentences(theirs))
+        shared += len(picked & set(summarize.split_sentences(ours)))
+        total  += len(picked)
+    report["agreement"] = shared / total if total else None
+
+    scored = [(b, l, ref) for b, l, (_, _, ref) in zip(builtin, legacy, docs) if ref]
+    if scored:
+        report["builtin"]["rouge1"]   = sum(_rouge1(b, ref) for b, _, ref in scored) / len(scored)
+        report["newspaper"]["rouge1"] = sum(_rouge1(l, ref) for _, l, ref in scored) / len(scored)
+        report["references"] = len(scored)
+    return report
+
+
+def _check(report: Dict, min_agreement: float) -> List[str]:
+    """
+    What --check fails on: an empty or over-long built-in summary, sentence
+    agreement with newspaper3k below *min_agreement*, or a built-in path
+    slower than newspaper3k. Without newspaper3k only the first applies.
+    """
+    failures = []
+    builtin = report["builtin"]
+    if builtin["empty"]:
+        failures.append(f"{builtin['empty']} empty built-in summaries")
+    if builtin["too_long"]:
+        failures.append(f"{builtin['too_long']} built-in summaries over --sentences")
+    newspaper = report.get("newspaper", {})
+    if "error" in newspaper:
+        return failures
+    if report["agreement"] is not None and report["agreement"] < min_agreement:
+        failures.append(f"sentence agreement {report['agreement']:.0%} below {min_agreement:.0%}")
+    if builtin["docs_per_s"] < newspaper["docs_per_s"]:
+        failures.append(f"built-in path slower than newspaper3k "
+                        f"({builtin['docs_per_s']:.0f} vs {newspaper['docs_per_s']:.0f} docs/s)")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", help="directory of saved article .html files")
+    parser.add_argument("--docs", type=int, default=500, help="synthetic documents when --pages is not given")
+    parser.add_argument("--sentences", type=int, default=3, help="summary_sentences")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per path (best is reported)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero if the built-in path regresses (see _check)")
+    parser.add_argument("--min-agreement", type=float, default=0.9,
+                        help="sentence agreement --check requires (default 0.9)")
+    args = parser.parse_args()
+
+    docs = _page_docs(args.pages) if args.pages else _synthetic_docs(args.docs, args.seed)
+    if not docs:
+        raise SystemExit("No documents with enough body text.")
+    report = _run(docs, args.sentences, args.repeat)
+
+    print(f"\n{'path':<10} {'docs/s':>10} {'rouge-1':>8}")
+    for path in ("builtin", "newspaper"):
+        row = report.get(path, {})
+        if "error" in row:
+            print(f"{path:<10}  skipped — {row['error']}")
+            continue
+        rouge = f"{row['rouge1']:>8.3f}" if "rouge1" in row else f"{'-':>8}"
+        print(f"{path:<10} {row['docs_per_s']:>10.1f} {rouge}")
+    if "splitter" in report.get("newspaper", {}):
+        print(f"\n  newspaper3k sentence splitter: {report['newspaper']['splitter']}")
+    if report.get("agreement") is not None:
+        print(f"  Sentence agreement: {report['agreement']:.0%} over {report['docs']} documents")
+    if report.get("references"):
+        print(f"  ROUGE-1 against {report['references']} meta descriptions")
+
+    if args.check:
+        failures = _check(report, args.min_agreement)
+        for failure in failures:
+            print(f"  [!] {failure}")
+        if failures:
+            raise SystemExit(1)
+        print("  ✓ Built-in summariser matches newspaper3k")
+
+
+if __name__ == "__main__":
+    main()
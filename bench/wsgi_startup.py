@@ -0,0 +1,113 @@
+"""
+wsgi_startup.py — Are WSGI workers warm before their first request?
+--------------------------------------------------------------------
+Starts the API the way production does — `gunicorn server:app` from api/,
+so gunicorn.conf.py applies and server.py is imported as a WSGI module, not
+run as a script — waits --settle seconds without sending anything, then
+asks every worker for /api/health and checks:
+
+  - warm_up: bootstrap's warm-up already finished ("done") in each worker
+    that answers, i.e. it ran at worker start, not on the first request
+  - prewarm: exactly one worker reports the scheduler "running" and the
+    rest "standby"
+
+Exits non-zero when a check fails. Prewarm polls an unroutable feed URL,
+so nothing is fetched from the network.
+
+Typical use (from the repository root):
+
+    python bench/wsgi_startup.py
+    python bench/wsgi_startup.py --workers 4 --settle 20
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR   = os.path.join(os.path.dirname(BENCH_DIR), "api")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(port: int, path: str, headers: Optional[Dict[str, str]] = None) -> Dict:
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", headers=headers or {})
+    with urllib.request.urlopen(req, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _wait_listening(port: int, proc: subprocess.Popen, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"gunicorn did not start on port {port}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--settle", type=float, default=10.0,
+                        help="seconds to leave the workers idle before the first request")
+    parser.add_argument("--requests", type=int, default=20, help="health checks to spread over the workers")
+    args = parser.parse_args()
+
+    port = _free_port()
+    work = tempfile.TemporaryDirectory(prefix="digest-wsgi-")
+    # CSRF tokens must be shared: the token and the health check may land
+    # on different workers.
+    env  = {**os.environ,
+            "BOOTSTRAP_WARM_UP": "background",
+            "PREWARM_ENABLED":   "true",
+            "PREWARM_FEEDS":     "http://127.0.0.1:9/feed.xml",
+            "PREWARM_LOCK_PATH": os.path.join(work.name, "prewarm.lock"),
+            "TOKEN_STORE_URL":   "sqlite://" + os.path.join(work.name, "shared.sqlite3")}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "server:app", "-b", f"127.0.0.1:{port}",
+         "-w", str(args.workers)],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_listening(port, proc, 30)
+        time.sleep(args.settle)
+        warm_up: Dict[str, int] = {}
+        prewarm: Dict[int, str] = {}
+        for _ in range(args.requests):
+            token  = _get(port, "/api/csrf-token")["token"]
+            health = _get(port, "/api/health", {"X-CSRF-Token": token})
+            warm_up[health["warm_up"]] = warm_up.get(health["warm_up"], 0) + 1
+            status = _get(port, "/api/prewarm/status")
+            prewarm[status["pid"]] = status["state"]
+    finally:
+        proc.terminate()
+        proc.wait(10)
+        work.cleanup()
+
+    states   = sorted(prewarm.values())
+    warm_ok  = set(warm_up) == {"done"}
+    leader_ok = states.count("running") == 1 and set(states) <= {"running", "standby"}
+    print(f"\ngunicorn server:app, {args.workers} worker(s), first request after {args.settle:g} s")
+    print(f"  warm_up  {'ok  ' if warm_ok else 'FAIL'}  {warm_up}")
+    print(f"  prewarm  {'ok  ' if leader_ok else 'FAIL'}  {len(prewarm)} worker(s) seen: {states}")
+    if not (warm_ok and leader_ok):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ import PageShell from "./components/PageShell.jsx";
 import Card from "./components/Card.jsx";
 import ProgressRing from "./components/ProgressRing.jsx";
 import FeedStatusIcon from "./components/FeedStatusIcon.jsx";
-import { post, get } from "./api.js";
+import { post, get, getPublic, watchJob } from "./api.js";
 
 const PRESETS = [
   {
@@ -43,13 +43,15 @@ const PRESETS = [
   },
 ];
 
+// Each step completes on a real pipeline event streamed from the job
 const STEPS = [
-  { id: "fetch", label: "Fetching sources" },
-  { id: "scrape", label: "Extracting content" },
-  { id: "nlp", label: "Analysing articles" },
-  { id: "render", label: "Composing layout" },
-  { id: "pdf", label: "Generating PDF" },
+  { id: "fetch", label: "Fetching sources", doneOn: "feeds_fetched" },
+  { id: "scrape", label: "Extracting content", doneOn: "articles_scraped" },
+  { id: "nlp", label: "Analysing articles", doneOn: "articles_ready" },
+  { id: "render", label: "Composing layout", doneOn: "render_done" },
+  { id: "pdf", label: "Generating PDF", doneOn: "pdf_written" },
 ];
+const SCRAPE_STEP = STEPS.findIndex((s) => s.id === "scrape");
 
 function SummaryRow({ label, value, last }) {
   return (
@@ -74,6 +76,7 @@ export default function App() {
   const [status, setStatus] = useState("idle");
   const [stepIndex, setStepIndex] = useState(-1);
   const [doneSteps, setDoneSteps] = useState([]);
+  const [scrapeFrac, setScrapeFrac] = useState(0);
   const [errorMsg, setErrorMsg] = useState("");
   const [pdfUrl, setPdfUrl] = useState(null);
   const [valid, setValid] = useState(false);
@@ -83,7 +86,11 @@ export default function App() {
   const progressPct =
     status === "done"
       ? 100
-      : Math.round((doneSteps.length / STEPS.length) * 100);
+      : Math.round(
+          ((doneSteps.length + (stepIndex === SCRAPE_STEP ? scrapeFrac : 0)) /
+            STEPS.length) *
+            100,
+        );
 
   // ── Feed validation ─────────────────────────────────────────────────────────
   const validateFeed = async (url) => {
@@ -145,33 +152,43 @@ export default function App() {
     setStepIndex(0);
     setErrorMsg("");
     setPdfUrl(null);
+    setScrapeFrac(0);
 
-    let stepTimer;
-    let currentStep = 0;
-    const advanceStep = () => {
-      if (currentStep < STEPS.length - 1) {
-        setDoneSteps((d) => [...d, STEPS[currentStep].id]);
-        currentStep += 1;
-        setStepIndex(currentStep);
-        stepTimer = setTimeout(advanceStep, 1800 + Math.random() * 600);
+    const onEvent = (name, data) => {
+      if (name === "article_scraped" && data.total) {
+        setScrapeFrac(data.scraped / data.total);
+        setStepIndex((i) => Math.max(i, SCRAPE_STEP));
+        return;
       }
+      const idx = STEPS.findIndex((s) => s.doneOn === name);
+      if (idx === -1) return;
+      setDoneSteps(STEPS.slice(0, idx + 1).map((s) => s.id));
+      setStepIndex(idx + 1 < STEPS.length ? idx + 1 : -1);
     };
-    stepTimer = setTimeout(advanceStep, 1400);
 
     try {
       const res = await post("/api/generate", { feeds, days_back: daysBack });
-
-      clearTimeout(stepTimer);
       if (!res.ok) {
         const err = await res.json().catch(() => ({ error: res.statusText }));
         throw new Error(err.error || "Request failed");
       }
+      const job = await res.json();
+
+      const result = await watchJob(job, onEvent);
+      if (result.status === "error")
+        throw new Error(result.error || "Request failed");
+
+      const pdf = await getPublic(job.pdf_url);
+      if (!pdf.ok) {
+        const err = await pdf.json().catch(() => ({ error: pdf.statusText }));
+        throw new Error(err.error || "Request failed");
+      }
+
       setDoneSteps(STEPS.map((s) => s.id));
       setStepIndex(-1);
-      setPdfUrl(URL.createObjectURL(await res.blob()));
+      setPdfUrl(URL.createObjectURL(await pdf.blob()));
       setStatus("done");
     } catch (err) {
-      clearTimeout(stepTimer);
       setErrorMsg(err.message || "An unexpected error occurred.");
       setStatus("error");
       setStepIndex(-1);
@@ -25,3 +25,79 @@ export async function get(path, body) {
     body: JSON.stringify(body),
   });
 }
+
+// Job endpoints need no CSRF token — the job id itself is the credential.
+export function getPublic(path) {
+  return fetch(`${BASE}${path}`);
+}
+
+export const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Progress events emitted by the generation pipeline (see api/main.py)
+const JOB_EVENTS = [
+  "status",
+  "feed_fetched",
+  "feeds_fetched",
+  "article_scraped",
+  "articles_scraped",
+  "articles_ready",
+  "render_started",
+  "render_done",
+  "pdf_started",
+  "images_ready",
+  "pdf_written",
+];
+
+// Reconnects in a row without the stream opening before we give up on SSE.
+const SSE_MAX_RETRIES = 3;
+
+// Follow a generation job until it finishes. Progress events from the SSE
+// stream are passed to onEvent(name, data). When the server closes the
+// stream early, EventSource reconnects by itself and resumes after
+// Last-Event-ID; only if the stream is refused (readyState CLOSED) or keeps
+// failing to open do we fall back to polling the status URL.
+// Resolves with the final status payload ({ status, error, ... }).
+export function watchJob({ events_url, status_url }, onEvent, pollMs = 1500) {
+  const poll = async () => {
+    let job;
+    do {
+      await sleep(pollMs);
+      const res = await getPublic(status_url);
+      job = await res.json().catch(() => ({ error: res.statusText }));
+      if (!res.ok) throw new Error(job.error || "Request failed");
+    } while (job.status === "queued" || job.status === "running");
+    return job;
+  };
+
+  if (typeof EventSource === "undefined") return poll();
+
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${BASE}${events_url}`);
+    let finished = false;
+    let failures = 0;
+
+    const handle = (e) => {
+      const data = JSON.parse(e.data || "{}");
+      onEvent(e.type, data);
+      if (e.type === "status" && (data.status === "done" || data.status === "error")) {
+        finished = true;
+        source.close();
+        resolve(data);
+      }
+    };
+    JOB_EVENTS.forEach((name) => source.addEventListener(name, handle));
+
+    source.onopen = () => {
+      failures = 0;
+    };
+    source.onerror = () => {
+      if (finished) return;
+      failures += 1;
+      if (source.readyState !== EventSource.CLOSED && failures < SSE_MAX_RETRIES) {
+        return; // EventSource is reconnecting with Last-Event-ID
+      }
+      source.close();
+      poll().then(resolve, reject);
+    };
+  });
+}
@@ -25,6 +25,9 @@ if [ -f "requirements.txt" ]; then
   pip install -r requirements.txt
 fi
 
+echo "📚 Fetching NLTK data..."
+(cd "$API_DIR" && python bootstrap.py)
+
 echo "🔄 Restarting systemd service..."
 sudo systemctl restart "$SERVICE_NAME"
 
@@ -1,24 +1,30 @@
-import feedparser
 import asyncio
 import datetime
-import requests
 import unicodedata
-import nltk
 from typing import Optional, List, Dict
-from bs4 import BeautifulSoup
-from newspaper import Article
 from email.utils import parsedate_to_datetime
 from jinja2 import Environment, FileSystemLoader
-from playwright.async_api import async_playwright
 
+# feedparser, newspaper3k (+ NLTK) and Playwright are imported where they are
+# used, so importing this module stays cheap.
 
-# ── NLTK bootstrap (run once, safe to repeat) ─────────────────────────────────
 
-for _resource in ("punkt", "punkt_tab", "stopwords"):
-    try:
-        nltk.download(_resource, quiet=True)
-    except Exception:
-        pass
+# ── NLTK bootstrap (explicit, run once before scraping) ───────────────────────
+
+def bootstrap_nltk() -> None:
+    """Fetch the NLTK data newspaper3k's summariser needs, if missing."""
+    import nltk
+
+    for resource, path in (("punkt", "tokenizers/punkt"),
+                           ("punkt_tab", "tokenizers/punkt_tab"),
+                           ("stopwords", "corpora/stopwords")):
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            try:
+                nltk.download(resource, quiet=True)
+            except Exception:
+                pass
 
 
 # ── Config ────────────────────────────────────────────────────────────────────
@@ -77,6 +83,8 @@ def scrape_article(url: str) -> Dict:
       summary   : str   (NLP summary or first N paragraphs)
       authors   : list[str]
     """
+    from newspaper import Article
+
     result: Dict = {"top_image": None, "summary": "", "authors": []}
     try:
         art = Article(url)
@@ -114,6 +122,8 @@ def fetch_articles(feeds: List[str], days_back: int) -> List[Dict]:
     Iterate over every feed, filter to the last *days_back* days,
     scrape each article, and return a unified list of article dicts.
     """
+    import feedparser
+
     cutoff = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(days=days_back)
     all_articles: List[Dict] = []
 
@@ -155,6 +165,8 @@ def fetch_articles(feeds: List[str], days_back: int) -> List[Dict]:
 
 async def build_pdf(articles: List[Dict]) -> None:
     """Render Jinja2 templates and export a PDF via Playwright."""
+    from playwright.async_api import async_playwright
+
     file_loader = FileSystemLoader("templates")
     env = Environment(loader=file_loader)
 
@@ -189,6 +201,7 @@ async def create_magazine() -> None:
     raw  = input(f"Days back to fetch? [default {DAYS_BACK}]: ").strip()
     days = int(raw) if raw else DAYS_BACK
 
+    bootstrap_nltk()
     articles = fetch_articles(RSS_FEEDS, days_back=days)
 
     if not articles: